@@ -1,316 +1,42 @@
 import os
-import re
-import json
-import pdfplumber
 import csv
 import customtkinter as ctk
 from tkinter import filedialog
 import threading
-from rapidfuzz import fuzz
+import time
+from reference_data import load_reference_data
+from resume_extraction import parse_resume, ADVANCED_EXTRACTORS
+from extractor_pipeline import ExtractorTimings, expensive_extractors
+from parse_pool import ParsePool
+from resume_store import load_resumes, save_resumes
+from search_index import SearchIndex
+from resume_export import export_resumes, available_formats
+from text_store import TextStore
+from reindex import stale_resumes, reindex_resumes
+from typeahead import Typeahead
+from perf_metrics import get_metrics, normalizer_stats
+from query_log import QueryLog
+from candidate_index import CandidateIndex, DEFAULT_COUNTRY_CODE
+from thumbnail_cache import ThumbnailCache, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT
 
-# Load reference data from CSVs
-def load_reference_data():
-    data = {
-        'skills': [],
-        'job_titles': [],
-        'education_degrees': []
-    }
-    
-    # Load skills
-    if os.path.exists('skills.csv'):
-        with open('skills.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            data['skills'] = [row['Skill'].lower() for row in reader]
-    
-    # Load job titles
-    if os.path.exists('job_titles.csv'):
-        with open('job_titles.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            data['job_titles'] = [row['Title'].lower() for row in reader]
-    
-    # Load education degrees
-    if os.path.exists('education_degrees.csv'):
-        with open('education_degrees.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            data['education_degrees'] = [row['Degree'].lower() for row in reader]
-    
-    return data
-
-# Parse resume text from PDF
-def extract_text_from_pdf(file_path):
-    text = ""
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                extracted_text = page.extract_text()
-                if extracted_text:
-                    text += extracted_text + "\n"
-    except Exception as e:
-        print(f"Error extracting text from PDF: {e}")
-    return text
+try:
+    from vector_index import VectorIndex, resume_vector_text # needs numpy
+except ImportError:
+    VectorIndex = None
 
-# Extract information using regex and reference data
-def parse_resume(file_path, reference_data):
-    result = {
-        'name': None,
-        'email': None,
-        'phone': None,
-        'skills': [],
-        'jobs': [],
-        'projects': [],
-        'education': [],
-        'file_path': file_path
-    }
-    
-    # Extract text from PDF
-    text = extract_text_from_pdf(file_path)
-    if not text:
-        return result
-    
-    # Store raw text
-    result['raw_text'] = text
-    
-    # Extract email using robust regex pattern
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
-    if emails:
-        result['email'] = emails[0]
-    
-    # Extract phone using multiple patterns for different formats
-    phone_patterns = [
-        r'(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',  # (123) 456-7890
-        r'(?:\+?\d{1,3}[-.\s]?)?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}',  # 123 456 7890
-        r'(?:\+?\d{1,3}[-.\s]?)?\d{10}'  # 1234567890
-    ]
-    
-    for pattern in phone_patterns:
-        phones = re.findall(pattern, text)
-        if phones:
-            result['phone'] = phones[0]
-            break
-    
-    # Extract name - look at beginning of resume
-    lines = text.split('\n')
-    for i in range(min(5, len(lines))):
-        line = lines[i].strip()
-        # Skip lines with email, phone, or address
-        if '@' in line or re.search(r'\d{3}', line) or 'address' in line.lower():
-            continue
-        # Check if line is potential name (1-3 words, each capitalized)
-        words = line.split()
-        if 1 <= len(words) <= 3:
-            capitalized_words = [w for w in words if len(w) > 1 and w[0].isupper()]
-            if len(capitalized_words) == len(words) and len(words) >= 1:
-                result['name'] = line
-                break
-    
-    # Extract skills - comprehensive matching
-    skills_found = set()
-    text_lower = text.lower()
-    
-    # First, look for a dedicated skills section
-    skills_section = None
-    skills_headers = ['skills', 'technical skills', 'expertise', 'competencies', 'proficiencies', 'technologies']
-    
-    for header in skills_headers:
-        header_pattern = re.compile(f"{header}\\s*:?", re.IGNORECASE)
-        match = header_pattern.search(text)
-        
-        if match:
-            # Find text between this header and next header
-            start_pos = match.end()
-            next_header_pattern = re.compile(r"\n\s*[A-Z][A-Za-z\s]+:?(?:\n|\s|$)")
-            next_match = next_header_pattern.search(text, start_pos)
-            
-            if next_match:
-                skills_section = text[start_pos:next_match.start()]
-            else:
-                skills_section = text[start_pos:start_pos+500]  # Limit to 500 chars
-            break
-    
-    # Extract skills from the skills section if found
-    if skills_section:
-        # Split by common separators
-        section_split = re.split(r'[,•\n•|/]', skills_section)
-        section_items = [item.strip() for item in section_split if item.strip()]
-        
-        for item in section_items:
-            item_lower = item.lower()
-            # Check against reference skills
-            for skill in reference_data['skills']:
-                if skill in item_lower:
-                    skills_found.add(skill.capitalize())
-    
-    # Look for skills throughout the document
-    for skill in reference_data['skills']:
-        if skill.lower() in text_lower:
-            skills_found.add(skill.capitalize())
-    
-    result['skills'] = sorted(list(skills_found))
-    
-    # Extract education - look for degree mentions
-    education_found = []
-    
-    for degree in reference_data['education_degrees']:
-        if degree.lower() in text_lower:
-            # Find the context around this degree
-            degree_pattern = re.compile(f"{re.escape(degree)}\\b", re.IGNORECASE)
-            match = degree_pattern.search(text)
-            if match:
-                # Extract context around the degree
-                start = max(0, match.start() - 100)
-                end = min(len(text), match.end() + 100)
-                context = text[start:end].strip()
-                
-                # university/institution name
-                university_patterns = ['university', 'college', 'institute', 'school']
-                university = None
-                
-                for uni_pattern in university_patterns:
-                    uni_match = re.search(f"\\b{uni_pattern}\\s+of\\s+[A-Z][a-zA-Z\\s]+\\b", context, re.IGNORECASE)
-                    if uni_match:
-                        university = uni_match.group(0)
-                        break
-                
-                if not university:
-                    # Word starting with capital followed by University
-                    for uni_pattern in university_patterns:
-                        uni_match = re.search(f"\\b[A-Z][a-zA-Z\\s]+\\s+{uni_pattern}\\b", context, re.IGNORECASE)
-                        if uni_match:
-                            university = uni_match.group(0)
-                            break
-                
-                # Look for graduation year
-                year_match = re.search(r'\b(19|20)\d{2}\b', context)
-                year = year_match.group(0) if year_match else None
-                
-                education_found.append({
-                    'degree': degree,
-                    'institution': university if university else "Institution name not found",
-                    'year': year,
-                    'context': context
-                })
-    
-    result['education'] = education_found
-    
-    # Extract work experience - look for job titles
-    jobs_found = []
-    
-    for title in reference_data['job_titles']:
-        if title.lower() in text_lower:
-            title_pattern = re.compile(f"{re.escape(title)}\\b", re.IGNORECASE)
-            
-            for match in title_pattern.finditer(text):
-                start = max(0, match.start() - 150)
-                end = min(len(text), match.end() + 150)
-                context = text[start:end].strip()
-                
-                # Look for company name and dates
-                company = None
-                date = None
-                
-                # Check for date patterns in context
-                date_patterns = [
-                    r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\s+[-–—]\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}|Present',
-                    r'\d{4}\s+[-–—]\s+\d{4}',
-                    r'\d{4}\s+[-–—]\s+Present'
-                ]
-                
-                for date_pattern in date_patterns:
-                    date_match = re.search(date_pattern, context, re.IGNORECASE)
-                    if date_match:
-                        date = date_match.group(0)
-                        break
-                
-                # Look for possible company name
-                company_indicators = ['at', 'with', 'for', '-', '|', ',']
-                for indicator in company_indicators:
-                    company_pattern = f"{re.escape(title)}\\s*{re.escape(indicator)}\\s*([A-Z][A-Za-z0-9\\s&.,]+)"
-                    company_match = re.search(company_pattern, context, re.IGNORECASE)
-                    if company_match:
-                        company = company_match.group(1).strip()
-                        break
-                
-                if not company:
-                    # Company followed by job title
-                    for indicator in company_indicators:
-                        company_pattern = f"([A-Z][A-Za-z0-9\\s&.,]+)\\s*{re.escape(indicator)}\\s*{re.escape(title)}"
-                        company_match = re.search(company_pattern, context, re.IGNORECASE)
-                        if company_match:
-                            company = company_match.group(1).strip()
-                            break
-                
-                # responsibilities/achievements (bullet points)
-                responsibilities = []
-                bullet_pattern = r'[•\-\*]\s*([^\n•\-\*]+)'
-                bullet_matches = re.findall(bullet_pattern, context)
-                responsibilities = [match.strip() for match in bullet_matches if len(match.strip()) > 10]
-                
-                jobs_found.append({
-                    'title': title,
-                    'company': company if company else "Company name not found",
-                    'date': date if date else "Date not found",
-                    'responsibilities': responsibilities[:3],  # Keep only first 3 responsibilities
-                    'context': context
-                })
-    
-    result['jobs'] = jobs_found
-    
-    # Extract projects - look for project indicators
-    projects_found = []
-    project_headers = ['projects', 'key projects', 'professional projects', 'portfolio', 'project work']
-    
-    for header in project_headers:
-        header_pattern = re.compile(f"{header}\\s*:?", re.IGNORECASE)
-        match = header_pattern.search(text)
-        
-        if match:
-            # Find text btw this header and next header
-            start_pos = match.end()
-            next_header_pattern = re.compile(r"\n\s*[A-Z][A-Za-z\s]+:?(?:\n|\s|$)")
-            next_match = next_header_pattern.search(text, start_pos)
-            
-            if next_match:
-                projects_section = text[start_pos:next_match.start()]
-            else:
-                projects_section = text[start_pos:start_pos+800]  # Limit to 800 chars
-            
-            # Split the projects section and process
-            lines = projects_section.split('\n')
-            current_project = None
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check if this is a new project (often starts with a title)
-                if not line.startswith('•') and not line.startswith('-') and len(line) < 100:
-                    if current_project:
-                        projects_found.append(current_project)
-                    
-                    current_project = {
-                        'title': line,
-                        'description': []
-                    }
-                elif current_project:
-                    # This line is part of the current project description
-                    current_project['description'].append(line)
-            
-            # Add the last project
-            if current_project:
-                projects_found.append(current_project)
-            
-            break
-    
-    # Limit project descriptions to 3 lines each
-    for project in projects_found:
-        if 'description' in project:
-            project['description'] = project['description'][:3]
-    
-    result['projects'] = projects_found
-    
-    return result
+# Refresh interval of the optional performance panel
+PERF_REFRESH_MS = 2000
+# Folder imports hand parsed resumes to the UI in batches of this many, or at
+# least this often, so the first ones show up while the rest still parse
+IMPORT_BATCH_SIZE = 25
+IMPORT_FLUSH_SECONDS = 0.5
+# The typeahead rebuilds its arrays at most this often during an import
+TYPEAHEAD_REFRESH_SECONDS = 2.0
+# After a scroll, resize or new cards, wait this long for things to settle
+# before checking which placeholder cards are in view
+THUMBNAIL_DEBOUNCE_MS = 150
+# Country code assumed for phone numbers written without one, when linking resume versions
+PHONE_COUNTRY_CODE = DEFAULT_COUNTRY_CODE
 
 # Define the main application class
 class ResumeParserApp(ctk.CTk):
@@ -331,8 +57,27 @@ class ResumeParserApp(ctk.CTk):
         
         # Initialize data
         self.resumes = []
+        self.current_results = None
+        self.search_index = SearchIndex()
         self.reference_data = load_reference_data()
+        self.parse_pool = None
+        self.extractor_timings = ExtractorTimings()
+        self.text_store = TextStore()
+        self.candidates = CandidateIndex(country_code=PHONE_COUNTRY_CODE)
         self.json_path = os.path.join(os.getcwd(), "parsed_resumes.json")
+        self.vector_index = None
+        self.vector_path = os.path.join(os.getcwd(), "resume_vectors.npz")
+        self.vector_building = False
+        self.vector_stale = False
+        self.metrics = get_metrics()
+        self.perf_job = None
+        self.query_log = None
+        self.import_view = False  # results area is showing the running folder import
+        self.import_shown = set()  # candidate IDs with a card in the import view
+        self.import_stale = False  # what's on screen misses resumes from the running import
+        self.thumbnails = ThumbnailCache()
+        self.pending_thumbnails = []  # (label, file path) of cards still showing a placeholder
+        self.thumbnail_job = None
         
         # Create sidebar
         self.create_sidebar()
@@ -342,9 +87,15 @@ class ResumeParserApp(ctk.CTk):
         
         # Load existing data if available
         self.load_existing_data()
+        self.typeahead = Typeahead.from_sources(self.reference_data, self.resumes)
+        self.refresh_vector_index(rebuild=False)
+        self.register_metrics()
         
         # Status variables
         self.parsing_in_progress = False
+        
+        # Re-extract resumes parsed against older reference CSVs
+        self.reindex_stale()
     
     def create_sidebar(self):
         # Create sidebar frame
@@ -384,6 +135,14 @@ class ResumeParserApp(ctk.CTk):
         )
         self.btn_add_folder.pack(pady=10, padx=20, fill="x")
         
+        # Quick import leaves out the expensive extractors; the skipped fields
+        # are filled in by the next reindex of stale resumes
+        self.quick_import_switch = ctk.CTkSwitch(
+            self.sidebar,
+            text="Quick import"
+        )
+        self.quick_import_switch.pack(pady=(0, 10), padx=20, fill="x")
+        
         # Clear all button
         self.btn_clear = ctk.CTkButton(
             self.sidebar,
@@ -394,6 +153,15 @@ class ResumeParserApp(ctk.CTk):
         )
         self.btn_clear.pack(pady=10, padx=20, fill="x")
         
+        # Export button: the displayed results, or everything when nothing is shown
+        self.btn_export = ctk.CTkButton(
+            self.sidebar,
+            text="📤 Export Results",
+            command=self.export_results,
+            height=40
+        )
+        self.btn_export.pack(pady=10, padx=20, fill="x")
+        
         # Search entry
         self.search_label = ctk.CTkLabel(
             self.sidebar,
@@ -405,11 +173,15 @@ class ResumeParserApp(ctk.CTk):
         
         self.search_entry = ctk.CTkEntry(
             self.sidebar,
-            placeholder_text="Search by skills, experience, name...",
+            placeholder_text="Search, or skill:python AND years:>5 ...",
             height=40
         )
         self.search_entry.pack(pady=10, padx=20, fill="x")
-        self.search_entry.bind("<KeyRelease>", self.perform_search)
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
+        
+        # Typeahead suggestions, shown under the search box while typing
+        self.suggestion_frame = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        self.suggestion_buttons = []
         
         # Quick filter buttons
         self.filter_label = ctk.CTkLabel(
@@ -464,12 +236,58 @@ class ResumeParserApp(ctk.CTk):
             font=ctk.CTkFont(weight="bold")
         )
         self.count_label.pack(pady=(0, 10), padx=10, fill="x")
+        
+        # Query cache hit rate
+        self.cache_label = ctk.CTkLabel(
+            self.status_frame,
+            text="Query cache: no lookups yet",
+            anchor="w",
+            font=ctk.CTkFont(size=11)
+        )
+        self.cache_label.pack(pady=(0, 10), padx=10, fill="x")
+        
+        # Optional performance panel, refreshed on a timer while shown
+        self.perf_switch = ctk.CTkSwitch(
+            self.status_frame,
+            text="Performance panel",
+            command=self.toggle_perf_panel
+        )
+        self.perf_switch.pack(pady=(0, 10), padx=10, fill="x")
+        
+        # Optional log of searches for query_log.py replays
+        self.query_log_switch = ctk.CTkSwitch(
+            self.status_frame,
+            text="Record query log",
+            command=self.toggle_query_log
+        )
+        self.query_log_switch.pack(pady=(0, 10), padx=10, fill="x")
+        
+        self.perf_label = ctk.CTkLabel(
+            self.status_frame,
+            text="",
+            anchor="w",
+            justify="left",
+            font=ctk.CTkFont(family="Courier", size=11)
+        )
     
     def create_main_content(self):
         # Create scrollable frame for content
         self.content = ctk.CTkScrollableFrame(self)
         self.content.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
         
+        # Any change to what the canvas shows (scrolling by wheel or scrollbar,
+        # resizing, cards added) ends in its yscrollcommand, so thumbnails are
+        # looked for there rather than by polling
+        viewport = self.content.master  # the scrollable frame's canvas
+        scroll_command = viewport.cget('yscrollcommand')
+        
+        def on_view_change(*args):
+            viewport.tk.call(scroll_command, *args)
+            if self.pending_thumbnails:
+                self.schedule_thumbnails()
+        
+        viewport.configure(yscrollcommand=on_view_change)
+        
         # Welcome message
         self.welcome_label = ctk.CTkLabel(
             self.content,
@@ -518,11 +336,16 @@ class ResumeParserApp(ctk.CTk):
     def quick_filter(self, term):
         self.search_entry.delete(0, 'end')
         self.search_entry.insert(0, term)
-        self.perform_search()
+        self.perform_search(source="quick_filter")
     
     def clear_all(self):
         # Clear all resumes
         self.resumes = []
+        self.current_results = None
+        self.search_index.clear()
+        self.candidates.clear()
+        self.vector_index = None
+        self.typeahead = Typeahead.from_sources(self.reference_data)
         self.save_to_json()
         self.count_label.configure(text="Resumes: 0")
         self.status_label.configure(text="All resumes cleared")
@@ -552,6 +375,10 @@ class ResumeParserApp(ctk.CTk):
         if folder_path:
             self.process_folder(folder_path)
     
+    # Extractors to leave out of this import
+    def import_skip(self):
+        return expensive_extractors(ADVANCED_EXTRACTORS) if self.quick_import_switch.get() else ()
+    
     def process_file(self, file_path):
         self.parsing_in_progress = True
         self.status_label.configure(text=f"Parsing {os.path.basename(file_path)}...")
@@ -563,7 +390,12 @@ class ResumeParserApp(ctk.CTk):
     def _parse_file_thread(self, file_path):
         try:
             # Parse the file
-            result = parse_resume(file_path, self.reference_data)
+            self.metrics.set_queue_depth(1)
+            elapsed = {}
+            result = parse_resume(file_path, self.reference_data, self.import_skip(), elapsed)
+            self.extractor_timings.merge(elapsed)
+            self.metrics.set_queue_depth(0)
+            self.metrics.record_ingest()
             
             # Add to resumes list if not already present
             file_exists = False
@@ -574,9 +406,17 @@ class ResumeParserApp(ctk.CTk):
             
             if not file_exists:
                 self.resumes.append(result)
+                self.search_index.add(result)
+                self.candidates.add(result)
+                if result.get('raw_text'):
+                    self.text_store.put(file_path, result.pop('raw_text'))
+                self.typeahead.add_resume(result)
+                self.typeahead.prepare()
                 
                 # Save to JSON
                 self.save_to_json()
+                self.reference_data['skill_normalizer'].save_memo()
+                self.refresh_vector_index()
                 
                 # Update status and counts
                 self.status_label.configure(text=f"Successfully parsed {os.path.basename(file_path)}")
@@ -587,6 +427,7 @@ class ResumeParserApp(ctk.CTk):
         except Exception as e:
             self.status_label.configure(text=f"Error: {str(e)}")
         finally:
+            self.metrics.set_queue_depth(0)
             self.parsing_in_progress = False
     
     def process_folder(self, folder_path):
@@ -604,42 +445,156 @@ class ResumeParserApp(ctk.CTk):
             return
         
         self.status_label.configure(text=f"Found {len(pdf_files)} PDF files. Processing...")
+        
+        # Results stream into an import view as they are parsed
+        for widget in self.content.winfo_children():
+            widget.destroy()
+        self.import_label = ctk.CTkLabel(
+            self.content,
+            text=f"Importing {len(pdf_files)} files...",
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        self.import_label.pack(pady=10)
+        self.current_results = []
+        self.import_view = True
+        self.import_shown = set()
+        self.import_stale = False
         self.update_idletasks()
         
         # Start parsing in a separate thread
         threading.Thread(target=self._parse_folder_thread, args=(pdf_files,)).start()
     
     def _parse_folder_thread(self, pdf_files):
+        results = []
+        batch = []
+        done = 0
+        last_flush = time.monotonic()
+        self.typeahead_pending = []
+        self.typeahead_refreshed = last_flush
         try:
-            results = []
-            for i, file_path in enumerate(pdf_files):
-                # Update status for each file
-                self.status_label.configure(text=f"Parsing file {i+1}/{len(pdf_files)}: {os.path.basename(file_path)}")
-                self.update_idletasks()
-                
-                # Parse the file
-                result = parse_resume(file_path, self.reference_data)
-                
-                # Add to resumes list if not already present
-                file_exists = False
-                for resume in self.resumes:
-                    if resume['file_path'] == file_path:
-                        file_exists = True
-                        break
+            # Parse in worker processes that share the already-compiled reference data;
+            # the pool is kept for later imports so workers start only once
+            if self.parse_pool is None:
+                self.parse_pool = ParsePool(self.reference_data, timings=self.extractor_timings)
+            
+            parsed = self.parse_pool.map(pdf_files, self.import_skip())
+            for done, (file_path, result) in enumerate(zip(pdf_files, parsed), 1):
+                self.metrics.record_ingest()
+                self.metrics.set_queue_depth(len(pdf_files) - done)
                 
-                if not file_exists:
+                # Add to resumes if not already present; the search index takes
+                # each one as it comes, so it can be searched straight away
+                if self.search_index.get(file_path) is None:
                     self.resumes.append(result)
+                    self.search_index.add(result)
+                    self.candidates.add(result)
+                    if result.get('raw_text'):
+                        self.text_store.put(file_path, result.pop('raw_text'))
                     results.append(result)
+                    batch.append(result)
+                
+                # The UI thread adds cards a batch at a time, not one redraw per file
+                if len(batch) >= IMPORT_BATCH_SIZE or time.monotonic() - last_flush >= IMPORT_FLUSH_SECONDS:
+                    self.flush_import_batch(batch, done, len(pdf_files))
+                    batch = []
+                    last_flush = time.monotonic()
             
             # Save to JSON
             self.save_to_json()
-            
-            # Update status and counts
-            self.status_label.configure(text=f"Successfully parsed {len(results)} new resumes")
-            self.count_label.configure(text=f"Resumes: {len(self.resumes)}")
-            
-            # Refresh display
-            self.display_results(results)
+            self.reference_data['skill_normalizer'].save_memo()
+            if results:
+                self.refresh_vector_index()
+            message = f"Successfully parsed {len(results)} new resumes"
+        except Exception as e:
+            message = f"Error: {str(e)}"
+        finally:
+            self.metrics.set_queue_depth(0)
+            self.parsing_in_progress = False
+        self.flush_import_batch(batch, done, len(pdf_files), final=True)
+        self.after(0, self._import_finished, message, results)
+    
+    # Runs on the import thread. The typeahead takes new resumes (and rebuilds
+    # its arrays) here every TYPEAHEAD_REFRESH_SECONDS, so keystrokes during an
+    # import never rebuild it on the UI thread.
+    def flush_import_batch(self, batch, done, total, final=False):
+        self.typeahead_pending.extend(batch)
+        if final or time.monotonic() - self.typeahead_refreshed >= TYPEAHEAD_REFRESH_SECONDS:
+            self.typeahead.add_resumes(self.typeahead_pending)
+            self.typeahead_pending = []
+            self.typeahead_refreshed = time.monotonic()
+        self.after(0, self.add_imported, batch, done, total)
+    
+    # Runs on the UI thread for each batch of a folder import. The resumes are
+    # already searchable; cards are appended only while the import view is shown.
+    def add_imported(self, batch, done, total):
+        self.count_label.configure(text=f"Resumes: {len(self.resumes)}")
+        self.status_label.configure(text=f"Parsed {done}/{total} files, {len(self.resumes)} resumes searchable...")
+        if not self.import_view:
+            # The user has moved on to a search; it's refreshed when the import ends
+            if batch:
+                self.import_stale = True
+            return
+        
+        for result in batch:
+            candidate_id = self.candidates.candidate_of(result['file_path'])
+            if candidate_id in self.import_shown:
+                # Another version of a candidate already shown; collapsed at the end
+                self.import_stale = True
+                continue
+            self.import_shown.add(candidate_id)
+            self.current_results.append(result)
+            self.create_result_card(result, len(self.candidates.versions_of(candidate_id)))
+        self.import_label.configure(text=f"Imported {len(self.current_results)} candidate(s), {done}/{total} files parsed")
+    
+    def _import_finished(self, message, results):
+        self.status_label.configure(text=message)
+        self.count_label.configure(text=f"Resumes: {len(self.resumes)}")
+        if self.import_view:
+            self.import_label.configure(text=f"Imported {len(self.current_results)} candidate(s)")
+            if self.import_stale:
+                self.display_results(results)
+        elif self.import_stale and self.search_entry.get().strip():
+            self.perform_search()
+        self.import_view = False
+        self.import_stale = False
+    
+    def export_results(self):
+        resumes = self.current_results if self.current_results else list(self.resumes)
+        if not resumes:
+            self.status_label.configure(text="Nothing to export")
+            return
+        
+        out_dir = filedialog.askdirectory(title="Export tables to folder")
+        if out_dir:
+            self.status_label.configure(text=f"Exporting {len(resumes)} resumes...")
+            threading.Thread(target=self._export_thread, args=(resumes, out_dir), daemon=True).start()
+    
+    def _export_thread(self, resumes, out_dir):
+        try:
+            counts = export_resumes(resumes, out_dir, available_formats())
+            self.status_label.configure(text=f"Exported {counts['resumes']} resumes, {counts['jobs']} jobs to {os.path.basename(out_dir)}")
+        except Exception as e:
+            self.status_label.configure(text=f"Error: {str(e)}")
+    
+    def reindex_stale(self):
+        stale = stale_resumes(self.resumes, self.reference_data['version'])
+        if not stale:
+            return
+        self.parsing_in_progress = True
+        self.status_label.configure(text=f"Updating {len(stale)} resumes for new reference data...")
+        threading.Thread(target=self._reindex_thread, daemon=True).start()
+    
+    def _reindex_thread(self):
+        try:
+            if self.parse_pool is None:
+                self.parse_pool = ParsePool(self.reference_data, timings=self.extractor_timings)
+            stats = reindex_resumes(self.resumes, self.text_store, self.reference_data, self.parse_pool)
+            if stats['reindexed']:
+                self.search_index.rebuild(self.resumes)
+                self.typeahead = Typeahead.from_sources(self.reference_data, self.resumes)
+                self.save_to_json()
+                self.refresh_vector_index()
+            self.status_label.configure(text=f"Updated {stats['reindexed']} resumes ({stats['missing_text']} need re-importing)")
         except Exception as e:
             self.status_label.configure(text=f"Error: {str(e)}")
         finally:
@@ -647,100 +602,206 @@ class ResumeParserApp(ctk.CTk):
     
     def save_to_json(self):
         try:
-            with open(self.json_path, 'w') as f:
-                # Create a simplified version for storage
-                simplified_resumes = []
-                for resume in self.resumes:
-                    # Don't store raw text in the JSON file
-                    resume_copy = resume.copy()
-                    if 'raw_text' in resume_copy:
-                        del resume_copy['raw_text']
-                    simplified_resumes.append(resume_copy)
-                
-                json.dump(simplified_resumes, f, indent=2)
+            resumes = list(self.resumes)
+            save_resumes(self.json_path, resumes)
+            self.search_index.save_snapshot(self.json_path, resumes)
         except Exception as e:
             print(f"Error saving to JSON: {e}")
     
     def load_existing_data(self):
         if os.path.exists(self.json_path):
             try:
-                with open(self.json_path, 'r') as f:
-                    self.resumes = json.load(f)
-                    self.count_label.configure(text=f"Resumes: {len(self.resumes)}")
-                    if self.resumes:
-                        self.status_label.configure(text=f"Loaded {len(self.resumes)} existing resumes")
+                self.resumes = load_resumes(self.json_path)
+                self.search_index = SearchIndex.load(self.resumes, self.json_path)
+                self.candidates = CandidateIndex(self.resumes, PHONE_COUNTRY_CODE)
+                self.count_label.configure(text=f"Resumes: {len(self.resumes)}")
+                if self.resumes:
+                    self.status_label.configure(text=f"Loaded {len(self.resumes)} existing resumes")
             except Exception as e:
                 print(f"Error loading JSON: {e}")
     
-    def perform_search(self, event=None):
-        query = self.search_entry.get().lower().strip()
+    # Load the saved LSA index if it still covers the current resumes, otherwise
+    # rebuild it in the background; "Similar resumes" waits for it
+    def refresh_vector_index(self, rebuild=True):
+        if VectorIndex is None or not self.resumes:
+            return
+        if self.vector_building:
+            self.vector_stale = True
+            return
+        self.vector_building = True
+        threading.Thread(target=self._vector_index_thread, args=(rebuild,), daemon=True).start()
+    
+    def _vector_index_thread(self, rebuild):
+        try:
+            while True:
+                self.vector_stale = False
+                resumes = list(self.resumes)
+                index = None
+                if not rebuild and os.path.exists(self.vector_path):
+                    index = VectorIndex.load(self.vector_path)
+                    if set(index.keys) != {r['file_path'] for r in resumes}:
+                        index = None
+                if index is None:
+                    index = VectorIndex.build([(r['file_path'], resume_vector_text(r)) for r in resumes])
+                    index.save(self.vector_path)
+                self.vector_index = index
+                if not self.vector_stale:
+                    break
+                rebuild = True
+        except Exception as e:
+            print(f"Error building vector index: {e}")
+        finally:
+            self.vector_building = False
+    
+    def show_similar(self, file_path):
+        index = self.vector_index
+        if index is None or file_path not in index:
+            self.status_label.configure(text="Similarity index is still building, try again shortly")
+            return
+        
+        neighbours = index.similar(file_path, k=10)
+        results = [self.search_index.get(key) for _, key in neighbours]
+        self.display_results([r for r in results if r])
+        self.status_label.configure(text=f"Resumes similar to {os.path.basename(file_path)}")
+    
+    # Every resume linked to the same candidate (same email or phone), newest first
+    def show_versions(self, file_path):
+        versions = self.candidates.versions_of(self.candidates.candidate_of(file_path))
+        self.display_results(versions, collapse=False)
+        name = versions[0].get('name') if versions else None
+        self.status_label.configure(text=f"{len(versions)} versions of {name or os.path.basename(file_path)}")
+    
+    def on_search_key(self, event=None):
+        # Escape dismisses the suggestions without searching again
+        if event is not None and event.keysym == "Escape":
+            self.show_suggestions([])
+            return
+        self.show_suggestions(self.typeahead.suggest(self.search_entry.get()))
+        self.perform_search(event, "search" if event is not None and event.keysym == "Return" else "keystroke")
+    
+    def show_suggestions(self, suggestions):
+        for button in self.suggestion_buttons:
+            button.destroy()
+        self.suggestion_buttons = []
+        
+        if not suggestions:
+            self.suggestion_frame.pack_forget()
+            return
+        
+        for text, kind, count in suggestions:
+            label = f"{text}  ·  {kind}" + (f" ({count})" if count else "")
+            button = ctk.CTkButton(
+                self.suggestion_frame,
+                text=label,
+                anchor="w",
+                height=24,
+                fg_color="transparent",
+                hover_color=("#D0D0D0", "#3D3D3D"),
+                text_color=("black", "white"),
+                command=lambda value=text: self.apply_suggestion(value)
+            )
+            button.pack(fill="x", pady=1)
+            self.suggestion_buttons.append(button)
+        self.suggestion_frame.pack(after=self.search_entry, padx=20, fill="x")
+    
+    def apply_suggestion(self, value):
+        self.show_suggestions([])
+        self.quick_filter(value)
+    
+    def perform_search(self, event=None, source="search"):
+        # Not lowercased here: AND/OR/NOT are only operators in capitals
+        query = self.search_entry.get().strip()
         
         if not query:
+            if self.query_log:
+                self.query_log.record(query, source, 0, 0.0)
             # Clear results if search is empty
+            self.current_results = None
+            self.import_view = False
             for widget in self.content.winfo_children():
                 widget.destroy()
             self.create_main_content()
             return
         
-        # Find matching resumes
-        results = []
-        for resume in self.resumes:
-            # Create searchable text from resume data
-            search_text = ""
-            if resume.get('name'):
-                search_text += resume['name'] + " "
-            if resume.get('email'):
-                search_text += resume['email'] + " "
-            if resume.get('skills'):
-                search_text += " ".join(resume['skills']) + " "
-            
-            # Add job information
-            for job in resume.get('jobs', []):
-                if isinstance(job, dict):
-                    for key, value in job.items():
-                        if key != 'context' and value:  # Skip context field
-                            if isinstance(value, list):
-                                search_text += " ".join(value) + " "
-                            else:
-                                search_text += str(value) + " "
-            
-            # Add education information
-            for edu in resume.get('education', []):
-                if isinstance(edu, dict):
-                    for key, value in edu.items():
-                        if key != 'context' and value:
-                            search_text += str(value) + " "
-            
-            # Add project information
-            for project in resume.get('projects', []):
-                if isinstance(project, dict):
-                    for key, value in project.items():
-                        if key != 'context' and value:
-                            if isinstance(value, list):
-                                search_text += " ".join(value) + " "
-                            else:
-                                search_text += str(value) + " "
-            
-            # Calculate match score
-            search_text = search_text.lower()
-            
-            # Direct match gets highest score
-            if query in search_text:
-                score = 100
-            else:
-                # Fuzzy match for partial matches
-                score = fuzz.partial_ratio(query, search_text)
-            
-            if score > 60:  # Threshold for including in results
-                results.append((score, resume))
-        
-        # Sort by score (highest first)
-        results.sort(reverse=True, key=lambda x: x[0])
+        # Find matching resumes, sorted by score (highest first)
+        start = time.perf_counter()
+        results = self.search_index.search(query)
+        elapsed = time.perf_counter() - start
+        self.metrics.record_search(elapsed)
+        if self.query_log:
+            self.query_log.record(query, source, len(results), elapsed)
+        self.update_cache_label()
         
         # Display results
         self.display_results([r[1] for r in results])
     
-    def display_results(self, results):
+    def update_cache_label(self):
+        cache = self.search_index.cache
+        self.cache_label.configure(
+            text=f"Query cache: {cache.hit_rate:.0%} hits ({cache.hits}/{cache.hits + cache.misses})"
+        )
+    
+    # Sources read when a metrics snapshot is taken (panel or JSON dump)
+    def register_metrics(self):
+        self.metrics.register('index_size', lambda: len(self.resumes))
+        self.metrics.register('query_cache', lambda: self.search_index.cache.stats())
+        self.metrics.register('skill_memo', lambda: normalizer_stats(self.reference_data['skill_normalizer']))
+        self.metrics.register('title_memo', lambda: normalizer_stats(self.reference_data['title_normalizer']))
+        self.metrics.register('vector_index', lambda: len(self.vector_index) if self.vector_index else 0)
+        self.metrics.register('extractors', self.extractor_timings.snapshot)
+        self.metrics.register('thumbnails', self.thumbnails.stats)
+    
+    def toggle_perf_panel(self):
+        if self.perf_switch.get():
+            self.perf_label.pack(pady=(0, 10), padx=10, fill="x")
+            self.update_perf_panel()
+        else:
+            if self.perf_job is not None:
+                self.after_cancel(self.perf_job)
+                self.perf_job = None
+            self.perf_label.pack_forget()
+    
+    def toggle_query_log(self):
+        if self.query_log_switch.get():
+            try:
+                self.query_log = QueryLog()
+                self.status_label.configure(text=f"Recording searches to {os.path.basename(self.query_log.path)}")
+            except OSError as e:
+                self.query_log_switch.deselect()
+                self.status_label.configure(text=f"Error opening query log: {str(e)}")
+        elif self.query_log is not None:
+            self.query_log.close()
+            self.query_log = None
+            self.status_label.configure(text="Query log stopped")
+    
+    def update_perf_panel(self):
+        snapshot = self.metrics.snapshot()
+        rss = snapshot['rss_mb']
+        lines = [
+            f"Ingest:  {snapshot['ingest_per_minute']:.0f}/min ({snapshot['ingested_total']} total)",
+            f"Queue:   {snapshot['queue_depth']}",
+            f"Search:  p50 {snapshot['search_p50_ms']:.1f} ms  p95 {snapshot['search_p95_ms']:.1f} ms",
+            f"Cache:   query {snapshot['query_cache']['hit_rate']:.0%}  skills {snapshot['skill_memo']['hit_rate']:.0%}",
+            f"Index:   {snapshot['index_size']} resumes, {snapshot['vector_index']} vectors",
+            f"Memory:  {rss:.0f} MB RSS" if rss is not None else "Memory:  n/a"
+        ]
+        # The three extractors that have taken the most time, per resume
+        for name, timing in list(snapshot['extractors'].items())[:3]:
+            lines.append(f"Extract: {name} {timing['mean_ms']:.2f} ms")
+        self.perf_label.configure(text="\n".join(lines))
+        self.perf_job = self.after(PERF_REFRESH_MS, self.update_perf_panel)
+    
+    # Resumes of the same candidate are shown as one card (the newest version)
+    # unless collapse is off
+    def display_results(self, results, collapse=True):
+        self.import_view = False
+        if collapse:
+            entries = self.candidates.collapse(results)
+        else:
+            entries = [(resume, 1) for resume in results]
+        results = [resume for resume, _ in entries]
+        self.current_results = results
+        
         # Clear previous results
         for widget in self.content.winfo_children():
             widget.destroy()
@@ -758,20 +819,64 @@ class ResumeParserApp(ctk.CTk):
         # Show results count
         results_count_label = ctk.CTkLabel(
             self.content,
-            text=f"Found {len(results)} matching resume(s)",
+            text=f"Found {len(results)} matching candidate(s)" if collapse else f"Found {len(results)} matching resume(s)",
             font=ctk.CTkFont(size=14, weight="bold")
         )
         results_count_label.pack(pady=10)
         
         # Display each result
-        for resume in results:
-            self.create_result_card(resume)
+        for resume, versions in entries:
+            self.create_result_card(resume, versions)
     
-    def create_result_card(self, resume):
+    def schedule_thumbnails(self):
+        if self.thumbnail_job is None:
+            self.thumbnail_job = self.after(THUMBNAIL_DEBOUNCE_MS, self.load_visible_thumbnails)
+    
+    # Request thumbnails only for placeholder cards in the visible part of the
+    # results; the rest wait for the view to change
+    def load_visible_thumbnails(self):
+        self.thumbnail_job = None
+        viewport = self.content.master  # the scrollable frame's canvas
+        top = viewport.winfo_rooty()
+        bottom = top + viewport.winfo_height()
+        pending = []
+        for label, file_path in self.pending_thumbnails:
+            if not label.winfo_exists():
+                continue
+            y = label.winfo_rooty()
+            if label.winfo_ismapped() and y < bottom and y + label.winfo_height() > top:
+                self.thumbnails.request(file_path, lambda image, label=label: self.after(0, self.show_thumbnail, label, image))
+            else:
+                pending.append((label, file_path))
+        self.pending_thumbnails = pending
+    
+    def show_thumbnail(self, label, image):
+        if not label.winfo_exists():
+            return
+        if image is None:
+            label.configure(text="No preview")
+        else:
+            label.configure(text="", image=ctk.CTkImage(light_image=image, dark_image=image, size=image.size))
+    
+    def create_result_card(self, resume, versions=1):
         # Create a card for the resume
         card = ctk.CTkFrame(self.content)
         card.pack(fill="x", pady=10, padx=10)
         
+        # First-page preview on the right, rendered once the card scrolls into view
+        if self.thumbnails.available:
+            thumbnail = ctk.CTkLabel(
+                card,
+                text="📄",
+                width=THUMBNAIL_WIDTH,
+                height=THUMBNAIL_HEIGHT,
+                fg_color=("#E0E0E0", "#333333"),
+                corner_radius=6
+            )
+            thumbnail.pack(side="right", anchor="n", padx=(0, 15), pady=15)
+            self.pending_thumbnails.append((thumbnail, resume['file_path']))
+            self.schedule_thumbnails()
+        
         # Header with name and contact info
         header = ctk.CTkFrame(card, fg_color=("#3B8ED0", "#1F6AA5"))
         header.pack(fill="x", padx=15, pady=(15, 10))
@@ -1019,7 +1124,27 @@ class ResumeParserApp(ctk.CTk):
             font=ctk.CTkFont(size=10),
             text_color="gray"
         )
-        file_label.pack(anchor="w")
+        file_label.pack(side="left")
+        
+        if VectorIndex is not None:
+            similar_button = ctk.CTkButton(
+                footer,
+                text="🔍 Similar resumes",
+                width=140,
+                height=24,
+                command=lambda path=resume['file_path']: self.show_similar(path)
+            )
+            similar_button.pack(side="right")
+        
+        if versions > 1:
+            versions_button = ctk.CTkButton(
+                footer,
+                text=f"🗂 {versions} versions",
+                width=110,
+                height=24,
+                command=lambda path=resume['file_path']: self.show_versions(path)
+            )
+            versions_button.pack(side="right", padx=(0, 5))
 
 # Main execution
 if __name__ == "__main__":
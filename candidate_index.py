@@ -0,0 +1,185 @@
+import os
+import re
+import itertools
+import threading
+from datetime import datetime
+
+try:
+    import phonenumbers # optional; proper E.164 parsing for national formats
+except ImportError:
+    phonenumbers = None
+
+# Links resumes of the same person into one candidate. Normalized emails and
+# E.164 phone numbers are kept in hash indexes at ingest, so resumes sharing
+# either key join the same candidate and contact lookups are a dict access.
+
+# Country code assumed for numbers written without one; set per index
+# (CandidateIndex(country_code=...), resume_service.py --country-code)
+DEFAULT_COUNTRY_CODE = "1"
+
+_YEAR_RANGE = re.compile(r'^\s*(19|20)\d{2}\s*[-–]\s*((19|20)\d{2})?\s*$')
+
+
+# Lowercased, with any "+tag" dropped from the local part
+def normalize_email(email):
+    email = (email or '').strip().strip('.,;:<>()[]').lower()
+    if '@' not in email:
+        return None
+    local, _, domain = email.partition('@')
+    local = local.split('+', 1)[0]
+    return f"{local}@{domain}" if local and '.' in domain else None
+
+
+# E.164 form ("+6598624747"), or None for things that aren't phone numbers
+# (the extractor sometimes picks up year ranges like "2012 - 2015").
+# country_code is assumed for numbers written without one.
+def normalize_phone(phone, country_code=DEFAULT_COUNTRY_CODE):
+    phone = (phone or '').strip()
+    if not phone or _YEAR_RANGE.match(phone):
+        return None
+    if phonenumbers is not None:
+        try:
+            # Also recognises the country code written without "+" ("65 98624747")
+            number = phonenumbers.parse(phone, phonenumbers.region_code_for_country_code(int(country_code)))
+        except phonenumbers.NumberParseException:
+            return None
+        if not phonenumbers.is_possible_number(number):
+            return None
+        return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+
+    digits = re.sub(r'\D', '', phone)
+    if phone.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif digits.startswith(country_code) and len(digits) - len(country_code) >= 8:
+        # The country code written without "+" ("65 98624747")
+        pass
+    elif len(digits) <= 10:
+        # National number: drop the trunk prefix and add the country code
+        digits = country_code + digits.lstrip('0')
+    return f"+{digits}" if 8 <= len(digits) <= 15 else None
+
+
+# Contact keys of a resume; the advanced parser stores email/phone at the top
+# level, the simple app under personal_info
+def contact_keys(resume, country_code=DEFAULT_COUNTRY_CODE):
+    info = resume.get('personal_info') or {}
+    keys = set()
+    for email in (resume.get('email'), info.get('email')):
+        key = normalize_email(email)
+        if key:
+            keys.add(('email', key))
+    for phone in (resume.get('phone'), info.get('phone')):
+        key = normalize_phone(phone, country_code)
+        if key:
+            keys.add(('phone', key))
+    return keys
+
+
+# When a version was parsed: its timestamp if it has one, else the file's modification time
+def version_time(resume):
+    if resume.get('timestamp'):
+        try:
+            return datetime.fromisoformat(resume['timestamp']).timestamp()
+        except ValueError:
+            pass
+    try:
+        return os.path.getmtime(resume['file_path'])
+    except OSError:
+        return 0
+
+
+class CandidateIndex:
+    def __init__(self, resumes=None, country_code=DEFAULT_COUNTRY_CODE):
+        self.country_code = country_code
+        self.keys = {}  # ('email' | 'phone', normalized value) -> candidate ID
+        self.versions = {}  # candidate ID -> {file path: resume}
+        self.candidate_keys = {}  # candidate ID -> its contact keys, so merges don't scan every key
+        self.by_file = {}  # file path -> candidate ID
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        for resume in resumes or []:
+            self.add(resume)
+
+    def __len__(self):
+        return len(self.versions)
+
+    # Link a resume to its candidate (creating or merging candidates as needed); returns the candidate ID
+    def add(self, resume):
+        file_path = resume['file_path']
+        keys = contact_keys(resume, self.country_code)
+        with self.lock:
+            candidate_id = self.by_file.get(file_path)
+            matches = {self.keys[key] for key in keys if key in self.keys}
+            if candidate_id is not None:
+                matches.add(candidate_id)
+            if not matches:
+                candidate_id = next(self.ids)
+                self.versions[candidate_id] = {}
+                self.candidate_keys[candidate_id] = set()
+            else:
+                # Keep the candidate with most versions and fold the others into it
+                candidate_id = max(matches, key=lambda c: len(self.versions[c]))
+                for other in matches - {candidate_id}:
+                    self._merge(other, candidate_id)
+            self.versions[candidate_id][file_path] = resume
+            self.by_file[file_path] = candidate_id
+            for key in keys:
+                self.keys[key] = candidate_id
+            self.candidate_keys[candidate_id] |= keys
+            return candidate_id
+
+    def _merge(self, source, target):
+        for file_path, resume in self.versions.pop(source).items():
+            self.versions[target][file_path] = resume
+            self.by_file[file_path] = target
+        for key in self.candidate_keys.pop(source):
+            self.keys[key] = target
+            self.candidate_keys[target].add(key)
+
+    def clear(self):
+        with self.lock:
+            self.keys = {}
+            self.versions = {}
+            self.candidate_keys = {}
+            self.by_file = {}
+
+    def candidate_of(self, file_path):
+        return self.by_file.get(file_path)
+
+    # All versions of a candidate, newest first
+    def versions_of(self, candidate_id):
+        with self.lock:
+            versions = list(self.versions.get(candidate_id, {}).values())
+        return sorted(versions, key=version_time, reverse=True)
+
+    def newest(self, candidate_id):
+        versions = self.versions_of(candidate_id)
+        return versions[0] if versions else None
+
+    def find_by_email(self, email):
+        return self.keys.get(('email', normalize_email(email)))
+
+    def find_by_phone(self, phone):
+        return self.keys.get(('phone', normalize_phone(phone, self.country_code)))
+
+    # One entry per candidate, in the order of its best-ranked version:
+    # [(newest version, number of versions)]
+    def collapse(self, resumes):
+        seen = set()
+        collapsed = []
+        for resume in resumes:
+            candidate_id = self.by_file.get(resume['file_path'])
+            if candidate_id is None:
+                collapsed.append((resume, 1))
+                continue
+            if candidate_id in seen:
+                continue
+            seen.add(candidate_id)
+            if len(self.versions[candidate_id]) == 1:
+                collapsed.append((resume, 1))
+            else:
+                versions = self.versions_of(candidate_id)
+                collapsed.append((versions[0], len(versions)))
+        return collapsed
@@ -0,0 +1,127 @@
+import re
+from datetime import date
+
+# Month-level date ranges such as "Oct 2010 - Present", "APR 2005 – MAR 2010",
+# "01/2015 to 03/2018" or "2012 - 2016", compiled once for all resumes
+_MONTH = (r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+          r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?')
+_YEAR = r'(?:19|20)\d{2}'
+_POINT = rf'(?:{_MONTH}\s*,?\s*{_YEAR}|(?:0?[1-9]|1[0-2])\s*[/.]\s*{_YEAR}|{_YEAR})'
+_ONGOING = r'(?:present|current|now|to\s+date|till\s+date|date|today)'
+
+DATE_RANGE_PATTERN = re.compile(
+    rf'\b(?P<start>{_POINT})\s*(?:-|–|—|~|to|till|until)\s*(?P<end>{_POINT}|{_ONGOING})\b',
+    re.IGNORECASE
+)
+_ONGOING_PATTERN = re.compile(_ONGOING, re.IGNORECASE)
+_YEAR_PATTERN = re.compile(_YEAR)
+_MONTH_NAME_PATTERN = re.compile(r'[a-z]{3}', re.IGNORECASE)
+_NUMERIC_MONTH_PATTERN = re.compile(r'^(\d{1,2})\s*[/.]')
+
+# "5+ years of experience", "3.5 yrs relevant experience" - only claims tied to experience
+EXPERIENCE_CLAIM_PATTERN = re.compile(
+    r'\b(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:\w+\s+)?experience',
+    re.IGNORECASE
+)
+
+_MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+# Ranges longer than this are misreads, not careers
+MAX_RANGE_MONTHS = 50 * 12
+
+
+# Months are counted as year * 12 + month index, so intervals are plain ints
+def month_index(year, month):
+    return year * 12 + (month - 1)
+
+
+def format_month(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _parse_point(value, is_end, today):
+    if _ONGOING_PATTERN.fullmatch(value.strip()):
+        return month_index(today.year, today.month)
+
+    year = int(_YEAR_PATTERN.search(value).group(0))
+    month_name = _MONTH_NAME_PATTERN.match(value)
+    numeric_month = _NUMERIC_MONTH_PATTERN.match(value)
+    if month_name and month_name.group(0).lower() in _MONTHS:
+        month = _MONTHS.index(month_name.group(0).lower()) + 1
+    elif numeric_month:
+        month = int(numeric_month.group(1))
+    else:
+        # A bare year covers the whole year: January when starting, December when ending
+        month = 12 if is_end else 1
+    return month_index(year, month)
+
+
+# Parse one date-range string into an inclusive (start, end) month interval, or None
+def parse_date_range(value, today=None):
+    match = DATE_RANGE_PATTERN.search(value or '')
+    if not match:
+        return None
+    return _interval_from_match(match, today or date.today())
+
+
+def _interval_from_match(match, today):
+    start = _parse_point(match.group('start'), False, today)
+    end = _parse_point(match.group('end'), True, today)
+    if end < start or end - start + 1 > MAX_RANGE_MONTHS:
+        return None
+    return start, end
+
+
+# All date-range intervals mentioned in a piece of text
+def find_date_ranges(text, today=None):
+    today = today or date.today()
+    intervals = []
+    for match in DATE_RANGE_PATTERN.finditer(text or ''):
+        interval = _interval_from_match(match, today)
+        if interval:
+            intervals.append(interval)
+    return intervals
+
+
+# Intervals from the experience section(s) of a ResumeDocument; without one,
+# from everything except education, whose dates are study rather than work
+def document_intervals(doc, today=None):
+    spans = doc.section_spans('experience')
+    if not spans:
+        spans = [(s['start'], s['end']) for s in doc.sections if s['label'] != 'education']
+    return [interval for start, end in spans for interval in find_date_ranges(doc.text[start:end], today)]
+
+
+# Largest explicit "N years of experience" claim, in months
+def claimed_experience_months(text):
+    claims = [float(value) for value in EXPERIENCE_CLAIM_PATTERN.findall(text or '')]
+    return int(max(claims) * 12) if claims else 0
+
+
+# Merge overlapping or back-to-back intervals so concurrent roles count once
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def interval_months(interval):
+    return interval[1] - interval[0] + 1
+
+
+# Numeric experience columns for a set of intervals
+def build_timeline(intervals):
+    merged = merge_intervals(intervals)
+    return {
+        'experience_months': sum(interval_months(i) for i in merged),
+        'first_month': format_month(merged[0][0]) if merged else None,
+        'last_month': format_month(merged[-1][1]) if merged else None,
+        'experience_periods': [
+            {'start': format_month(start), 'end': format_month(end), 'months': end - start + 1}
+            for start, end in merged
+        ]
+    }
@@ -0,0 +1,162 @@
+import copy
+import time
+import threading
+from functools import lru_cache
+
+# Field extractors declare what they read and roughly what they cost, and a
+# Pipeline runs a chosen list of them over one ResumeDocument. The document's
+# normalized text, lines, sections and tokens are computed on first use and
+# shared by every extractor; skipped extractors contribute their empty
+# defaults, so records keep the same shape while a batch only pays for the
+# fields it needs.
+#
+#   @extractor('email', inputs=('sections', 'text'), cost=1, defaults={'email': None})
+#   def extract_email(doc, fields, resources):
+#       return {'email': ...}
+#
+# An input is one of DOCUMENT_INPUTS, the name of another extractor (which then
+# runs first and whose fields are visible in `fields`), or a resource the
+# caller passes to Pipeline.run, e.g. 'reference_data'.
+
+DOCUMENT_INPUTS = ('text', 'lines', 'sections', 'tokens')
+# Relative cost from which an extractor counts as expensive, see expensive_extractors()
+EXPENSIVE_COST = 5
+
+EXTRACTORS = {}
+
+
+class Extractor:
+    def __init__(self, name, func, inputs, cost, defaults):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        self.cost = cost
+        self.defaults = defaults
+
+    def dependencies(self):
+        return [name for name in self.inputs if name in EXTRACTORS]
+
+    def resources(self):
+        return [name for name in self.inputs if name not in DOCUMENT_INPUTS and name not in EXTRACTORS]
+
+
+# Register func(doc, fields, resources) -> {field: value} under name
+def extractor(name, inputs=('text',), cost=1, defaults=None):
+    def register(func):
+        EXTRACTORS[name] = Extractor(name, func, tuple(inputs), cost, defaults or {})
+        return func
+    return register
+
+
+# Run counts and time per extractor; workers send theirs to the parent with merge()
+class ExtractorTimings:
+    def __init__(self):
+        self.totals = {}  # name -> [runs, seconds]
+        self.lock = threading.Lock()
+
+    def merge(self, elapsed):
+        with self.lock:
+            for name, seconds in elapsed.items():
+                total = self.totals.setdefault(name, [0, 0.0])
+                total[0] += 1
+                total[1] += seconds
+
+    # Most expensive first
+    def snapshot(self):
+        with self.lock:
+            totals = sorted(self.totals.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            name: {'runs': runs, 'mean_ms': round(seconds * 1000 / runs, 3), 'total_ms': round(seconds * 1000, 1)}
+            for name, (runs, seconds) in totals
+        }
+
+
+# Extractors in an order where each one's dependencies come first
+def _ordered(names):
+    ordered = []
+    visiting = set()
+
+    def visit(name):
+        if any(e.name == name for e in ordered):
+            return
+        if name in visiting:
+            raise ValueError(f"Extractor '{name}' depends on itself")
+        visiting.add(name)
+        for dependency in EXTRACTORS[name].dependencies():
+            if dependency not in names:
+                raise ValueError(f"Extractor '{name}' needs '{dependency}'")
+            visit(dependency)
+        ordered.append(EXTRACTORS[name])
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+class Pipeline:
+    def __init__(self, names, skip=()):
+        unknown = unknown_extractors((*names, *skip))
+        if unknown:
+            raise ValueError(f"Unknown extractor(s): {', '.join(unknown)}")
+
+        self.extractors = []
+        self.skipped = []
+        for extractor in _ordered(list(names)):
+            # An extractor whose dependency is skipped can't run either
+            if extractor.name in skip or any(dep in self.skipped_names for dep in extractor.dependencies()):
+                self.skipped.append(extractor)
+            else:
+                self.extractors.append(extractor)
+        self.resources = sorted({name for e in self.extractors for name in e.resources()})
+        self.timings = ExtractorTimings()
+
+    @property
+    def skipped_names(self):
+        return [e.name for e in self.skipped]
+
+    # Every field at its empty value, for documents with no text
+    def defaults(self):
+        fields = {}
+        for extractor in self.skipped + self.extractors:
+            fields.update(copy.deepcopy(extractor.defaults))
+        return fields
+
+    # Fields of one document. resources holds what the extractors declared besides
+    # the document itself; per-extractor seconds go to self.timings and, if given, elapsed.
+    def run(self, doc, resources, elapsed=None):
+        missing = [name for name in self.resources if name not in resources]
+        if missing:
+            raise ValueError(f"Missing extractor resource(s): {', '.join(missing)}")
+
+        fields = {}
+        for extractor in self.skipped:
+            fields.update(copy.deepcopy(extractor.defaults))
+        times = {}
+        for extractor in self.extractors:
+            start = time.perf_counter()
+            fields.update(extractor.func(doc, fields, resources))
+            times[extractor.name] = time.perf_counter() - start
+        self.timings.merge(times)
+        if elapsed is not None:
+            elapsed.update(times)
+        return fields
+
+
+@lru_cache(maxsize=32)
+def _cached_pipeline(names, skip):
+    return Pipeline(names, skip)
+
+
+# Pipelines are cheap to build but are shared per configuration so their timings add up
+def get_pipeline(names, skip=()):
+    return _cached_pipeline(tuple(names), tuple(sorted(skip)))
+
+
+# The extractors among names a quick batch would skip
+def expensive_extractors(names):
+    return [name for name in names if EXTRACTORS[name].cost >= EXPENSIVE_COST]
+
+
+# Names in skip that aren't registered extractors, for validating user input
+def unknown_extractors(skip):
+    return [name for name in skip if name not in EXTRACTORS]
@@ -0,0 +1,281 @@
+import re
+from experience_timeline import DATE_RANGE_PATTERN, parse_date_range, document_intervals, claimed_experience_months, build_timeline
+from extractor_pipeline import extractor
+
+# The field extractors both apps build their records from, registered with
+# extractor_pipeline. Each reads a shared ResumeDocument plus the resources it
+# declares: the advanced parser's reference data, or the simple app's keyword
+# lists and normalizer.
+
+# Resources the advanced parser's extractors need besides the document
+def reference_resources(reference_data):
+    return {'reference_data': reference_data, 'skill_normalizer': reference_data['skill_normalizer']}
+
+# Robust email pattern
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# (123) 456-7890, 123 456 7890 and 1234567890 alike; the parentheses and
+# separators are optional, so one pattern covers all three formats
+_PHONE_PATTERN = re.compile(r'(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+# Email - the contact section first, then the whole text
+@extractor('email', inputs=('sections', 'text'), cost=1, defaults={'email': None})
+def extract_email(doc, fields, resources):
+    match = _EMAIL_PATTERN.search(doc.section_text('contact')) or _EMAIL_PATTERN.search(doc.text)
+    return {'email': match.group(0) if match else None}
+
+# Phone - the contact section first, then the whole text
+@extractor('phone', inputs=('sections', 'text'), cost=2, defaults={'phone': None})
+def extract_phone(doc, fields, resources):
+    match = _PHONE_PATTERN.search(doc.section_text('contact')) or _PHONE_PATTERN.search(doc.text)
+    return {'phone': match.group(0) if match else None}
+
+# Name - look at beginning of resume
+@extractor('name', inputs=('lines',), cost=1, defaults={'name': None})
+def extract_name(doc, fields, resources):
+    lines = doc.lines
+    for i in range(min(5, len(lines))):
+        line = lines[i].strip()
+        # Skip lines with email, phone, or address
+        if '@' in line or re.search(r'\d{3}', line) or 'address' in doc.lines_lower[i]:
+            continue
+        # Check if line is potential name (1-3 words, each capitalized)
+        words = line.split()
+        if 1 <= len(words) <= 3:
+            capitalized_words = [w for w in words if len(w) > 1 and w[0].isupper()]
+            if len(capitalized_words) == len(words) and len(words) >= 1:
+                return {'name': line}
+    return {'name': None}
+
+# Total experience from merged employment date ranges, as numeric columns
+# (experience_months, first/last month) that can be filtered and sorted directly
+@extractor('timeline', inputs=('sections', 'text'), cost=2, defaults=build_timeline([]))
+def extract_timeline(doc, fields, resources):
+    timeline = build_timeline(document_intervals(doc))
+    if not timeline['experience_months']:
+        # No dated roles, so fall back to an explicit "N years of experience"
+        timeline['experience_months'] = claimed_experience_months(doc.text)
+    return timeline
+
+# Projects - from the projects section
+@extractor('projects', inputs=('sections', 'lines'), cost=1, defaults={'projects': []})
+def extract_projects(doc, fields, resources):
+    projects_found = []
+    
+    for start, end in doc.section_spans('projects'):
+        # Split the projects section and process
+        lines = doc.lines_between(start, end)
+        current_project = None
+        
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            
+            # Check if this is a new project (often starts with a title)
+            if not line.startswith('•') and not line.startswith('-') and len(line) < 100:
+                if current_project:
+                    projects_found.append(current_project)
+                
+                current_project = {
+                    'title': line,
+                    'description': []
+                }
+            elif current_project:
+                # This line is part of the current project description
+                current_project['description'].append(line)
+        
+        # Add the last project
+        if current_project:
+            projects_found.append(current_project)
+    
+    # Limit project descriptions to 3 lines each
+    for project in projects_found:
+        if 'description' in project:
+            project['description'] = project['description'][:3]
+    
+    return {'projects': projects_found}
+
+# Skills - known skills and their aliases anywhere in the document, including
+# multi-word ones like "machine learning"
+@extractor('skills', inputs=('tokens', 'skill_normalizer'), cost=3, defaults={'skills': [], 'skill_ids': []})
+def extract_skills(doc, fields, resources):
+    skill_normalizer = resources['skill_normalizer']
+    skills_found = skill_normalizer.find_in_tokens(doc.tokens)
+    return {
+        'skills': sorted(skills_found),
+        'skill_ids': sorted(skill_normalizer.term_id(skill) for skill in skills_found)
+    }
+
+# Items listed in the skills section are skills by construction, so
+# misspelt ones are worth a (memoized) fuzzy lookup
+@extractor('listed_skills', inputs=('sections', 'skills', 'skill_normalizer'), cost=5)
+def extract_listed_skills(doc, fields, resources):
+    skill_normalizer = resources['skill_normalizer']
+    skills_found = set(fields['skills'])
+    for item in re.split(r'[,•●\n|/;]', doc.section_text('skills')):
+        item = item.strip()
+        if item and len(item.split()) <= skill_normalizer.max_words:
+            canonical = skill_normalizer.resolve(item)
+            if canonical:
+                skills_found.add(canonical)
+    return {
+        'skills': sorted(skills_found),
+        'skill_ids': sorted(skill_normalizer.term_id(skill) for skill in skills_found)
+    }
+
+# Education - look for degree mentions in the education section
+@extractor('education', inputs=('sections', 'text', 'reference_data'), cost=2, defaults={'education': []})
+def extract_education(doc, fields, resources):
+    reference_data = resources['reference_data']
+    text = doc.text
+    text_lower = doc.text_lower
+    education_found = []
+    
+    for start, end in doc.section_spans('education', fallback_to_full=True):
+        section_lower = text_lower[start:end]
+        for degree in reference_data['education_degrees']:
+            if degree.lower() in section_lower:
+                # Find the context around this degree
+                degree_pattern = reference_data['degree_patterns'][degree]
+                match = degree_pattern.search(text, start, end)
+                if match:
+                    # Extract context around the degree, without leaving the section
+                    context_start = max(start, match.start() - 100)
+                    context_end = min(end, match.end() + 100)
+                    context = text[context_start:context_end].strip()
+                    
+                    # university/institution name
+                    university_patterns = ['university', 'college', 'institute', 'school']
+                    university = None
+                    
+                    for uni_pattern in university_patterns:
+                        uni_match = re.search(f"\\b{uni_pattern}\\s+of\\s+[A-Z][a-zA-Z\\s]+\\b", context, re.IGNORECASE)
+                        if uni_match:
+                            university = uni_match.group(0)
+                            break
+                    
+                    if not university:
+                        # Word starting with capital followed by University
+                        for uni_pattern in university_patterns:
+                            uni_match = re.search(f"\\b[A-Z][a-zA-Z\\s]+\\s+{uni_pattern}\\b", context, re.IGNORECASE)
+                            if uni_match:
+                                university = uni_match.group(0)
+                                break
+                    
+                    # Look for graduation year
+                    year_match = re.search(r'\b(19|20)\d{2}\b', context)
+                    year = year_match.group(0) if year_match else None
+                    
+                    education_found.append({
+                        'degree': degree,
+                        'institution': university if university else "Institution name not found",
+                        'year': year
+                    })
+    
+    return {'education': education_found}
+
+# Work experience - look for job titles in the experience section
+@extractor('jobs', inputs=('sections', 'text', 'reference_data'), cost=5, defaults={'jobs': []})
+def extract_jobs(doc, fields, resources):
+    reference_data = resources['reference_data']
+    text = doc.text
+    text_lower = doc.text_lower
+    jobs_found = []
+    title_normalizer = reference_data['title_normalizer']
+    
+    for start, end in doc.section_spans('experience', fallback_to_full=True):
+        section_lower = text_lower[start:end]
+        # Each canonical title is searched together with its aliases ("Sr. Software Engineer")
+        for title, variants in reference_data['title_variants'].items():
+            if any(variant in section_lower for variant in variants):
+                title_pattern = reference_data['title_patterns'][title]
+                
+                for match in title_pattern.finditer(text, start, end):
+                    context_start = max(start, match.start() - 150)
+                    context_end = min(end, match.end() + 150)
+                    context = text[context_start:context_end].strip()
+                    found_title = match.group(0)
+                    
+                    # Look for company name and dates
+                    company = None
+                    date = None
+                
+                    # Check for a date range in context
+                    date_match = DATE_RANGE_PATTERN.search(context)
+                    if date_match:
+                        date = date_match.group(0)
+                    period = parse_date_range(date)
+                
+                    # Look for possible company name
+                    company_indicators = ['at', 'with', 'for', '-', '|', ',']
+                    for indicator in company_indicators:
+                        company_pattern = f"{re.escape(found_title)}\\s*{re.escape(indicator)}\\s*([A-Z][A-Za-z0-9\\s&.,]+)"
+                        company_match = re.search(company_pattern, context, re.IGNORECASE)
+                        if company_match:
+                            company = company_match.group(1).strip()
+                            break
+                
+                    if not company:
+                        # Company followed by job title
+                        for indicator in company_indicators:
+                            company_pattern = f"([A-Z][A-Za-z0-9\\s&.,]+)\\s*{re.escape(indicator)}\\s*{re.escape(found_title)}"
+                            company_match = re.search(company_pattern, context, re.IGNORECASE)
+                            if company_match:
+                                company = company_match.group(1).strip()
+                                break
+                
+                    # responsibilities/achievements (bullet points)
+                    responsibilities = []
+                    bullet_pattern = r'[•\-\*]\s*([^\n•\-\*]+)'
+                    bullet_matches = re.findall(bullet_pattern, context)
+                    responsibilities = [match.strip() for match in bullet_matches if len(match.strip()) > 10]
+                
+                    jobs_found.append({
+                        'title': title,
+                        'title_id': title_normalizer.term_id(title),
+                        'company': company if company else "Company name not found",
+                        'date': date if date else "Date not found",
+                        'start_month': period[0] if period else None,
+                        'end_month': period[1] if period else None,
+                        'months': period[1] - period[0] + 1 if period else None,
+                        'responsibilities': responsibilities[:3]  # Keep only first 3 responsibilities
+                    })
+    
+    return {'jobs': jobs_found}
+
+# The simple app's variants, which work from its own keyword lists
+# (resources 'skill_normalizer' and 'edu_keywords')
+
+# Fields the simple app extracts; skills and the experience timeline are shared with parse_resume
+SIMPLE_EXTRACTORS = ('keyword_name', 'skills', 'timeline', 'education_lines', 'personal_info')
+
+# Name - the first short line without contact details or resume boilerplate, title-cased
+@extractor('keyword_name', inputs=('lines',), cost=1, defaults={'name': None})
+def extract_keyword_name(doc, fields, resources):
+    lines = [line.strip() for line in doc.lines if line.strip()]
+    if not lines:
+        return {'name': None}
+    # Heuristic: skip lines with email/phone/keywords
+    for line in lines[:5]:
+        if not re.search(r'@|\d|curriculum|resume|cv|bachelor|master|phd|degree', line, re.I):
+            if 2 <= len(line.split()) <= 4:
+                return {'name': line.title()}
+    return {'name': lines[0].title()}
+
+# Education - every line mentioning one of the education keywords
+@extractor('education_lines', inputs=('lines', 'edu_keywords'), cost=1, defaults={'education': []})
+def extract_education_lines(doc, fields, resources):
+    edu_keywords = resources['edu_keywords']
+    return {'education': [line.strip() for line, line_lower in zip(doc.lines, doc.lines_lower)
+                          if any(word in line_lower for word in edu_keywords)]}
+
+# First email and phone-like number anywhere in the text
+@extractor('personal_info', inputs=('text',), cost=1, defaults={'personal_info': {'email': '', 'phone': ''}})
+def extract_personal_info(doc, fields, resources):
+    email = re.search(r'[\w\.-]+@[\w\.-]+', doc.text)
+    phone = re.search(r'(\+?\d[\d\-\s]{8,}\d)', doc.text)
+    return {'personal_info': {
+        "email": email.group(0) if email else "",
+        "phone": phone.group(0) if phone else ""
+    }}
@@ -0,0 +1,474 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import tempfile
+import threading
+from array import array
+from trigram_index import TrigramIndex
+from query_language import FieldIndex
+
+# The search index (search text, trigram and field postings, doc ID -> file path)
+# persisted next to the resume store, so startup opens it instead of indexing
+# every resume again. The snapshot is a directory of immutable segment files
+# plus a manifest:
+#
+#   manifest.json   format version, the store file it matches (size and mtime),
+#                   the doc count, and per segment the doc IDs it holds that
+#                   were replaced or removed since it was written
+#   seg-000001.bin  a header and JSON table of contents, then flat arrays:
+#                   doc IDs, paths, search texts, and for trigrams and field
+#                   terms a sorted key table with a posting list per key
+#
+# Segments are opened with mmap and searched in place, so a query only pages in
+# the keys and postings it touches. Each save of the store writes one new segment
+# with the resumes added or replaced since the last save; segments are merged
+# back into one when there are too many or too much of them is out of date.
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+SEGMENT_MAGIC = b'RSEG'
+# Merge segments when a save would leave more than this many...
+MAX_SEGMENTS = 8
+# ...or when this share of the entries in them is out of date
+MAX_MASKED_SHARE = 0.25
+
+_HEADER = struct.Struct('<4sII')  # magic, format version, table of contents length
+
+
+# Where the snapshot of a store lives: "parsed_resumes.json" -> "parsed_resumes_index/"
+def snapshot_dir(store_path):
+    return os.path.splitext(store_path)[0] + "_index"
+
+
+# Identifies one version of the store file; a snapshot is only used with the store it was saved with
+def store_stamp(store_path):
+    try:
+        stat = os.stat(store_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+# Field postings are stored under one key per (field, term): "skill\x1f:python",
+# "edu_year\x1f#2015"; None is the free-text field. Keys of one field sort together.
+def field_key(field, term):
+    kind = '#' if isinstance(term, int) else ':'
+    return f"{field or ''}\x1f{kind}{term}"
+
+
+def _field_prefix(field, numeric):
+    return f"{field or ''}\x1f{'#' if numeric else ':'}"
+
+
+def _field_keys(postings):
+    return {field_key(field, term): posting for field, terms in postings.items() for term, posting in terms.items()}
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _strings(values):
+    offsets = array('Q', [0])
+    blob = bytearray()
+    for value in values:
+        blob += value.encode('utf-8')
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+# key -> doc IDs as a sorted key table and concatenated posting lists
+def _key_table(postings):
+    key_offsets = array('Q', [0])
+    keys = bytearray()
+    posting_offsets = array('Q', [0])
+    values = array('I')
+    for key, posting in sorted((key.encode('utf-8'), posting) for key, posting in postings.items() if len(posting)):
+        keys += key
+        key_offsets.append(len(keys))
+        values.fromlist(list(posting))
+        posting_offsets.append(len(values))
+    return key_offsets, bytes(keys), posting_offsets, values
+
+
+# docs: doc ID -> (file path, search text); postings: key -> doc IDs
+def write_segment(path, docs, trigram_postings, field_postings):
+    doc_ids = array('I', sorted(docs))
+    sections = {'doc_ids': doc_ids}
+    sections['paths_offsets'], sections['paths'] = _strings(docs[doc_id][0] for doc_id in doc_ids)
+    sections['texts_offsets'], sections['texts'] = _strings(docs[doc_id][1] for doc_id in doc_ids)
+    for table, postings in (('trigram', trigram_postings), ('field', field_postings)):
+        (sections[f'{table}_key_offsets'], sections[f'{table}_keys'],
+         sections[f'{table}_posting_offsets'], sections[f'{table}_postings']) = _key_table(postings)
+
+    contents = {'byteorder': sys.byteorder, 'docs': len(doc_ids), 'sections': {}}
+    offset = 0
+    for name, data in sections.items():
+        typecode = data.typecode if isinstance(data, array) else 'B'
+        nbytes = len(data) * (data.itemsize if isinstance(data, array) else 1)
+        contents['sections'][name] = [offset, nbytes, typecode]
+        offset = _align(offset + nbytes)
+    header = json.dumps(contents).encode('utf-8')
+
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(_HEADER.pack(SEGMENT_MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(b'\0' * (_align(f.tell()) - f.tell()))
+        for data in sections.values():
+            f.write(data if isinstance(data, bytes) else data.tobytes())
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+    os.replace(tmp_path, path)
+
+
+# One segment file, read in place through mmap
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, header_size = _HEADER.unpack_from(self.mmap, 0)
+            if magic != SEGMENT_MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} index segment")
+            contents = json.loads(self.mmap[_HEADER.size:_HEADER.size + header_size])
+            if contents['byteorder'] != sys.byteorder:
+                raise ValueError(f"{path} was written on a machine with different byte order")
+            start = _align(_HEADER.size + header_size)
+            view = memoryview(self.mmap)
+            self.arrays = {}
+            for name, (offset, nbytes, typecode) in contents['sections'].items():
+                with view[start + offset:start + offset + nbytes] as section:
+                    self.arrays[name] = section.cast(typecode)
+            view.release()
+        except Exception:
+            self.close()
+            raise
+        self.doc_ids = self.arrays['doc_ids']
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def close(self):
+        for section in getattr(self, 'arrays', {}).values():
+            section.release()
+        self.arrays = {}
+        self.mmap.close()
+
+    # Position of doc_id in this segment, or None
+    def position(self, doc_id):
+        lo, hi = 0, len(self.doc_ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.doc_ids[mid] < doc_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self.doc_ids) and self.doc_ids[lo] == doc_id else None
+
+    def _string(self, name, i):
+        offsets = self.arrays[f'{name}_offsets']
+        return str(self.arrays[name][offsets[i]:offsets[i + 1]], 'utf-8')
+
+    def path_at(self, i):
+        return self._string('paths', i)
+
+    def text_at(self, i):
+        return self._string('texts', i)
+
+    def _key(self, table, i):
+        offsets = self.arrays[f'{table}_key_offsets']
+        return self.arrays[f'{table}_keys'][offsets[i]:offsets[i + 1]].tobytes()
+
+    def _key_count(self, table):
+        return len(self.arrays[f'{table}_key_offsets']) - 1
+
+    # First key position not below key (keys are sorted bytes)
+    def _lower_bound(self, table, key):
+        lo, hi = 0, self._key_count(table)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(table, mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, table, key):
+        key = key.encode('utf-8')
+        i = self._lower_bound(table, key)
+        return i if i < self._key_count(table) and self._key(table, i) == key else None
+
+    def _posting_at(self, table, i):
+        offsets = self.arrays[f'{table}_posting_offsets']
+        return self.arrays[f'{table}_postings'][offsets[i]:offsets[i + 1]].tolist()
+
+    def posting(self, table, key):
+        i = self._find(table, key)
+        return self._posting_at(table, i) if i is not None else []
+
+    def count(self, table, key):
+        i = self._find(table, key)
+        if i is None:
+            return 0
+        offsets = self.arrays[f'{table}_posting_offsets']
+        return offsets[i + 1] - offsets[i]
+
+    def keys(self, table, prefix):
+        encoded = prefix.encode('utf-8')
+        i = self._lower_bound(table, encoded)
+        while i < self._key_count(table):
+            key = self._key(table, i)
+            if not key.startswith(encoded):
+                break
+            yield key.decode('utf-8')
+            i += 1
+
+    def items(self, table):
+        for i in range(self._key_count(table)):
+            yield self._key(table, i).decode('utf-8'), self._posting_at(table, i)
+
+
+# The segments of one snapshot directory, oldest first. A doc ID's entries are
+# read from the newest segment holding it; older copies are masked out.
+class IndexSnapshot:
+    def __init__(self, directory):
+        self.directory = directory
+        self.segments = []
+        self.masked = []  # per segment: doc IDs whose entries there are out of date
+        self.docs = 0
+        self.next_segment = 1
+        self.lock = threading.Lock()
+
+    # The snapshot in directory if it was saved with this version of the store
+    # and holds exactly these resumes, else None
+    @classmethod
+    def open(cls, directory, stamp, resumes):
+        try:
+            with open(os.path.join(directory, MANIFEST_NAME), 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('format') != FORMAT_VERSION or stamp is None or manifest.get('store') != stamp:
+            return None
+        if manifest.get('docs') != len(resumes):
+            return None
+
+        snapshot = cls(directory)
+        snapshot.docs = manifest['docs']
+        snapshot.next_segment = manifest['next_segment']
+        try:
+            for entry in manifest['segments']:
+                snapshot.segments.append(Segment(os.path.join(directory, entry['file'])))
+                snapshot.masked.append(set(entry['masked']))
+            if snapshot.paths() != [resume['file_path'] for resume in resumes]:
+                snapshot.close()
+                return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error opening search index snapshot: {e}")
+            snapshot.close()
+            return None
+        return snapshot
+
+    def close(self):
+        with self.lock:
+            for segment in self.segments:
+                segment.close()
+            self.segments = []
+            self.masked = []
+
+    # (doc ID, segment, position) for every live entry
+    def _live(self):
+        for segment, masked in zip(self.segments, self.masked):
+            for i, doc_id in enumerate(segment.doc_ids):
+                if doc_id not in masked:
+                    yield doc_id, segment, i
+
+    def paths(self):
+        paths = [None] * self.docs
+        with self.lock:
+            for doc_id, segment, i in self._live():
+                paths[doc_id] = segment.path_at(i)
+        return paths
+
+    def search_texts(self):
+        texts = [''] * self.docs
+        with self.lock:
+            for doc_id, segment, i in self._live():
+                texts[doc_id] = segment.text_at(i)
+        return texts
+
+    # Live doc IDs under key, across segments
+    def posting(self, table, key):
+        doc_ids = []
+        with self.lock:
+            for segment, masked in zip(self.segments, self.masked):
+                posting = segment.posting(table, key)
+                if masked:
+                    posting = [d for d in posting if d not in masked]
+                doc_ids.extend(posting)
+        return doc_ids
+
+    # Upper bound; masked entries are still counted
+    def count(self, table, key):
+        with self.lock:
+            return sum(segment.count(table, key) for segment in self.segments)
+
+    def keys(self, table, prefix):
+        with self.lock:
+            return {key for segment in self.segments for key in segment.keys(table, prefix)}
+
+    # Mask out the live entry of doc_id (it was replaced or removed); False if there is none
+    def mask(self, doc_id):
+        with self.lock:
+            for segment, masked in zip(reversed(self.segments), reversed(self.masked)):
+                if segment.position(doc_id) is not None:
+                    if doc_id in masked:
+                        return False
+                    masked.add(doc_id)
+                    return True
+            return False
+
+    # Forget every segment (the index was cleared); the files go at the next save
+    def drop(self):
+        self.close()
+        self.docs = 0
+
+    def _segment_name(self):
+        name = f"seg-{self.next_segment:06d}.bin"
+        self.next_segment += 1
+        return name
+
+    def _needs_merge(self):
+        entries = sum(len(segment) for segment in self.segments)
+        masked = sum(len(m) for m in self.masked)
+        return len(self.segments) + 1 > MAX_SEGMENTS or (entries and masked / entries > MAX_MASKED_SHARE)
+
+    # Every live posting of the segments plus the unsaved ones, for merging
+    def _merged(self, table, unsaved):
+        merged = {}
+        for segment, masked in zip(self.segments, self.masked):
+            for key, posting in segment.items(table):
+                if masked:
+                    posting = [d for d in posting if d not in masked]
+                if posting:
+                    merged.setdefault(key, []).extend(posting)
+        for key, posting in unsaved.items():
+            merged.setdefault(key, []).extend(posting)
+        return merged
+
+    # Write the entries of the unsaved docs (paths/search_texts: every doc's),
+    # then the manifest for the store version stamp
+    def save(self, unsaved, paths, search_texts, trigram_postings, field_postings, stamp):
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            field_postings = _field_keys(field_postings)
+            if self.segments and self._needs_merge():
+                docs = {doc_id: (paths[doc_id], search_texts[doc_id]) for doc_id in range(len(paths))}
+                name = self._segment_name()
+                write_segment(os.path.join(self.directory, name), docs,
+                              self._merged('trigram', trigram_postings), self._merged('field', field_postings))
+                for segment in self.segments:
+                    segment.close()
+                self.segments = [Segment(os.path.join(self.directory, name))]
+                self.masked = [set()]
+            elif unsaved:
+                docs = {doc_id: (paths[doc_id], search_texts[doc_id]) for doc_id in unsaved}
+                name = self._segment_name()
+                write_segment(os.path.join(self.directory, name), docs, trigram_postings, field_postings)
+                self.segments.append(Segment(os.path.join(self.directory, name)))
+                self.masked.append(set())
+            self.docs = len(paths)
+
+            manifest = {
+                'format': FORMAT_VERSION,
+                'store': stamp,
+                'docs': self.docs,
+                'next_segment': self.next_segment,
+                'segments': [
+                    {'file': os.path.basename(segment.path), 'masked': sorted(masked)}
+                    for segment, masked in zip(self.segments, self.masked)
+                ]
+            }
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, os.path.join(self.directory, MANIFEST_NAME))
+
+            # Segments no longer in the manifest (merged, or from before a clear)
+            current = {entry['file'] for entry in manifest['segments']}
+            for name in os.listdir(self.directory):
+                if name.startswith('seg-') and name not in current:
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+
+
+# Trigram postings of the snapshot's segments, plus in-memory postings for
+# resumes added since it was saved
+class SnapshotTrigramIndex(TrigramIndex):
+    def __init__(self, snapshot, **kwargs):
+        super().__init__(**kwargs)
+        self.snapshot = snapshot
+
+    def remove(self, doc_id, text):
+        super().remove(doc_id, text)
+        self.snapshot.mask(doc_id)
+
+    def clear(self):
+        super().clear()
+        self.snapshot.drop()
+
+    def gram_counts(self, grams):
+        counts = super().gram_counts(grams)
+        for gram in grams:
+            counts.update(self.snapshot.posting('trigram', gram))
+        return counts
+
+
+# Field postings of the snapshot's segments, plus in-memory postings for
+# resumes added since it was saved
+class SnapshotFieldIndex(FieldIndex):
+    def __init__(self, snapshot):
+        super().__init__()
+        self.snapshot = snapshot
+        self.size = snapshot.docs
+
+    def remove(self, doc_id, resume, search_text):
+        super().remove(doc_id, resume, search_text)
+        # The trigram index may already have masked it; either way the cached
+        # bitmaps of its terms were built from the snapshot and still include it
+        self.snapshot.mask(doc_id)
+        with self.lock:
+            for key in self._doc_terms(resume, search_text):
+                self.bitmaps.pop(key, None)
+
+    def clear(self):
+        super().clear()
+        self.snapshot.drop()
+
+    def count(self, field, term):
+        return super().count(field, term) + self.snapshot.count('field', field_key(field, term))
+
+    def _doc_ids(self, field, term):
+        return list(super()._doc_ids(field, term) or ()) + self.snapshot.posting('field', field_key(field, term))
+
+    def terms(self, field):
+        vocabulary = self.vocabulary.get(field)
+        if vocabulary is None:
+            prefix = _field_prefix(field, numeric=False)
+            stored = {key[len(prefix):] for key in self.snapshot.keys('field', prefix)}
+            with self.lock:
+                vocabulary = self.vocabulary[field] = sorted(
+                    stored | {term for term in self.postings.get(field, {}) if isinstance(term, str)}
+                )
+        return vocabulary
+
+    def numbers(self, field):
+        prefix = _field_prefix(field, numeric=True)
+        stored = {int(key[len(prefix):]) for key in self.snapshot.keys('field', prefix)}
+        return list(stored | set(super().numbers(field)))
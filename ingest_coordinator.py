@@ -0,0 +1,334 @@
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import threading
+import subprocess
+from collections import deque
+from resume_store import load_resumes, save_resumes
+from text_store import TextStore, TEXT_STORE_DIR
+from resume_service import HttpError, read_request, write_json, skip_param
+
+# Splits a folder tree of PDFs into work units and hands them out over HTTP to
+# ingest workers (ingest_worker.py) on this machine or others:
+#   POST /lease?worker=NAME         next unit: {"unit", "lease", "paths", "skip", "lease_seconds"},
+#                                   or {"unit": null, "finished": true/false} if there is none now
+#   GET  /file?unit=&lease=&path=   the PDF, for workers that can't read the path themselves
+#   POST /result?unit=&lease=       one parsed resume (request body); renews the lease
+#   POST /complete?unit=&lease=     {"errors": [{"path", "error"}]} ends the unit
+#   GET  /status                    unit and file counts, workers, throughput
+# A lease that isn't renewed within LEASE_SECONDS expires, and the unit goes back
+# in the queue with only the files that have no result yet; after MAX_ATTEMPTS
+# leases it is marked failed. Results go into the central store (resume JSON and
+# text store) as they arrive, and files already in the store are not queued, so
+# a restarted coordinator carries on where it stopped.
+#
+#   python ingest_coordinator.py /archive/resumes --local-workers 4
+
+UNIT_SIZE = 50
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+REAP_INTERVAL_SECONDS = 5
+SAVE_DELAY_SECONDS = 30
+# How long to keep answering after the last unit, so idle workers hear it's finished
+FINISH_GRACE_SECONDS = 5
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingest_worker.py")
+
+
+# PDFs under root, in a stable order
+def find_pdfs(root):
+    for folder, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith('.pdf'):
+                yield os.path.join(folder, name)
+
+
+class WorkUnit:
+    def __init__(self, unit_id, paths):
+        self.id = unit_id
+        self.paths = paths
+        self.done = set()
+        self.errors = []
+        self.attempts = 0
+        self.state = 'pending'  # pending | leased | done | failed
+        self.lease = None
+        self.worker = None
+        self.expires = 0
+
+    # Files without a result yet
+    def remaining(self):
+        return [path for path in self.paths if path not in self.done]
+
+
+class IngestCoordinator:
+    def __init__(self, root, json_path, text_dir=TEXT_STORE_DIR, unit_size=UNIT_SIZE, skip=(),
+                 lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.json_path = json_path
+        self.text_store = TextStore(text_dir)
+        self.skip = list(skip)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.resumes = {resume['file_path']: resume for resume in load_resumes(json_path)}
+
+        paths = [path for path in find_pdfs(root) if path not in self.resumes]
+        self.units = {}
+        self.queue = deque()
+        for start in range(0, len(paths), unit_size):
+            unit = WorkUnit(str(len(self.units) + 1), paths[start:start + unit_size])
+            self.units[unit.id] = unit
+            self.queue.append(unit)
+        self.leased = {}  # unit ID -> unit, checked by the lease reaper
+        self.workers = {}  # worker name -> time last heard from
+        self.total_files = len(paths)
+        self.files_done = 0
+        self.files_failed = 0
+        self.started = time.time()
+        self.save_handle = None
+        self.save_lock = threading.Lock()
+        self.finished = asyncio.Event()
+        if not self.units:
+            self.finished.set()
+
+    def _finish_if_done(self):
+        if not self.queue and not self.leased and not self.finished.is_set():
+            self.finished.set()
+
+    # Put a unit whose lease ended early back in the queue, or give up on it
+    def _retry(self, unit, reason):
+        self.leased.pop(unit.id, None)
+        unit.lease = None
+        if unit.attempts >= self.max_attempts:
+            unit.state = 'failed'
+            remaining = unit.remaining()
+            self.files_failed += len(remaining)
+            unit.errors.extend({'path': path, 'error': f"gave up after {unit.attempts} attempts ({reason})"} for path in remaining)
+        else:
+            unit.state = 'pending'
+            self.queue.append(unit)
+        self._finish_if_done()
+
+    async def reap_leases(self):
+        while True:
+            await asyncio.sleep(REAP_INTERVAL_SECONDS)
+            now = time.time()
+            for unit in [u for u in self.leased.values() if u.expires < now]:
+                print(f"Lease on unit {unit.id} held by {unit.worker} expired")
+                self._retry(unit, "lease expired")
+
+    def lease(self, worker):
+        self.workers[worker] = time.time()
+        if not self.queue:
+            return {'unit': None, 'finished': self.finished.is_set()}
+        unit = self.queue.popleft()
+        unit.state = 'leased'
+        unit.attempts += 1
+        unit.lease = uuid.uuid4().hex
+        unit.worker = worker
+        unit.expires = time.time() + self.lease_seconds
+        self.leased[unit.id] = unit
+        return {'unit': unit.id, 'lease': unit.lease, 'paths': unit.remaining(),
+                'skip': self.skip, 'lease_seconds': self.lease_seconds}
+
+    # The unit a request names, if the request still holds its lease
+    def _leased_unit(self, params):
+        unit = self.units.get(params.get('unit', ''))
+        if unit is None:
+            raise HttpError(404, "Unknown work unit")
+        if unit.state != 'leased' or unit.lease != params.get('lease'):
+            raise HttpError(409, "Lease expired or held by another worker")
+        unit.expires = time.time() + self.lease_seconds
+        self.workers[unit.worker] = time.time()
+        return unit
+
+    async def add_result(self, unit, result):
+        file_path = result.get('file_path')
+        if file_path not in unit.paths:
+            raise HttpError(400, f"{file_path} is not part of unit {unit.id}")
+        if result.get('raw_text'):
+            await asyncio.get_running_loop().run_in_executor(None, self.text_store.put, file_path, result.pop('raw_text'))
+        self.resumes[file_path] = result
+        if file_path not in unit.done:
+            unit.done.add(file_path)
+            self.files_done += 1
+        self.schedule_save()
+
+    def complete(self, unit, errors):
+        failed = {error.get('path'): error for error in errors if error.get('path') in unit.paths}
+        missing = [path for path in unit.remaining() if path not in failed]
+        if missing:
+            # The worker skipped files; lease them out again
+            self._retry(unit, f"{len(missing)} files not returned")
+            return
+        unit.errors.extend(failed.values())
+        self.files_failed += len(failed)
+        unit.state = 'done'
+        unit.lease = None
+        self.leased.pop(unit.id, None)
+        self._finish_if_done()
+
+    # Writes are batched: results arriving within SAVE_DELAY_SECONDS cost one save
+    def schedule_save(self):
+        if self.save_handle is None:
+            loop = asyncio.get_running_loop()
+            self.save_handle = loop.call_later(SAVE_DELAY_SECONDS, self._save_in_background, loop)
+
+    def _save_in_background(self, loop):
+        self.save_handle = None
+        loop.run_in_executor(None, self._write, list(self.resumes.values()))
+
+    def save(self):
+        if self.save_handle is not None:
+            self.save_handle.cancel()
+            self.save_handle = None
+        self._write(list(self.resumes.values()))
+
+    def _write(self, resumes):
+        with self.save_lock:
+            try:
+                save_resumes(self.json_path, resumes)
+            except Exception as e:
+                print(f"Error saving to JSON: {e}")
+
+    def status(self):
+        elapsed = time.time() - self.started
+        states = {}
+        for unit in self.units.values():
+            states[unit.state] = states.get(unit.state, 0) + 1
+        return {
+            'finished': self.finished.is_set(),
+            'units': states,
+            'files': {'total': self.total_files, 'done': self.files_done, 'failed': self.files_failed},
+            'files_per_second': round(self.files_done / elapsed, 2) if elapsed else 0,
+            'workers': {name: round(time.time() - seen, 1) for name, seen in self.workers.items()},
+            'errors': [error for unit in self.units.values() for error in unit.errors][:100]
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            request = await read_request(reader)
+            if request is not None:
+                await self.route(writer, *request)
+        except HttpError as e:
+            await write_json(writer, e.status, {'error': e.message})
+        except Exception as e:
+            try:
+                await write_json(writer, 500, {'error': str(e)})
+            except Exception:
+                pass
+        finally:
+            writer.close()
+
+    async def route(self, writer, method, path, params, body):
+        if path == '/status':
+            await write_json(writer, 200, self.status())
+        elif path == '/lease' and method == 'POST':
+            await write_json(writer, 200, self.lease(params.get('worker') or 'unnamed'))
+        elif path == '/file':
+            unit = self._leased_unit(params)
+            if params.get('path') not in unit.paths:
+                raise HttpError(400, f"{params.get('path')} is not part of unit {unit.id}")
+            data = await asyncio.get_running_loop().run_in_executor(None, _read_file, params['path'])
+            await write_pdf(writer, data)
+        elif path == '/result' and method == 'POST':
+            unit = self._leased_unit(params)
+            await self.add_result(unit, _json_body(body))
+            await write_json(writer, 200, {'unit': unit.id, 'done': len(unit.done)})
+        elif path == '/complete' and method == 'POST':
+            unit = self._leased_unit(params)
+            self.complete(unit, _json_body(body).get('errors') or [])
+            await write_json(writer, 200, {'unit': unit.id, 'state': unit.state})
+        else:
+            raise HttpError(404, f"No route for {method} {path}")
+
+
+def _json_body(body):
+    try:
+        return json.loads(body or b'{}')
+    except ValueError:
+        raise HttpError(400, "Request body must be JSON")
+
+
+def _read_file(file_path):
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+async def write_pdf(writer, data):
+    head = ("HTTP/1.1 200 OK\r\n"
+            "Content-Type: application/pdf\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n")
+    writer.write(head.encode('latin-1') + data)
+    await writer.drain()
+
+
+# Worker processes on this machine, for running the whole setup locally
+def start_local_workers(count, url, processes):
+    return [
+        subprocess.Popen([sys.executable, WORKER_SCRIPT, '--coordinator', url,
+                          '--processes', str(processes), '--name', f"local-{i + 1}"])
+        for i in range(count)
+    ]
+
+
+async def serve(coordinator, host, port, local_workers, worker_processes):
+    server = await asyncio.start_server(coordinator.handle, host, port)
+    reaper = asyncio.get_running_loop().create_task(coordinator.reap_leases())
+    print(f"Ingest coordinator listening on http://{host}:{port}: {coordinator.total_files} files "
+          f"in {len(coordinator.units)} units ({len(coordinator.resumes)} already in the store)")
+    workers = start_local_workers(local_workers, f"http://{host}:{port}", worker_processes)
+    try:
+        async with server:
+            await coordinator.finished.wait()
+            await asyncio.sleep(FINISH_GRACE_SECONDS)
+    finally:
+        reaper.cancel()
+        coordinator.save()
+        for process in workers:
+            try:
+                process.wait(timeout=FINISH_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+
+    status = coordinator.status()
+    print(f"Parsed {status['files']['done']} files, {status['files']['failed']} failed, "
+          f"{status['files_per_second']} files/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hand out a folder tree of resumes to ingest workers and collect the results")
+    parser.add_argument('root', help="folder to ingest, searched recursively for PDFs")
+    parser.add_argument('--host', default='127.0.0.1', help="use 0.0.0.0 to accept workers on other hosts")
+    parser.add_argument('--port', type=int, default=8770)
+    parser.add_argument('--json-path', default=os.path.join(os.getcwd(), "parsed_resumes.json"))
+    parser.add_argument('--text-dir', default=TEXT_STORE_DIR)
+    parser.add_argument('--unit-size', type=int, default=UNIT_SIZE, help="files per work unit")
+    parser.add_argument('--lease-seconds', type=int, default=LEASE_SECONDS)
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+    parser.add_argument('--skip', default='', help="extractors to leave out, e.g. 'expensive' or 'jobs,education'")
+    parser.add_argument('--local-workers', type=int, default=0, help="start this many workers on this machine")
+    parser.add_argument('--worker-processes', type=int, default=1, help="parse processes per local worker")
+    args = parser.parse_args()
+
+    try:
+        skip = skip_param(args.skip)
+    except HttpError as e:
+        parser.error(e.message)
+
+    async def run():
+        coordinator = IngestCoordinator(args.root, args.json_path, args.text_dir, args.unit_size, skip,
+                                         args.lease_seconds, args.max_attempts)
+        await serve(coordinator, args.host, args.port, args.local_workers, args.worker_processes)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import socket
+import argparse
+import tempfile
+import http.client
+from urllib.parse import urlsplit, urlencode
+from concurrent.futures import as_completed
+from reference_data import load_reference_data
+from parse_pool import ParsePool
+
+# Ingest worker for ingest_coordinator.py: leases a work unit, parses its files
+# in a ParsePool on this machine and uploads each result as it finishes (which
+# also renews the lease), then asks for the next unit. Files are read in place
+# when this machine sees the same path (same host or shared mount), otherwise
+# downloaded from the coordinator. Stops once the coordinator has no work left.
+#
+#   python ingest_worker.py --coordinator http://ingest-host:8770 --processes 8
+
+POLL_SECONDS = 2.0
+# Give up after this many failed attempts in a row to reach the coordinator
+CONNECT_ATTEMPTS = 10
+REQUEST_TIMEOUT_SECONDS = 60
+
+
+class LeaseLost(Exception):
+    pass
+
+
+class CoordinatorClient:
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+
+    # (status, body bytes) of one request
+    def request(self, method, path, params=None, body=b''):
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT_SECONDS)
+        try:
+            connection.request(method, path, body=body, headers={'Content-Length': str(len(body))})
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def request_json(self, method, path, params=None, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        status, data = self.request(method, path, params, body)
+        if status == 409:
+            raise LeaseLost(json.loads(data).get('error'))
+        if status != 200:
+            raise RuntimeError(f"{method} {path} failed with {status}: {data[:200]!r}")
+        return json.loads(data)
+
+
+class IngestWorker:
+    def __init__(self, coordinator_url, processes=None, name=None):
+        self.client = CoordinatorClient(coordinator_url)
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.pool = ParsePool(load_reference_data(), max_workers=processes)
+        self.files_done = 0
+
+    # Next unit, or None once the coordinator is finished
+    def next_unit(self):
+        failures = 0
+        while True:
+            try:
+                unit = self.client.request_json('POST', '/lease', {'worker': self.name})
+                failures = 0
+            except (OSError, http.client.HTTPException) as e:
+                failures += 1
+                if failures >= CONNECT_ATTEMPTS:
+                    print(f"Error reaching coordinator: {e}")
+                    return None
+                time.sleep(POLL_SECONDS)
+                continue
+            if unit['unit'] is not None:
+                return unit
+            if unit['finished']:
+                return None
+            # Everything is leased out; one may still expire and come back
+            time.sleep(POLL_SECONDS)
+
+    # Path this machine can read the file at, downloading it if needed
+    def local_copy(self, lease, path, folder):
+        if os.path.exists(path):
+            return path
+        status, data = self.client.request('GET', '/file', {**lease, 'path': path})
+        if status == 409:
+            raise LeaseLost(path)
+        if status != 200:
+            raise RuntimeError(f"Could not download {path}: {status}")
+        local_path = os.path.join(folder, f"{len(os.listdir(folder))}_{os.path.basename(path)}")
+        with open(local_path, 'wb') as f:
+            f.write(data)
+        return local_path
+
+    def work(self, unit):
+        lease = {'unit': unit['unit'], 'lease': unit['lease']}
+        errors = []
+        with tempfile.TemporaryDirectory(prefix='ingest_') as folder:
+            futures = {}
+            for path in unit['paths']:
+                futures[self.pool.submit(self.local_copy(lease, path, folder), unit['skip'])] = path
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append({'path': path, 'error': str(e)})
+                    continue
+                result['file_path'] = path
+                self.client.request_json('POST', '/result', lease, result)
+                self.files_done += 1
+        self.client.request_json('POST', '/complete', lease, {'errors': errors})
+
+    def run(self):
+        try:
+            while True:
+                unit = self.next_unit()
+                if unit is None:
+                    break
+                try:
+                    self.work(unit)
+                except LeaseLost as e:
+                    # Another worker has the unit now
+                    print(f"Lost lease on unit {unit['unit']}: {e}")
+                except (OSError, http.client.HTTPException, RuntimeError) as e:
+                    # The lease runs out and the unit is retried elsewhere
+                    print(f"Error working on unit {unit['unit']}: {e}")
+        finally:
+            self.pool.shutdown()
+        print(f"Worker {self.name} parsed {self.files_done} files")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse resumes handed out by an ingest coordinator")
+    parser.add_argument('--coordinator', default='http://127.0.0.1:8770')
+    parser.add_argument('--processes', type=int, default=None, help="parse processes (default: CPU count - 1)")
+    parser.add_argument('--name', default=None, help="name shown in the coordinator's status (default: host-pid)")
+    args = parser.parse_args()
+
+    try:
+        IngestWorker(args.coordinator, args.processes, args.name).run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import time
+import json
+import asyncio
+import argparse
+from urllib.parse import quote
+from perf_metrics import percentile
+
+# Load-test client for resume_service.py: optionally uploads a folder of PDFs,
+# then fires concurrent search (and match) requests and reports latency percentiles.
+
+
+def _dechunk(body):
+    data = b''
+    while body:
+        size_line, _, body = body.partition(b'\r\n')
+        size = int(size_line.split(b';')[0] or b'0', 16)
+        if size == 0:
+            break
+        data += body[:size]
+        body = body[size + 2:]
+    return data
+
+
+async def http_request(host, port, method, path, body=b''):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = (f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {host}:{port}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+
+    head, _, payload = response.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    if b'transfer-encoding: chunked' in head.lower():
+        payload = _dechunk(payload)
+    return status, payload
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, name, seconds, ok):
+        self.latencies.setdefault(name, []).append(seconds * 1000)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed):
+        total = sum(len(v) for v in self.latencies.values())
+        print(f"\n{total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s)")
+        print(f"{'endpoint':<10}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            print(f"{name:<10}{len(values):>8}{self.errors.get(name, 0):>8}"
+                  f"{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}"
+                  f"{percentile(values, 99):>10.1f}{values[-1]:>10.1f}")
+
+
+async def timed(stats, name, host, port, method, path, body=b''):
+    start = time.perf_counter()
+    try:
+        status, payload = await http_request(host, port, method, path, body)
+        ok = status < 400
+    except Exception:
+        ok, payload = False, b''
+    stats.record(name, time.perf_counter() - start, ok)
+    return payload
+
+
+async def upload_folder(stats, host, port, folder, concurrency):
+    paths = [os.path.join(folder, n) for n in sorted(os.listdir(folder)) if n.lower().endswith('.pdf')]
+    remaining = iter(paths)
+
+    async def worker():
+        for path in remaining:
+            with open(path, 'rb') as f:
+                data = f.read()
+            await timed(stats, 'parse', host, port, 'POST', f"/parse?filename={quote(os.path.basename(path))}", data)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(paths)
+
+
+async def run(args):
+    stats = Stats()
+    start = time.perf_counter()
+
+    if args.upload:
+        count = await upload_folder(stats, args.host, args.port, args.upload, args.concurrency)
+        print(f"Uploaded {count} PDFs")
+
+    queries = [q.strip() for q in args.queries.split(',') if q.strip()]
+    jd_text = b''
+    if args.match_file:
+        with open(args.match_file, 'rb') as f:
+            jd_text = f.read()
+
+    counter = iter(range(args.requests))
+
+    async def worker():
+        for i in counter:
+            if jd_text and i % args.match_every == 0:
+                await timed(stats, 'match', args.host, args.port, 'POST', '/match?limit=20', jd_text)
+            else:
+                query = queries[i % len(queries)]
+                await timed(stats, 'search', args.host, args.port, 'GET', f"/search?q={quote(query)}&limit=20")
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    stats.report(time.perf_counter() - start)
+
+    _, health = await http_request(args.host, args.port, 'GET', '/health')
+    print(f"Service: {json.loads(health)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test a local resume_service.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--queries', default="python,java,manager,sql,excel,compliance,audit")
+    parser.add_argument('--upload', help="folder of PDFs to upload and parse first")
+    parser.add_argument('--match-file', help="job description text file for /match requests")
+    parser.add_argument('--match-every', type=int, default=10, help="send a /match request every N requests")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
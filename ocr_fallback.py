@@ -0,0 +1,148 @@
+import os
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pytesseract # local Tesseract OCR
+except ImportError:
+    pytesseract = None
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+# OCR is slow and CPU-heavy, so it gets its own small pool and a cap on queued
+# pages; text-native pages never go near it
+OCR_MAX_WORKERS = 2
+OCR_MAX_PENDING_PAGES = 16
+OCR_RESOLUTION = 300
+OCR_CACHE_DIR = os.path.join(os.getcwd(), "ocr_cache")
+
+
+# A page needs OCR when it has no text layer but does carry images (a scan)
+def needs_ocr(page, extracted_text):
+    return not (extracted_text or '').strip() and bool(getattr(page, 'images', None))
+
+
+# Runs in a worker process: render one page and OCR it
+def _ocr_page(file_path, page_number, resolution):
+    with pdfplumber.open(file_path) as pdf:
+        image = pdf.pages[page_number].to_image(resolution=resolution).original
+    return pytesseract.image_to_string(image)
+
+
+def _file_digest(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OcrPool:
+    def __init__(self, max_workers=OCR_MAX_WORKERS, max_pending=OCR_MAX_PENDING_PAGES, cache_dir=OCR_CACHE_DIR):
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.cache = {}
+        self.pending = threading.BoundedSemaphore(max_pending)
+        self.executor = None
+        self.lock = threading.Lock()
+        self.pages_ocred = 0
+        self.cache_hits = 0
+        self.warned_unavailable = False
+
+    @property
+    def available(self):
+        return pytesseract is not None and pdfplumber is not None
+
+    def _get_executor(self):
+        # Started on first scanned page, so text-only sessions never spawn it
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self.executor
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def _cached(self, key):
+        if key in self.cache:
+            return self.cache[key]
+        path = self._cache_path(key)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.cache[key] = f.read()
+            return self.cache[key]
+        return None
+
+    def _store(self, key, text):
+        self.cache[key] = text
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._cache_path(key), 'w', encoding='utf-8') as f:
+                f.write(text)
+        except Exception as e:
+            print(f"Error writing OCR cache: {e}")
+
+    # OCR the given page numbers of a PDF, returning {page_number: text}
+    def ocr_pages(self, file_path, page_numbers):
+        results = {}
+        if not page_numbers:
+            return results
+        if not self.available:
+            if not self.warned_unavailable:
+                print("Scanned PDF pages found, but OCR needs pytesseract and a local Tesseract install")
+                self.warned_unavailable = True
+            return results
+
+        file_hash = _file_digest(file_path)
+        futures = {}
+        for page_number in page_numbers:
+            key = f"{file_hash}_{page_number}"
+            cached = self._cached(key)
+            if cached is not None:
+                self.cache_hits += 1
+                results[page_number] = cached
+                continue
+
+            self.pending.acquire()
+            try:
+                future = self._get_executor().submit(_ocr_page, file_path, page_number, OCR_RESOLUTION)
+            except Exception:
+                self.pending.release()
+                raise
+            future.add_done_callback(lambda _: self.pending.release())
+            futures[page_number] = (key, future)
+
+        for page_number, (key, future) in futures.items():
+            try:
+                text = future.result()
+            except Exception as e:
+                print(f"Error running OCR on page {page_number + 1} of {file_path}: {e}")
+                continue
+            self.pages_ocred += 1
+            self._store(key, text)
+            results[page_number] = text
+
+        return results
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Process-wide OCR pool shared by every parser thread
+def get_ocr_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OcrPool()
+        return _pool
@@ -0,0 +1,179 @@
+import os
+import gc
+import mmap
+import pickle
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from resume_document import ResumeDocument
+from extractor_pipeline import ExtractorTimings
+from resume_extraction import read_pdf_pages, join_pages, parse_resume_text, extract_reference_fields
+from ocr_fallback import get_ocr_pool, OCR_MAX_WORKERS
+from text_store import TextStore
+
+# Compiled reference data as seen by this worker process
+_worker_reference_data = None
+
+# Normalizers whose fuzzy-match memo entries travel back from the workers
+MEMO_NORMALIZERS = ('skill_normalizer', 'title_normalizer')
+
+
+# Worker initializer. Forked workers already hold the parent's reference data
+# (copy-on-write); spawned ones load the pre-built pickle through mmap instead
+# of re-reading the CSVs and rebuilding normalizers and patterns.
+def _init_worker(reference_path):
+    global _worker_reference_data
+    if reference_path is not None:
+        with open(reference_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                _worker_reference_data = pickle.loads(mapped)
+    # Start recording new memo entries, so each result can carry them home
+    _take_new_memo()
+
+
+def _take_new_memo():
+    return {name: _worker_reference_data[name].take_new_memo()
+            for name in MEMO_NORMALIZERS if name in _worker_reference_data}
+
+
+def _ready():
+    return True
+
+
+# A PDF with scanned pages comes back unparsed, with its page texts: the parent
+# OCRs those pages in its one OCR pool and sends the text back for parsing
+def _parse_in_worker(file_path, skip=()):
+    page_texts, scanned_pages = read_pdf_pages(file_path)
+    if scanned_pages:
+        return {'file_path': file_path, 'page_texts': page_texts, 'scanned_pages': scanned_pages}
+    return _parse_text_in_worker(file_path, join_pages(page_texts), skip)
+
+
+# The extractor timings and new memo entries travel back with the result and
+# are merged by the parent
+def _parse_text_in_worker(file_path, text, skip=()):
+    elapsed = {}
+    result = parse_resume_text(file_path, text, _worker_reference_data, skip, elapsed)
+    result['extractor_seconds'] = elapsed
+    result['new_memo'] = _take_new_memo()
+    return result
+
+
+# Workers read the stored text themselves, so the parent never holds it all
+def _reindex_in_worker(text_dir, file_path):
+    text = TextStore(text_dir).get(file_path)
+    if not text:
+        return None, _take_new_memo()
+    return extract_reference_fields(ResumeDocument(text), _worker_reference_data), _take_new_memo()
+
+
+# Process pool for parse_resume that builds the reference data once, in the parent
+class ParsePool:
+    def __init__(self, reference_data, max_workers=None, timings=None):
+        global _worker_reference_data
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.reference_data = reference_data
+        self.reference_path = None
+        # Threads that wait on the OCR pool for files with scanned pages
+        self.ocr_threads = None
+        self.lock = threading.Lock()
+        # Per-extractor time across every worker; callers may pass their own to add to
+        self.timings = timings if timings is not None else ExtractorTimings()
+
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # Freeze what exists now so the workers' garbage collector doesn't
+            # write to (and so un-share) the inherited reference pages
+            _worker_reference_data = reference_data
+            gc.collect()
+            gc.freeze()
+            context = multiprocessing.get_context('fork')
+        else:
+            fd, self.reference_path = tempfile.mkstemp(prefix='resume_reference_', suffix='.pickle')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(reference_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            context = multiprocessing.get_context('spawn')
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.reference_path,)
+        )
+        # Start every worker now rather than on the first real job: forked
+        # workers would otherwise inherit whatever sockets and files the
+        # parent has open at that moment (e.g. a client connection)
+        self.executor.submit(_ready).result()
+        # The workers exist now (a fork pool starts them all at once), so the
+        # parent can collect its own garbage again
+        if gc.get_freeze_count():
+            gc.unfreeze()
+
+    def _merge_memo(self, new_memo):
+        for name, entries in new_memo.items():
+            if entries:
+                self.reference_data[name].merge_memo(entries)
+
+    def _collect(self, result):
+        self.timings.merge(result.pop('extractor_seconds', {}))
+        self._merge_memo(result.pop('new_memo', {}))
+        return result
+
+    def _get_ocr_threads(self):
+        with self.lock:
+            if self.ocr_threads is None:
+                self.ocr_threads = ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS)
+            return self.ocr_threads
+
+    def _resolve(self, future, worker_future, skip):
+        try:
+            result = worker_future.result()
+            if 'scanned_pages' in result:
+                self._get_ocr_threads().submit(self._ocr_and_parse, future, result, skip)
+            else:
+                future.set_result(self._collect(result))
+        except BaseException as e:
+            future.set_exception(e)
+
+    # Runs on an OCR thread: fill in the scanned pages, then parse in a worker
+    def _ocr_and_parse(self, future, result, skip):
+        try:
+            page_texts = result['page_texts']
+            for i, ocr_text in get_ocr_pool().ocr_pages(result['file_path'], result['scanned_pages']).items():
+                page_texts[i] = ocr_text
+            self.executor.submit(
+                _parse_text_in_worker, result['file_path'], join_pages(page_texts), skip
+            ).add_done_callback(lambda worker_future: self._resolve(future, worker_future, skip))
+        except BaseException as e:
+            future.set_exception(e)
+
+    # skip names extractors to leave out for this file or batch (see parse_resume)
+    def submit(self, file_path, skip=()):
+        future = Future()
+        skip = tuple(skip)
+        self.executor.submit(_parse_in_worker, file_path, skip).add_done_callback(
+            lambda worker_future: self._resolve(future, worker_future, skip)
+        )
+        return future
+
+    # Parse files in parallel, yielding results in input order
+    def map(self, file_paths, skip=()):
+        futures = [self.submit(file_path, skip) for file_path in file_paths]
+        return (future.result() for future in futures)
+
+    # Recompute reference-dependent fields from stored text, in input order
+    def reindex(self, text_dir, file_paths):
+        results = self.executor.map(_reindex_in_worker, [text_dir] * len(file_paths), file_paths, chunksize=16)
+        for fields, new_memo in results:
+            self._merge_memo(new_memo)
+            yield fields
+
+    def shutdown(self):
+        # OCR threads first: they may still hand text to the workers
+        if self.ocr_threads is not None:
+            self.ocr_threads.shutdown(wait=True)
+            self.ocr_threads = None
+        self.executor.shutdown(wait=True)
+        if self.reference_path and os.path.exists(self.reference_path):
+            os.remove(self.reference_path)
+            self.reference_path = None
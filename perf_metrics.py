@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import threading
+import tracemalloc
+from collections import deque
+
+try:
+    import resource # Unix only; used for peak RSS where /proc isn't available
+except ImportError:
+    resource = None
+
+# Lightweight in-process counters for the performance panel and the service's
+# /metrics endpoint. Recording is a deque append; percentiles and rates are only
+# computed when a snapshot is taken.
+
+LATENCY_SAMPLES = 1000
+INGEST_WINDOW_SECONDS = 60
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[int(round(pct / 100 * (len(sorted_values) - 1)))]
+
+
+# Current resident set size in MB (peak RSS when the current value isn't available)
+def process_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return peak / (1024 * 1024) if peak > 1 << 30 else peak / 1024
+    return None
+
+
+class PerfMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.search_latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.ingest_times = deque()
+        self.ingested_total = 0
+        self.queue_depth = 0
+        self.gauges = {}
+
+    def record_search(self, seconds):
+        with self.lock:
+            self.search_latencies.append(seconds * 1000)
+
+    def record_ingest(self, count=1):
+        now = time.monotonic()
+        with self.lock:
+            self.ingested_total += count
+            for _ in range(count):
+                self.ingest_times.append(now)
+
+    def set_queue_depth(self, depth):
+        self.queue_depth = depth
+
+    # Values read at snapshot time, e.g. register('index_size', lambda: len(index))
+    def register(self, name, source):
+        self.gauges[name] = source
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            while self.ingest_times and now - self.ingest_times[0] > INGEST_WINDOW_SECONDS:
+                self.ingest_times.popleft()
+            recent_ingests = len(self.ingest_times)
+            latencies = sorted(self.search_latencies)
+
+        snapshot = {
+            'ingest_per_minute': recent_ingests * 60 / INGEST_WINDOW_SECONDS,
+            'ingested_total': self.ingested_total,
+            'queue_depth': self.queue_depth,
+            'search_p50_ms': round(percentile(latencies, 50), 2),
+            'search_p95_ms': round(percentile(latencies, 95), 2),
+            'searches_sampled': len(latencies),
+            'rss_mb': process_rss_mb()
+        }
+        if tracemalloc.is_tracing():
+            snapshot['traced_mb'] = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+        for name, source in list(self.gauges.items()):
+            try:
+                snapshot[name] = source()
+            except Exception as e:
+                snapshot[name] = f"error: {e}"
+        return snapshot
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), default=str)
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+# Process-wide metrics shared by the UI, parse threads and the service
+def get_metrics():
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = PerfMetrics()
+        return _metrics
+
+
+# Memo effectiveness of a TermNormalizer (exact hits aren't counted, only memo vs fuzzy)
+def normalizer_stats(normalizer):
+    lookups = normalizer.memo_hits + normalizer.fuzzy_calls
+    return {
+        'memo_hits': normalizer.memo_hits,
+        'fuzzy_calls': normalizer.fuzzy_calls,
+        'hit_rate': round(normalizer.memo_hits / lookups, 3) if lookups else 0.0
+    }
@@ -0,0 +1,52 @@
+import threading
+from collections import OrderedDict
+
+# Bounded LRU of query -> ranked result IDs. Each entry is stamped with the
+# corpus generation it was computed at; any insert, delete or reindex bumps the
+# generation, so older entries simply stop matching and age out.
+
+QUERY_CACHE_SIZE = 256
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+class QueryCache:
+    def __init__(self, max_size=QUERY_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, generation):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, generation, value):
+        with self.lock:
+            self.entries[key] = (generation, value)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': round(self.hit_rate, 3), 'entries': len(self.entries)}
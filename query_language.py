@@ -0,0 +1,425 @@
+import re
+import bisect
+import fnmatch
+import threading
+from array import array
+from collections import OrderedDict
+
+# Boolean, fielded search syntax for the search box:
+#   skill:python AND (title:"data analyst" OR title:analyst*) NOT degree:mba edu_year:>2015
+# Terms next to each other are ANDed; "-term" is NOT; quotes make a phrase;
+# "*" and "?" are wildcards. Queries compile to a plan over per-field posting
+# lists, combined as bitmaps (Python ints, one bit per doc ID); each AND
+# evaluates its cheapest clause first, and no fuzzy scoring is needed.
+
+TOKEN_SPLIT = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+QUERY_TOKEN = re.compile(r'\s*(\(|\)|-(?=[\w"])|[\w.]+:(?:[<>]=?|=)?(?:"[^"]*"|[^\s()]+)|"[^"]*"|[^\s()]+)')
+RANGE_VALUE = re.compile(r'^(?:(>=|<=|>|<|=)?(\d+)|(\d+)\.\.(\d+))$')
+
+# field name (and aliases) -> how values are read from a resume
+FIELD_ALIASES = {
+    'skill': 'skill', 'skills': 'skill',
+    'title': 'title', 'job': 'title',
+    'company': 'company',
+    'degree': 'degree',
+    'institution': 'institution', 'school': 'institution', 'university': 'institution',
+    'name': 'name',
+    'email': 'email',
+    'edu_year': 'edu_year', 'year': 'edu_year',
+    'years': 'years', 'experience': 'years'
+}
+NUMERIC_FIELDS = {'edu_year', 'years'}
+OPERATORS = {'AND', 'OR', 'NOT'}
+# Bitmaps of recently queried terms are kept until the term's postings change
+BITMAP_CACHE_SIZE = 1024
+
+if hasattr(int, 'bit_count'):
+    def popcount(bits):
+        return bits.bit_count()
+else:
+    def popcount(bits):
+        return bin(bits).count('1')
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+# Bitmap with the given doc IDs set; built in a bytearray, since setting bits
+# one at a time on a Python int copies the whole int each time
+def to_bitmap(doc_ids, size):
+    bits = bytearray((size >> 3) + 1)
+    for doc_id in doc_ids:
+        bits[doc_id >> 3] |= 1 << (doc_id & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def iter_bits(bits):
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for byte_index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (byte_index << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+def _tokens(text):
+    return TOKEN_SPLIT.findall((text or '').lower())
+
+
+# Values of one field for one resume, as a list of strings (numbers for numeric fields)
+def field_values(resume, field):
+    if field == 'skill':
+        return list(resume.get('skills') or [])
+    if field == 'name':
+        return [resume['name']] if resume.get('name') else []
+    if field == 'email':
+        info = resume.get('personal_info') or {}
+        return [e for e in (resume.get('email'), info.get('email')) if e]
+    if field in ('title', 'company'):
+        return [job[field] for job in resume.get('jobs') or [] if job.get(field)]
+    if field in ('degree', 'institution'):
+        return [edu[field] for edu in resume.get('education') or [] if isinstance(edu, dict) and edu.get(field)]
+    if field == 'edu_year':
+        years = []
+        for edu in resume.get('education') or []:
+            if isinstance(edu, dict) and str(edu.get('year') or '').isdigit():
+                years.append(int(edu['year']))
+        return years
+    if field == 'years':
+        months = resume.get('experience_months')
+        if months is None and isinstance(resume.get('experience'), (int, float)):
+            return [int(resume['experience'])]
+        return [months // 12] if months is not None else []
+    return []
+
+
+# Per-field postings: token -> array of doc IDs, turned into a bitmap when a
+# query touches it (a bitmap per rare token would cost n/8 bytes each)
+class FieldIndex:
+    def __init__(self):
+        self.postings = {}  # field -> {token or number: doc IDs}; None is the free-text field
+        self.size = 0  # one past the highest doc ID
+        self.vocabulary = {}  # field -> sorted tokens, rebuilt lazily for wildcard expansion
+        self.bitmaps = OrderedDict()  # (field, term) -> bitmap, for recently queried terms
+        # Doc IDs below size that hold no document. The all-docs bitmap is built
+        # from these when a query needs it: OR-ing a bit into an n/8-byte int on
+        # every add would make bulk ingest quadratic.
+        self.removed = set()
+        self._all_docs = None
+        self.lock = threading.Lock()
+
+    @property
+    def all_docs(self):
+        bits = self._all_docs
+        if bits is None:
+            with self.lock:
+                bits = (1 << self.size) - 1
+                if self.removed:
+                    bits ^= to_bitmap(self.removed, self.size)
+                self._all_docs = bits
+        return bits
+
+    def _doc_terms(self, resume, search_text):
+        terms = [(None, token) for token in set(_tokens(search_text))]
+        for field in set(FIELD_ALIASES.values()):
+            values = field_values(resume, field)
+            if field in NUMERIC_FIELDS:
+                terms.extend((field, value) for value in set(values))
+            else:
+                terms.extend((field, token) for token in {t for value in values for t in _tokens(value)})
+        return terms
+
+    def add(self, doc_id, resume, search_text):
+        with self.lock:
+            if doc_id >= self.size:
+                self.removed.update(range(self.size, doc_id))
+                self.size = doc_id + 1
+            else:
+                self.removed.discard(doc_id)
+            self._all_docs = None
+            for field, term in self._doc_terms(resume, search_text):
+                field_postings = self.postings.setdefault(field, {})
+                posting = field_postings.get(term)
+                if posting is None:
+                    posting = field_postings[term] = array('l')
+                    self.vocabulary.pop(field, None)
+                posting.append(doc_id)
+                self.bitmaps.pop((field, term), None)
+
+    def remove(self, doc_id, resume, search_text):
+        with self.lock:
+            if doc_id < self.size:
+                self.removed.add(doc_id)
+            self._all_docs = None
+            for field, term in self._doc_terms(resume, search_text):
+                field_postings = self.postings.get(field, {})
+                posting = field_postings.get(term)
+                if posting is not None and doc_id in posting:
+                    posting.remove(doc_id)
+                    self.bitmaps.pop((field, term), None)
+                    if not posting:
+                        del field_postings[term]
+                        self.vocabulary.pop(field, None)
+
+    def clear(self):
+        with self.lock:
+            self.postings = {}
+            self.vocabulary = {}
+            self.bitmaps = OrderedDict()
+            self.removed = set()
+            self._all_docs = None
+            self.size = 0
+
+    def count(self, field, term):
+        return len(self.postings.get(field, {}).get(term, ()))
+
+    # Doc IDs with this term, for building its bitmap
+    def _doc_ids(self, field, term):
+        return self.postings.get(field, {}).get(term)
+
+    def bitmap(self, field, term):
+        with self.lock:
+            bits = self.bitmaps.get((field, term))
+            if bits is not None:
+                self.bitmaps.move_to_end((field, term))
+                return bits
+            posting = self._doc_ids(field, term)
+            if not posting:
+                return 0
+            bits = self.bitmaps[(field, term)] = to_bitmap(posting, self.size)
+            if len(self.bitmaps) > BITMAP_CACHE_SIZE:
+                self.bitmaps.popitem(last=False)
+            return bits
+
+    def terms(self, field):
+        vocabulary = self.vocabulary.get(field)
+        if vocabulary is None:
+            with self.lock:
+                vocabulary = self.vocabulary[field] = sorted(
+                    term for term in self.postings.get(field, {}) if isinstance(term, str)
+                )
+        return vocabulary
+
+    def numbers(self, field):
+        return [term for term in self.postings.get(field, {}) if isinstance(term, int)]
+
+
+# Plan nodes. estimate() is a cheap upper bound on matches; evaluate() returns a bitmap.
+
+class Term:
+    def __init__(self, field, value, phrase=False):
+        self.field = field
+        self.value = value
+        self.phrase = phrase
+
+    def _bitmap(self, index):
+        if self.field in NUMERIC_FIELDS:
+            match = RANGE_VALUE.match(self.value)
+            if not match:
+                raise QuerySyntaxError(f"{self.field} needs a number, a comparison (>2015) or a range (2010..2015)")
+            op, number, low, high = match.groups()
+            if low is not None:
+                test = lambda n: int(low) <= n <= int(high)
+            else:
+                number = int(number)
+                test = {
+                    '>': lambda n: n > number, '>=': lambda n: n >= number,
+                    '<': lambda n: n < number, '<=': lambda n: n <= number
+                }.get(op, lambda n: n == number)
+            bits = 0
+            for term in index.numbers(self.field):
+                if test(term):
+                    bits |= index.bitmap(self.field, term)
+            return bits
+
+        if not self.phrase and ('*' in self.value or '?' in self.value):
+            return self._wildcard(index)
+
+        tokens = _tokens(self.value)
+        if not tokens:
+            return 0
+        bits = None
+        # Rarest token first, so the AND shrinks fastest
+        for token in sorted(tokens, key=lambda t: index.count(self.field, t)):
+            posting = index.bitmap(self.field, token)
+            bits = posting if bits is None else bits & posting
+            if not bits:
+                return 0
+        return bits
+
+    def _wildcard(self, index):
+        pattern = self.value.lower()
+        vocabulary = index.terms(self.field)
+        prefix = re.split(r'[*?]', pattern, 1)[0]
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + '\uffff', start)
+        bits = 0
+        for term in vocabulary[start:end]:
+            if fnmatch.fnmatchcase(term, pattern):
+                bits |= index.bitmap(self.field, term)
+        return bits
+
+    def estimate(self, index):
+        if self.field in NUMERIC_FIELDS or '*' in self.value or '?' in self.value:
+            return popcount(index.all_docs)
+        tokens = _tokens(self.value)
+        return min((index.count(self.field, t) for t in tokens), default=0)
+
+    # Phrases and multi-word values also need the words next to each other
+    def verify(self, resume, search_text):
+        if self.field in NUMERIC_FIELDS or len(_tokens(self.value)) < 2:
+            return True
+        phrase = f" {' '.join(_tokens(self.value))} "
+        if self.field is None:
+            return phrase in f" {' '.join(_tokens(search_text))} "
+        return any(phrase in f" {' '.join(_tokens(value))} " for value in field_values(resume, self.field))
+
+    def evaluate(self, index, resumes, search_texts):
+        bits = self._bitmap(index)
+        if bits and self.field not in NUMERIC_FIELDS and len(_tokens(self.value)) > 1:
+            verified = [doc_id for doc_id in iter_bits(bits)
+                        if doc_id < len(resumes) and self.verify(resumes[doc_id], search_texts[doc_id])]
+            bits = to_bitmap(verified, len(resumes))
+        return bits
+
+    def __repr__(self):
+        return f"{self.field or 'text'}:{self.value!r}"
+
+
+class And:
+    def __init__(self, children):
+        self.children = children
+
+    def estimate(self, index):
+        positive = [c.estimate(index) for c in self.children if not isinstance(c, Not)]
+        return min(positive) if positive else popcount(index.all_docs)
+
+    def evaluate(self, index, resumes, search_texts):
+        positive = sorted((c for c in self.children if not isinstance(c, Not)), key=lambda c: c.estimate(index))
+        negative = [c for c in self.children if isinstance(c, Not)]
+        bits = index.all_docs if not positive else None
+        for child in positive:
+            child_bits = child.evaluate(index, resumes, search_texts)
+            bits = child_bits if bits is None else bits & child_bits
+            if not bits:
+                return 0
+        for child in negative:
+            bits &= ~child.child.evaluate(index, resumes, search_texts)
+            if not bits:
+                return 0
+        return bits
+
+    def __repr__(self):
+        return f"AND({', '.join(map(repr, self.children))})"
+
+
+class Or:
+    def __init__(self, children):
+        self.children = children
+
+    def estimate(self, index):
+        return min(popcount(index.all_docs), sum(c.estimate(index) for c in self.children))
+
+    def evaluate(self, index, resumes, search_texts):
+        bits = 0
+        for child in self.children:
+            bits |= child.evaluate(index, resumes, search_texts)
+        return bits
+
+    def __repr__(self):
+        return f"OR({', '.join(map(repr, self.children))})"
+
+
+class Not:
+    def __init__(self, child):
+        self.child = child
+
+    def estimate(self, index):
+        return popcount(index.all_docs)
+
+    def evaluate(self, index, resumes, search_texts):
+        return index.all_docs & ~self.child.evaluate(index, resumes, search_texts)
+
+    def __repr__(self):
+        return f"NOT({self.child!r})"
+
+
+# Whether the text uses any query syntax; plain words stay on fuzzy search
+def is_structured_query(query):
+    for token in QUERY_TOKEN.findall(query):
+        if token in OPERATORS or token in ('(', ')', '-') or token.startswith('"'):
+            return True
+        if ':' in token and token.split(':', 1)[0].lower() in FIELD_ALIASES:
+            return True
+        if '*' in token or '?' in token:
+            return True
+    return False
+
+
+class _Parser:
+    def __init__(self, query):
+        self.tokens = QUERY_TOKEN.findall(query)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"Unexpected '{self.peek()}'")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == 'OR':
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.peek() not in (None, 'OR', ')'):
+            if self.peek() == 'AND':
+                self.take()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else And(children)
+
+    def parse_not(self):
+        if self.peek() in ('NOT', '-'):
+            self.take()
+            return Not(self.parse_not())
+        return self.parse_primary()
+
+    def parse_primary(self):
+        token = self.take()
+        if token is None:
+            raise QuerySyntaxError("Query ends too early")
+        if token == '(':
+            node = self.parse_or()
+            if self.take() != ')':
+                raise QuerySyntaxError("Missing ')'")
+            return node
+        if token in (')', 'AND', 'OR'):
+            raise QuerySyntaxError(f"Unexpected '{token}'")
+
+        field = None
+        if ':' in token:
+            name, value = token.split(':', 1)
+            if name.lower() in FIELD_ALIASES:
+                field, token = FIELD_ALIASES[name.lower()], value
+        phrase = token.startswith('"')
+        value = token.strip('"')
+        if not value:
+            raise QuerySyntaxError("Empty search term")
+        return Term(field, value, phrase)
+
+
+def parse_query(query):
+    return _Parser(query).parse()
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import defaultdict
+from query_cache import QueryCache, normalize_query
+from resume_store import load_resumes
+from search_index import SearchIndex
+from perf_metrics import percentile
+
+# Records what users actually type into the search box and replays it headlessly,
+# so search latency can be checked against real keystroke patterns instead of
+# synthetic corpus benchmarks. One JSON object per line:
+#   {"ts": 1700000000.1, "query": "pyth", "source": "keystroke", "results": 12, "latency_ms": 0.8}
+
+QUERY_LOG_PATH = os.path.join(os.getcwd(), "query_log.jsonl")
+# Allowed p95 growth over the baseline before a replay fails
+MAX_P95_REGRESSION = 0.25
+
+QUERY_CLASSES = ('keystroke', 'quick_filter', 'search', 'empty')
+
+
+# Class a logged search belongs to; an empty box is a reset whatever triggered it
+def classify_query(query, source):
+    if not normalize_query(query):
+        return 'empty'
+    return source if source in QUERY_CLASSES else 'search'
+
+
+class QueryLog:
+    def __init__(self, path=QUERY_LOG_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a', encoding='utf-8', buffering=1)
+
+    def record(self, query, source, results, latency):
+        entry = {
+            'ts': round(time.time(), 3),
+            'query': query,
+            'source': classify_query(query, source),
+            'results': results,
+            'latency_ms': round(latency * 1000, 3)
+        }
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def load_query_log(path):
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A crash can leave a half-written last line
+                    continue
+    return entries
+
+
+# Run the logged queries in order against index; returns {class: [latency ms, ...]}
+def replay_queries(index, entries, limit=None, repeat=1):
+    latencies = defaultdict(list)
+    for _ in range(repeat):
+        for entry in entries:
+            query = entry.get('query', '')
+            start = time.perf_counter()
+            index.search(query, limit)
+            latencies[classify_query(query, entry.get('source'))].append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies):
+    summary = {}
+    for query_class, values in sorted(latencies.items()):
+        values = sorted(values)
+        summary[query_class] = {
+            'count': len(values),
+            'p50_ms': round(percentile(values, 50), 3),
+            'p95_ms': round(percentile(values, 95), 3),
+            'max_ms': round(values[-1], 3)
+        }
+    return summary
+
+
+# Classes whose p95 grew more than max_regression over the baseline report
+def regressions(summary, baseline, max_regression=MAX_P95_REGRESSION):
+    failures = []
+    for query_class, stats in summary.items():
+        base = baseline.get(query_class)
+        if base and base['p95_ms'] > 0 and stats['p95_ms'] > base['p95_ms'] * (1 + max_regression):
+            failures.append(f"{query_class}: p95 {stats['p95_ms']:.3f} ms vs baseline {base['p95_ms']:.3f} ms")
+    return failures
+
+
+def build_index(resumes, shards=0, cache=True):
+    if shards:
+        from sharded_index import ShardedSearchIndex
+        return ShardedSearchIndex(shards, None, resumes)
+    index = SearchIndex(resumes)
+    if not cache:
+        index.cache = QueryCache(max_size=0)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded search log and report latency per query class")
+    parser.add_argument('log', nargs='?', default=QUERY_LOG_PATH)
+    parser.add_argument('--json-path', default=os.path.join(os.getcwd(), "parsed_resumes.json"))
+    parser.add_argument('--shards', type=int, default=0, help="replay against a sharded index with N processes")
+    parser.add_argument('--no-cache', action='store_true', help="disable the query result cache")
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--baseline', help="earlier --out report to compare p95 against")
+    parser.add_argument('--max-regression', type=float, default=MAX_P95_REGRESSION,
+                        help="allowed p95 growth over the baseline (default: 0.25 = 25%%)")
+    parser.add_argument('--out', help="write the report as JSON (usable as a later --baseline)")
+    args = parser.parse_args()
+
+    entries = load_query_log(args.log)
+    if not entries:
+        print(f"No queries in {args.log}")
+        return
+
+    resumes = load_resumes(args.json_path)
+    index = build_index(resumes, args.shards, not args.no_cache)
+    try:
+        summary = summarize(replay_queries(index, entries, args.limit, args.repeat))
+    finally:
+        if args.shards:
+            index.close()
+
+    print(f"Replayed {len(entries)} queries x{args.repeat} against {len(resumes)} resumes")
+    for query_class, stats in summary.items():
+        print(f"  {query_class:<13} n={stats['count']:<6} p50 {stats['p50_ms']:8.3f} ms  "
+              f"p95 {stats['p95_ms']:8.3f} ms  max {stats['max_ms']:8.3f} ms")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            failures = regressions(summary, json.load(f), args.max_regression)
+        if failures:
+            print("p95 regression:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"No p95 regression beyond {args.max_regression:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import re
+import csv
+import hashlib
+from term_normalizer import TermNormalizer, load_aliases
+
+REFERENCE_FILES = ['skills.csv', 'job_titles.csv', 'education_degrees.csv', 'aliases.csv']
+
+
+# Hash of the reference CSVs; parsed resumes record it, so ones parsed against
+# older CSVs can be found and reindexed
+def reference_version(paths=REFERENCE_FILES):
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(path.encode('utf-8'))
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+# Load reference data from CSVs
+def load_reference_data():
+    data = {
+        'skills': [],
+        'job_titles': [],
+        'education_degrees': []
+    }
+    
+    skill_names = []
+    title_names = []
+    
+    # Load skills
+    if os.path.exists('skills.csv'):
+        with open('skills.csv', 'r') as file:
+            reader = csv.DictReader(file)
+            skill_names = [row['Skill'] for row in reader]
+            data['skills'] = [skill.lower() for skill in skill_names]
+    
+    # Load job titles
+    if os.path.exists('job_titles.csv'):
+        with open('job_titles.csv', 'r') as file:
+            reader = csv.DictReader(file)
+            title_names = [row['Title'] for row in reader]
+            data['job_titles'] = [title.lower() for title in title_names]
+    
+    # Load education degrees
+    if os.path.exists('education_degrees.csv'):
+        with open('education_degrees.csv', 'r') as file:
+            reader = csv.DictReader(file)
+            data['education_degrees'] = [row['Degree'].lower() for row in reader]
+    
+    # Alias/synonym normalizers, so "JS", "Javascript" and "java script" all become JavaScript
+    data['skill_normalizer'] = TermNormalizer(
+        'skill', skill_names, load_aliases('skill'),
+        memo_path=os.path.join(os.getcwd(), "skill_normalization_cache.json")
+    )
+    data['title_normalizer'] = TermNormalizer('title', title_names, load_aliases('title'))
+    
+    data['version'] = reference_version()
+    compile_reference_patterns(data)
+    return data
+
+
+# Compile every per-term regex once, instead of once per resume
+def compile_reference_patterns(data):
+    # Each canonical title is searched together with its aliases ("Sr. Software Engineer")
+    data['title_variants'] = {
+        title: [v.lower() for v in variants]
+        for title, variants in data['title_normalizer'].variants.items()
+    }
+    data['title_patterns'] = {
+        title: re.compile("(?:" + "|".join(re.escape(v) for v in variants) + ")\\b", re.IGNORECASE)
+        for title, variants in data['title_normalizer'].variants.items()
+    }
+    data['degree_patterns'] = {
+        degree: re.compile(f"{re.escape(degree)}\\b", re.IGNORECASE)
+        for degree in data['education_degrees']
+    }
+    return data
@@ -0,0 +1,65 @@
+import os
+import time
+import argparse
+from reference_data import load_reference_data
+from resume_store import load_resumes, save_resumes
+from text_store import TextStore, TEXT_STORE_DIR
+from parse_pool import ParsePool
+
+# Recompute skills, job titles and degrees from stored text after the reference
+# CSVs change. Only resumes parsed against a different reference version are
+# touched, and no PDF is opened again.
+
+
+def stale_resumes(resumes, version):
+    return [r for r in resumes if r.get('reference_version') != version]
+
+
+# Updates resumes in place; returns how many were reindexed and how many had no stored text
+def reindex_resumes(resumes, text_store, reference_data, pool=None, force=False):
+    targets = resumes if force else stale_resumes(resumes, reference_data['version'])
+    stats = {'reindexed': 0, 'missing_text': 0}
+    if not targets:
+        return stats
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ParsePool(reference_data)
+    try:
+        file_paths = [r['file_path'] for r in targets]
+        for resume, fields in zip(targets, pool.reindex(text_store.directory, file_paths)):
+            if fields is None:
+                stats['missing_text'] += 1
+            else:
+                resume.update(fields)
+                stats['reindexed'] += 1
+    finally:
+        if own_pool:
+            pool.shutdown()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run reference-based extraction from stored resume text")
+    parser.add_argument('--json-path', default=os.path.join(os.getcwd(), "parsed_resumes.json"))
+    parser.add_argument('--text-dir', default=TEXT_STORE_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="reindex every resume, not just stale ones")
+    args = parser.parse_args()
+
+    reference_data = load_reference_data()
+    resumes = load_resumes(args.json_path)
+    start = time.perf_counter()
+    pool = ParsePool(reference_data, max_workers=args.workers)
+    try:
+        stats = reindex_resumes(resumes, TextStore(args.text_dir), reference_data, pool, args.force)
+    finally:
+        pool.shutdown()
+    if stats['reindexed']:
+        save_resumes(args.json_path, resumes)
+    print(f"Reindexed {stats['reindexed']} resumes in {time.perf_counter() - start:.2f}s "
+          f"({stats['missing_text']} without stored text, reference version {reference_data['version']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import re
+import bisect
+from array import array
+from functools import cached_property
+
+# Words inside a token may be joined by dots or carry +/#, e.g. "node.js", "c++", "c#"
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+
+# Headers that open each labeled section of a resume
+SECTION_HEADERS = {
+    'skills': ['skills', 'technical skills', 'key skills', 'core skills', 'expertise',
+               'competencies', 'core competencies', 'proficiencies', 'technologies'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history', 'career summary'],
+    'education': ['education', 'education details', 'educational background',
+                  'academic background', 'academic qualifications', 'qualifications'],
+    'projects': ['projects', 'key projects', 'professional projects', 'portfolio', 'project work'],
+    'contact': ['contact', 'contact details', 'contact information', 'personal details',
+                'personal information', 'personal particulars'],
+    # Headers we don't extract from, but which must still close the section before them
+    'other': ['summary', 'profile', 'professional summary', 'career objective', 'objective',
+              'certifications', 'languages', 'references', 'awards', 'achievements',
+              'interests', 'hobbies', 'publications', 'activities', 'volunteering'],
+}
+
+_HEADER_LABELS = {
+    header: label
+    for label, headers in SECTION_HEADERS.items()
+    for header in headers
+}
+
+# Headers are short; anything longer is body text that happens to mention a header word
+_MAX_HEADER_WORDS = 4
+
+
+def _match_header(line):
+    # Returns (label, content_offset) if the line opens a section, else None.
+    # content_offset is where inline content starts, e.g. after "Skills:".
+    stripped = line.strip()
+    # Bullets and numbered items are body text, never headers
+    if not stripped or not stripped[0].isalpha():
+        return None
+
+    colon = re.search(r'[:：]', stripped)
+    if colon:
+        head, rest = stripped[:colon.start()], stripped[colon.end():]
+    else:
+        head, rest = stripped, ''
+    words = re.sub(r'[^a-z0-9]+', ' ', head.lower()).split()
+    if not words or len(words) > _MAX_HEADER_WORDS:
+        return None
+
+    label = _HEADER_LABELS.get(' '.join(words))
+    if not label and head[0].isupper() and not any(c.isdigit() for c in head):
+        # "Education Summary" is an education header and "LANGUAGE SKILLS" a
+        # skills header, so try leading phrases first and then trailing ones
+        phrases = [' '.join(words[:i]) for i in range(len(words) - 1, 0, -1)]
+        phrases += [' '.join(words[i:]) for i in range(1, len(words))]
+        for phrase in phrases:
+            label = _HEADER_LABELS.get(phrase)
+            if label:
+                break
+    if not label:
+        return None
+
+    if colon and rest.strip():
+        return label, line.index(colon.group(0)) + 1
+    return label, len(line)
+
+
+# Lowercased text with the same length as the original, so offsets found in
+# one are valid in the other (a few characters, e.g. 'İ', lowercase to two)
+def normalize_text(text):
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(c.lower()[0] for c in text)
+
+
+# Split text into labeled sections in a single pass over its lines
+def segment_sections(text):
+    sections = []
+    current = None
+    offset = 0
+
+    for line in text.splitlines(keepends=True):
+        match = _match_header(line)
+        if match:
+            label, content_offset = match
+            if current:
+                current['end'] = offset
+                sections.append(current)
+            elif offset > 0:
+                # Whatever sits above the first header is the name/contact block
+                sections.append({'label': 'contact', 'header': None, 'start': 0, 'end': offset})
+            current = {
+                'label': label,
+                'header': line.strip(),
+                'start': offset + content_offset,
+                'end': len(text)
+            }
+        offset += len(line)
+
+    if current:
+        sections.append(current)
+    elif text:
+        sections.append({'label': 'contact', 'header': None, 'start': 0, 'end': len(text)})
+
+    return sections
+
+
+# Parsed view of one resume's text, computed once and shared by all extractors:
+# normalized text, tokens with offsets, a line index and labeled sections
+class ResumeDocument:
+    def __init__(self, text):
+        self.text = text
+
+    @cached_property
+    def text_lower(self):
+        return normalize_text(self.text)
+
+    @cached_property
+    def sections(self):
+        return segment_sections(self.text)
+
+    # One regex pass over the normalized text: tokens plus their start/end offsets
+    @cached_property
+    def _token_stream(self):
+        tokens = []
+        starts = array('l')
+        ends = array('l')
+        for match in TOKEN_PATTERN.finditer(self.text_lower):
+            tokens.append(match.group(0))
+            starts.append(match.start())
+            ends.append(match.end())
+        return tokens, starts, ends
+
+    @property
+    def tokens(self):
+        return self._token_stream[0]
+
+    @property
+    def token_starts(self):
+        return self._token_stream[1]
+
+    @property
+    def token_ends(self):
+        return self._token_stream[2]
+
+    # Tokens starting inside [start, end), e.g. one section's tokens
+    def tokens_between(self, start, end):
+        starts = self.token_starts
+        return self.tokens[bisect.bisect_left(starts, start):bisect.bisect_left(starts, end)]
+
+    # Normalized tokens joined by spaces: the compact form that gets persisted
+    # and searched, so later stages never tokenize the text again
+    @cached_property
+    def token_text(self):
+        return " ".join(self.tokens)
+
+    @cached_property
+    def lines(self):
+        return self.text.split('\n')
+
+    @cached_property
+    def lines_lower(self):
+        return self.text_lower.split('\n')
+
+    @cached_property
+    def line_starts(self):
+        starts = array('l', [0])
+        for line in self.lines[:-1]:
+            starts.append(starts[-1] + len(line) + 1)
+        return starts
+
+    def line_number(self, offset):
+        return bisect.bisect_right(self.line_starts, offset) - 1
+
+    # Lines overlapping [start, end), clipped to it (same as text[start:end].split('\n'))
+    def lines_between(self, start, end):
+        if start >= end:
+            return []
+        first, last = self.line_number(start), self.line_number(end)
+        lines = self.lines[first:last + 1]
+        lines[-1] = lines[-1][:end - self.line_starts[last]]
+        lines[0] = lines[0][start - self.line_starts[first]:]
+        return lines
+
+    def section_spans(self, label, fallback_to_full=False):
+        spans = [(s['start'], s['end']) for s in self.sections if s['label'] == label]
+        if not spans and fallback_to_full:
+            spans = [(0, len(self.text))]
+        return spans
+
+    def section_text(self, label):
+        return "\n".join(self.text[start:end] for start, end in self.section_spans(label))
@@ -0,0 +1,207 @@
+import os
+import csv
+import argparse
+from experience_timeline import format_month
+from term_normalizer import term_key
+from resume_store import iter_resumes
+
+try:
+    import pyarrow as pa # optional, for Parquet output
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Flattened tables for analytics: one row per resume, job, education entry and skill.
+# Rows are buffered per table and flushed every EXPORT_CHUNK_SIZE rows, so memory
+# stays bounded however large the corpus is.
+
+EXPORT_CHUNK_SIZE = 1000
+
+# Column name -> type ('str' or 'int'); the order here is the column order on disk
+TABLES = {
+    'resumes': [
+        ('file_path', 'str'), ('name', 'str'), ('email', 'str'), ('phone', 'str'),
+        ('experience_months', 'int'), ('first_month', 'str'), ('last_month', 'str'),
+        ('skill_count', 'int'), ('job_count', 'int'), ('education_count', 'int'), ('project_count', 'int')
+    ],
+    'jobs': [
+        ('file_path', 'str'), ('position', 'int'), ('title', 'str'), ('title_id', 'str'),
+        ('company', 'str'), ('date', 'str'), ('start_month', 'str'), ('end_month', 'str'),
+        ('months', 'int'), ('responsibilities', 'str')
+    ],
+    'education': [
+        ('file_path', 'str'), ('position', 'int'), ('degree', 'str'), ('institution', 'str'), ('year', 'int')
+    ],
+    'skills': [
+        ('file_path', 'str'), ('skill', 'str'), ('skill_id', 'str')
+    ]
+}
+
+# Placeholders the extractor stores when a field wasn't found
+_MISSING_VALUES = {"Company name not found", "Date not found", "Institution name not found"}
+
+
+def _value(value):
+    return None if value in _MISSING_VALUES or value == '' else value
+
+
+def _month(value):
+    return format_month(value) if isinstance(value, int) else None
+
+
+def _year(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Rows a single resume contributes to each table
+def flatten_resume(resume):
+    file_path = resume.get('file_path')
+    # resumes.json from resume_parser.py keeps contact details under personal_info
+    contact = resume.get('personal_info') or resume
+    jobs = resume.get('jobs') or []
+    education = resume.get('education') or []
+    skills = resume.get('skills') or []
+
+    rows = {
+        'resumes': [{
+            'file_path': file_path,
+            'name': _value(resume.get('name')),
+            'email': _value(contact.get('email')),
+            'phone': _value(contact.get('phone')),
+            'experience_months': resume.get('experience_months'),
+            'first_month': resume.get('first_month'),
+            'last_month': resume.get('last_month'),
+            'skill_count': len(skills),
+            'job_count': len(jobs),
+            'education_count': len(education),
+            'project_count': len(resume.get('projects') or [])
+        }],
+        'jobs': [],
+        'education': [],
+        'skills': []
+    }
+
+    for i, job in enumerate(jobs):
+        rows['jobs'].append({
+            'file_path': file_path,
+            'position': i,
+            'title': _value(job.get('title')),
+            'title_id': job.get('title_id'),
+            'company': _value(job.get('company')),
+            'date': _value(job.get('date')),
+            'start_month': _month(job.get('start_month')),
+            'end_month': _month(job.get('end_month')),
+            'months': job.get('months'),
+            'responsibilities': " | ".join(job.get('responsibilities') or []) or None
+        })
+
+    for i, edu in enumerate(education):
+        if isinstance(edu, str):
+            edu = {'degree': edu}
+        rows['education'].append({
+            'file_path': file_path,
+            'position': i,
+            'degree': _value(edu.get('degree')),
+            'institution': _value(edu.get('institution')),
+            'year': _year(edu.get('year'))
+        })
+
+    for skill in skills:
+        rows['skills'].append({'file_path': file_path, 'skill': skill, 'skill_id': f"skill:{term_key(skill)}"})
+
+    return rows
+
+
+class CsvTableWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=[name for name, _ in columns])
+        self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetTableWriter:
+    def __init__(self, path, columns):
+        types = {'str': pa.string(), 'int': pa.int64()}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    # Each flush becomes one row group
+    def write(self, rows):
+        self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def available_formats():
+    return ['csv', 'parquet'] if pa is not None else ['csv']
+
+
+# Stream resumes (any iterable) into per-table files under out_dir; returns row counts per table
+def export_resumes(resumes, out_dir, formats=('csv',), chunk_size=EXPORT_CHUNK_SIZE):
+    if 'parquet' in formats and pa is None:
+        raise RuntimeError("Parquet export needs pyarrow installed")
+    os.makedirs(out_dir, exist_ok=True)
+
+    writer_types = {'csv': CsvTableWriter, 'parquet': ParquetTableWriter}
+    writers = {
+        table: [writer_types[fmt](os.path.join(out_dir, f"{table}.{fmt}"), columns) for fmt in formats]
+        for table, columns in TABLES.items()
+    }
+    buffers = {table: [] for table in TABLES}
+    counts = {table: 0 for table in TABLES}
+
+    def flush(table):
+        if buffers[table]:
+            for writer in writers[table]:
+                writer.write(buffers[table])
+            counts[table] += len(buffers[table])
+            buffers[table] = []
+
+    try:
+        for resume in resumes:
+            for table, rows in flatten_resume(resume).items():
+                buffers[table].extend(rows)
+                if len(buffers[table]) >= chunk_size:
+                    flush(table)
+        for table in TABLES:
+            flush(table)
+    finally:
+        for table_writers in writers.values():
+            for writer in table_writers:
+                writer.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export parsed resumes as flat CSV / Parquet tables")
+    parser.add_argument('--json-path', default="parsed_resumes.json")
+    parser.add_argument('--out-dir', default="export")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'both'], default='csv')
+    parser.add_argument('--query', help="only export resumes matching this search")
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    formats = ['csv', 'parquet'] if args.format == 'both' else [args.format]
+    if args.query:
+        from search_index import SearchIndex
+        resumes = [resume for _, resume in SearchIndex(iter_resumes(args.json_path)).search(args.query)]
+    else:
+        resumes = iter_resumes(args.json_path)
+
+    counts = export_resumes(resumes, args.out_dir, formats, args.chunk_size)
+    print(", ".join(f"{count} {table} rows" for table, count in counts.items()) + f" -> {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
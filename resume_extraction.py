@@ -0,0 +1,85 @@
+import pdfplumber
+from resume_document import ResumeDocument
+from ocr_fallback import needs_ocr, get_ocr_pool
+from extractor_pipeline import get_pipeline
+from field_extractors import reference_resources # importing it registers the extractors named below
+
+# Extractors behind parse_resume, in output order
+ADVANCED_EXTRACTORS = ('name', 'email', 'phone', 'skills', 'listed_skills', 'education', 'jobs', 'timeline', 'projects')
+# The ones that depend on the reference CSVs, which reindex.py recomputes from stored text
+REFERENCE_EXTRACTORS = ('skills', 'listed_skills', 'education', 'jobs')
+
+# Text of each page of a PDF, and the numbers of the scanned pages whose text
+# has to come from OCR
+def read_pdf_pages(file_path):
+    page_texts = []
+    scanned_pages = []
+    try:
+        with pdfplumber.open(file_path) as pdf:
+            for i, page in enumerate(pdf.pages):
+                extracted_text = page.extract_text()
+                if needs_ocr(page, extracted_text):
+                    scanned_pages.append(i)
+                page_texts.append(extracted_text)
+    except Exception as e:
+        print(f"Error extracting text from PDF: {e}")
+    return page_texts, scanned_pages
+
+def join_pages(page_texts):
+    text = ""
+    for extracted_text in page_texts:
+        if extracted_text:
+            text += extracted_text + "\n"
+    return text
+
+# Parse resume text from PDF
+def extract_text_from_pdf(file_path):
+    page_texts, scanned_pages = read_pdf_pages(file_path)
+    
+    # Image-only pages go to the separate OCR pool; text-native PDFs never wait on it
+    if scanned_pages:
+        try:
+            for i, ocr_text in get_ocr_pool().ocr_pages(file_path, scanned_pages).items():
+                page_texts[i] = ocr_text
+        except Exception as e:
+            print(f"Error extracting text from PDF: {e}")
+    return join_pages(page_texts)
+
+# Extract information using regex and reference data. skip names extractors
+# not to run for this batch (e.g. the expensive 'jobs' and 'listed_skills');
+# per-extractor seconds are added to elapsed if given.
+def parse_resume(file_path, reference_data, skip=(), elapsed=None):
+    return parse_resume_text(file_path, extract_text_from_pdf(file_path), reference_data, skip, elapsed)
+
+# parse_resume for text already taken from the PDF
+def parse_resume_text(file_path, text, reference_data, skip=(), elapsed=None):
+    pipeline = get_pipeline(ADVANCED_EXTRACTORS, skip)
+    result = {'file_path': file_path}
+    
+    if not text:
+        result.update(pipeline.defaults())
+        return result
+    
+    # Store raw text
+    result['raw_text'] = text
+    
+    # Split the document into labeled sections once; the extractors share its
+    # sections, tokens and lines, and each scans only its own section
+    doc = ResumeDocument(text)
+    result['sections'] = doc.sections
+    result.update(pipeline.run(doc, reference_resources(reference_data), elapsed))
+    
+    # Which reference data produced these fields, so stale resumes can be found;
+    # none if this batch skipped some of them, so reindex.py fills them in later
+    skipped_reference = any(name in pipeline.skipped_names for name in REFERENCE_EXTRACTORS)
+    result['reference_version'] = None if skipped_reference else reference_data.get('version')
+    return result
+
+# Fields that depend on the reference CSVs: skills, degrees and job titles.
+# Kept apart so reindex.py can recompute them from stored text alone.
+def extract_reference_fields(doc, reference_data):
+    fields = get_pipeline(REFERENCE_EXTRACTORS).run(doc, reference_resources(reference_data))
+    
+    # Which reference data produced these fields, so stale resumes can be found
+    fields['reference_version'] = reference_data.get('version')
+    return fields
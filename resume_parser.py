@@ -1,11 +1,20 @@
 import os
-import re
 import json
+import time
+import threading
 from datetime import datetime
 from tkinter import filedialog, messagebox 
 from rapidfuzz import fuzz  #fuzzy string matching
 import shutil # file operations
-import word2number # convert words to numbers
+from term_normalizer import TermNormalizer, load_aliases # skill aliases/synonyms
+from resume_document import ResumeDocument # labeled resume sections
+from ocr_fallback import needs_ocr, get_ocr_pool # OCR for scanned pages
+from extractor_pipeline import get_pipeline # runs the field extractors, timed per extractor
+from field_extractors import SIMPLE_EXTRACTORS # the extractors shared with the advanced parser
+from shortlist_export import export_shortlist # parallel bulk copy + manifest
+from trigram_index import TrigramIndex, resume_terms # candidates for fuzzy search
+from text_store import TextStore # compressed raw text and search tokens, kept out of resumes.json
+from candidate_index import CandidateIndex, DEFAULT_COUNTRY_CODE # one card per person across resume versions
 
 try:
     import customtkinter as ctk # CustomTkinter for modern UI
@@ -19,6 +28,7 @@ except ImportError:
     ctk.CTkEntry = ttk.Entry
     ctk.CTkLabel = ttk.Label
     ctk.CTkScrollableFrame = ttk.Frame
+    ctk.CTkCheckBox = ttk.Checkbutton
     ctk.set_appearance_mode = lambda x: None
     ctk.set_default_color_theme = lambda x: None
 
@@ -38,6 +48,13 @@ except ImportError:
             return MockPDF()
     pdfplumber = MockPDFPlumber()
 
+# Folder imports hand parsed resumes to the UI in batches of this many, or at
+# least this often, so the first ones can be searched while the rest still parse
+IMPORT_BATCH_SIZE = 25
+IMPORT_FLUSH_SECONDS = 0.5
+# Country code assumed for phone numbers written without one, when linking resume versions
+PHONE_COUNTRY_CODE = DEFAULT_COUNTRY_CODE
+
 class ResumeParserApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -48,7 +65,15 @@ class ResumeParserApp(ctk.CTk):
         ctk.set_default_color_theme("blue")
 
         self.resumes = []
+        self.search_texts = {}  # file path -> lowercased searchable text, built once per resume
+        self.trigram_index = None  # built on the first fuzzy search over the loaded resumes
+        self.candidates = CandidateIndex(country_code=PHONE_COUNTRY_CODE)
+        self.current_results = []
+        self.selected = set()  # file paths ticked for the shortlist
+        self.importing = False
+        self.import_stale = False  # the shown results miss resumes added by the running import
         self.json_path = os.path.join(os.getcwd(), "resumes.json")
+        self.text_store = TextStore(os.path.join(os.getcwd(), "resumes_text"))
 
         # Layout
         self.grid_columnconfigure(1, weight=1)
@@ -72,6 +97,8 @@ class ResumeParserApp(ctk.CTk):
         self.edu_keywords = self.load_keywords("education.txt", [
             "bachelor", "master", "phd", "degree", "mba", "b.com", "bca", "mca", "ca"
         ])
+        self.skill_normalizer = TermNormalizer("skill", self.skill_keywords, load_aliases("skill"))
+        self.extractor_pipeline = get_pipeline(SIMPLE_EXTRACTORS)
 
     def load_keywords(self, filename, default_list):
         if os.path.exists(filename):
@@ -99,6 +126,11 @@ class ResumeParserApp(ctk.CTk):
         self.search_entry.pack(pady=(0, 18), padx=18, fill="x")
         self.search_entry.bind("<KeyRelease>", self.perform_search)
 
+        self.btn_export = ctk.CTkButton(
+            self.sidebar, text="Export Shortlist", command=self.export_shortlist, height=38
+        )
+        self.btn_export.pack(pady=(0, 18), padx=18, fill="x")
+
         ctk.CTkLabel(
             self.sidebar, text="Results will appear on the right.", font=ctk.CTkFont(size=12), fg_color="transparent"
         ).pack(pady=(0, 0), padx=10)
@@ -108,92 +140,116 @@ class ResumeParserApp(ctk.CTk):
         self.statusbar.update_idletasks()
 
     def select_folder(self):
+        if self.importing:
+            return
         folder_path = filedialog.askdirectory(title="Select Folder with Resumes")
         if folder_path:
             self.process_pdfs(folder_path)
 
+    # PDFs are parsed on a background thread; add_imported then adds each batch
+    # on the UI thread, so the window stays responsive during large imports
     def process_pdfs(self, folder_path):
         self.set_status("Processing PDFs...")
         self.resumes = []  # Clear old resumes
-        count = 0
-        for filename in os.listdir(folder_path):
-            if filename.lower().endswith('.pdf'):
-                file_path = os.path.join(folder_path, filename)
-                try:
-                    resume_data = self.parse_pdf(file_path)
-                    self.resumes.append(resume_data)
-                    count += 1
-                except Exception as e:
-                    self.log_error(f"Error processing {filename}: {str(e)}")
-        self.save_to_json()
-        self.set_status(f"Loaded {count} resumes from selected folder.")
+        self.search_texts = {}
+        self.trigram_index = None
+        self.candidates = CandidateIndex(country_code=PHONE_COUNTRY_CODE)
+        self.importing = True
+        self.import_stale = False
         self.perform_search()
+        threading.Thread(target=self._process_pdfs_thread, args=(folder_path,), daemon=True).start()
+
+    def _process_pdfs_thread(self, folder_path):
+        filenames = [f for f in os.listdir(folder_path) if f.lower().endswith('.pdf')]
+        batch = []
+        last_flush = time.monotonic()
+        for done, filename in enumerate(filenames, 1):
+            file_path = os.path.join(folder_path, filename)
+            try:
+                resume_data = self.parse_pdf(file_path)
+                self.store_text(resume_data)
+                batch.append(resume_data)
+            except Exception as e:
+                self.log_error(f"Error processing {filename}: {str(e)}")
+            if len(batch) >= IMPORT_BATCH_SIZE or time.monotonic() - last_flush >= IMPORT_FLUSH_SECONDS:
+                self.after(0, self.add_imported, batch, done, len(filenames))
+                batch = []
+                last_flush = time.monotonic()
+        self.after(0, self.add_imported, batch, len(filenames), len(filenames))
+        self.after(0, self._import_finished)
+
+    # Makes a batch of parsed resumes searchable; while the search box is empty
+    # (the all-resumes view) their cards are appended to it as well
+    def add_imported(self, batch, done, total):
+        new_cards = []
+        for resume in batch:
+            self.resumes.append(resume)
+            if self.trigram_index is not None:
+                self.trigram_index.add(len(self.resumes) - 1, resume_terms(resume))
+            candidate_id = self.candidates.add(resume)
+            if len(self.candidates.versions[candidate_id]) > 1:
+                # Another version of a candidate with a card already; collapsed at the end
+                self.import_stale = True
+            else:
+                new_cards.append((100, resume))
+
+        if self.search_entry.get().strip():
+            # Search results on screen are refreshed once the import is done
+            if batch:
+                self.import_stale = True
+        elif new_cards:
+            if not self.current_results:
+                # Drop the "No matching resumes" placeholder
+                for widget in self.content.winfo_children():
+                    widget.destroy()
+            self.add_result_cards(new_cards)
+        self.set_status(f"Parsed {done}/{total} PDFs, {len(self.resumes)} resumes searchable...")
+
+    def _import_finished(self):
+        self.importing = False
+        self.save_to_json()
+        self.set_status(f"Loaded {len(self.resumes)} resumes from selected folder.")
+        if self.import_stale:
+            self.perform_search()
 
     def parse_pdf(self, file_path):
         text = ""
+        page_texts = []
+        scanned_pages = []
         with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
+            for i, page in enumerate(pdf.pages):
                 page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        name = self.extract_name(text, file_path)
+                if needs_ocr(page, page_text):
+                    scanned_pages.append(i)
+                page_texts.append(page_text)
+        # Scanned pages are OCR'd in a separate pool, only when there are any
+        if scanned_pages:
+            for i, ocr_text in get_ocr_pool().ocr_pages(file_path, scanned_pages).items():
+                page_texts[i] = ocr_text
+        for page_text in page_texts:
+            if page_text:
+                text += page_text + "\n"
+        # Normalized text, tokens and lines are computed once and shared by every extractor
+        doc = ResumeDocument(text)
+        fields = self.extractor_pipeline.run(doc, {
+            'skill_normalizer': self.skill_normalizer,
+            'edu_keywords': self.edu_keywords
+        })
+        experience_months = fields['experience_months']
         return {
             "file_path": os.path.abspath(file_path),  # store absolute path
-            "name": name,
+            "name": fields['name'] or os.path.splitext(os.path.basename(file_path))[0],
             "raw_text": text,
-            "skills": self.extract_skills(text),
-            "experience": self.extract_experience(text),
-            "education": self.extract_education(text),
-            "personal_info": self.extract_personal_info(text),
+            "search_tokens": doc.token_text,
+            "skills": fields['skills'],
+            "skill_ids": fields['skill_ids'],
+            "experience": round(experience_months / 12, 1),
+            "experience_months": experience_months,
+            "education": fields['education'],
+            "personal_info": fields['personal_info'],
             "timestamp": datetime.now().isoformat()
         }
 
-    def extract_name(self, text, file_path):
-        # fallback to heuristic
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        if lines:
-            # Heuristic: skip lines with email/phone/keywords
-            for line in lines[:5]:
-                if not re.search(r'@|\d|curriculum|resume|cv|bachelor|master|phd|degree', line, re.I):
-                    if 2 <= len(line.split()) <= 4:
-                        return line.title()
-            return lines[0].title()
-        return os.path.splitext(os.path.basename(file_path))[0]
-
-    def extract_skills(self, text):
-        found = set()
-        for word in re.findall(r'\b\w[\w\+\#]*\b', text.lower()):
-            if word in self.skill_keywords:
-                found.add(word)
-        return sorted(found)
-
-    def extract_experience(self, text):
-        exp_pattern = r"(\d+|\w+)[\s\-]*(years?|yrs?)"
-        matches = re.findall(exp_pattern, text, re.IGNORECASE)
-        total_exp = 0
-        for val, _ in matches:
-            try:
-                if val.isdigit():
-                    total_exp += int(val)
-                else:
-                    # Convert words like "two" to 2
-                    total_exp += word2number.w2n.word_to_num(val)
-            except Exception:
-                continue
-        return total_exp
-
-    def extract_education(self, text):
-        return [line.strip() for line in text.split('\n')
-                if any(word in line.lower() for word in self.edu_keywords)]
-
-    def extract_personal_info(self, text):
-        email = re.search(r'[\w\.-]+@[\w\.-]+', text)
-        phone = re.search(r'(\+?\d[\d\-\s]{8,}\d)', text)
-        return {
-            "email": email.group(0) if email else "",
-            "phone": phone.group(0) if phone else ""
-        }
-
     def save_to_json(self):
         with open(self.json_path, 'w', encoding='utf-8') as f:
             json.dump(self.resumes, f, indent=2, ensure_ascii=False)
@@ -202,6 +258,13 @@ class ResumeParserApp(ctk.CTk):
         if os.path.exists(self.json_path):
             with open(self.json_path, 'r', encoding='utf-8') as f:
                 self.resumes = json.load(f)
+            # Older files carry the text inline; move it to the text store once
+            inline = [r for r in self.resumes if 'raw_text' in r or 'search_tokens' in r]
+            for resume in inline:
+                self.store_text(resume)
+            if inline:
+                self.save_to_json()
+            self.candidates = CandidateIndex(self.resumes, PHONE_COUNTRY_CODE)
         else:
             self.resumes = []
             self.save_to_json()
@@ -213,33 +276,84 @@ class ResumeParserApp(ctk.CTk):
 
         if not query:
             # Show all resumes if search is empty
-            self.display_results([(100, resume) for resume in self.resumes])
+            self.display_results(self.newest_versions([(100, resume) for resume in self.resumes]))
             return
 
+        # Fuzzy scoring is limited to resumes whose name, skills or education
+        # share enough trigrams with the query, plus plain substring hits
+        candidates = set()
+        if len(query) > 2:
+            if self.trigram_index is None:
+                self.trigram_index = TrigramIndex()
+                for i, resume in enumerate(self.resumes):
+                    self.trigram_index.add(i, resume_terms(resume))
+            candidates = self.trigram_index.candidates(query)
+
         results = []
-        for resume in self.resumes:
-            searchable = (
-                (resume.get('name', '') + " ") +
-                resume['raw_text'].lower() + " " +
-                " ".join(resume['skills']) + " " +
-                " ".join(resume['education']) + " " +
-                str(resume['experience'])
-            )
+        for i, resume in enumerate(self.resumes):
+            searchable = self.searchable_text(resume)
             # Substring match for short queries, fuzzy for longer
             if len(query) <= 2:
                 if query in searchable:
                     score = 100
                 else:
                     score = 0
-            else:
+            elif i in candidates or query in searchable:
                 score = fuzz.partial_token_sort_ratio(query, searchable)
+            else:
+                continue
             if score > 65:
                 results.append((score, resume))
 
         results.sort(reverse=True, key=lambda x: x[0])
-        self.display_results(results)
+        self.display_results(self.newest_versions(results))
+
+    # One result per candidate (same email or phone): the newest version, at the
+    # rank and score of the best-matching one
+    def newest_versions(self, results):
+        seen = set()
+        collapsed = []
+        for score, resume in results:
+            candidate_id = self.candidates.candidate_of(resume['file_path'])
+            if candidate_id is None:
+                collapsed.append((score, resume))
+            elif candidate_id not in seen:
+                seen.add(candidate_id)
+                collapsed.append((score, self.candidates.newest(candidate_id)))
+        return collapsed
+
+    # Raw text and search tokens go to the compressed text store instead of
+    # resumes.json and memory
+    def store_text(self, resume):
+        raw_text = resume.pop('raw_text', None)
+        tokens = resume.pop('search_tokens', None)
+        if raw_text is not None:
+            self.text_store.put(resume['file_path'], raw_text)
+            if tokens is None:
+                tokens = ResumeDocument(raw_text).token_text
+        if tokens is not None:
+            self.text_store.put(resume['file_path'], tokens, kind='tokens')
+
+    # Searchable text for a resume, built once from its persisted token stream;
+    # resumes stored without tokens are tokenized here, once
+    def searchable_text(self, resume):
+        searchable = self.search_texts.get(resume['file_path'])
+        if searchable is None:
+            tokens = self.text_store.get(resume['file_path'], kind='tokens')
+            if tokens is None:
+                tokens = ResumeDocument(self.text_store.get(resume['file_path']) or '').token_text
+            searchable = " ".join([
+                resume.get('name', ''),
+                tokens,
+                " ".join(resume['skills']),
+                " ".join(resume['education']),
+                str(resume['experience'])
+            ]).lower()
+            self.search_texts[resume['file_path']] = searchable
+        return searchable
 
     def display_results(self, results):
+        self.current_results = []
         if not results:
             ctk.CTkLabel(
                 self.content,
@@ -248,7 +362,12 @@ class ResumeParserApp(ctk.CTk):
                 text_color="red"
             ).pack(pady=30)
             return
+        self.add_result_cards(results)
+
+    # Cards for (score, resume) pairs, below the ones already shown
+    def add_result_cards(self, results):
         for score, resume in results:
+            self.current_results.append(resume)
             frame = ctk.CTkFrame(self.content, fg_color="#23272e", corner_radius=12)
             frame.pack(fill="x", pady=10, padx=10)
 
@@ -256,6 +375,14 @@ class ResumeParserApp(ctk.CTk):
             header = ctk.CTkFrame(frame, fg_color="transparent")
             header.pack(fill="x", padx=10, pady=(10, 2))
 
+            selected_var = ctk.BooleanVar(value=resume['file_path'] in self.selected)
+            ctk.CTkCheckBox(
+                header,
+                text="",
+                variable=selected_var,
+                command=lambda path=resume['file_path'], var=selected_var: self.toggle_selected(path, var.get())
+            ).pack(side="left")
+
             ctk.CTkLabel(
                 header,
                 text=f"{resume.get('name', 'Unknown Name')}",
@@ -337,6 +464,51 @@ class ResumeParserApp(ctk.CTk):
                 self.set_status(f"Download failed: {e}")
                 messagebox.showerror("Error", f"Download failed: {e}")
 
+    def toggle_selected(self, file_path, selected):
+        if selected:
+            self.selected.add(file_path)
+        else:
+            self.selected.discard(file_path)
+        self.set_status(f"{len(self.selected)} resume(s) selected")
+
+    # Ticked resumes, or the whole current result set when nothing is ticked
+    def export_shortlist(self):
+        resumes = [r for r in self.resumes if r['file_path'] in self.selected] or list(self.current_results)
+        if not resumes:
+            self.set_status("No resumes to export")
+            return
+        dest_folder = filedialog.askdirectory(title="Select Destination Folder")
+        if not dest_folder:
+            return
+        zip_name = None
+        if messagebox.askyesno("Export Shortlist", "Also create a ZIP with a manifest?"):
+            zip_name = f"shortlist_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+
+        self.btn_export.configure(state="disabled")
+        self.set_status(f"Exporting {len(resumes)} resumes...")
+        threading.Thread(
+            target=self._export_shortlist_thread, args=(resumes, dest_folder, zip_name), daemon=True
+        ).start()
+
+    def _export_shortlist_thread(self, resumes, dest_folder, zip_name):
+        # Widgets are only touched from the UI thread, via after()
+        def progress(done, total, message):
+            self.after(0, self.set_status, f"Exporting {done}/{total} - {message}")
+
+        try:
+            report = export_shortlist(resumes, dest_folder, zip_name, progress)
+            message = f"Exported {report['copied']} resume(s)"
+            if report['failed']:
+                message += f", {report['failed']} failed (see manifest.csv)"
+        except Exception as e:
+            self.log_error(f"Shortlist export failed: {e}")
+            message = f"Export failed: {e}"
+        self.after(0, self._export_finished, message)
+
+    def _export_finished(self, message):
+        self.btn_export.configure(state="normal")
+        self.set_status(message)
+
     def log_error(self, msg):
         with open("error.log", "a", encoding="utf-8") as f:
             f.write(f"{datetime.now().isoformat()} - {msg}\n")
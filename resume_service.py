@@ -0,0 +1,408 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+import argparse
+import itertools
+from urllib.parse import urlsplit, parse_qs
+from reference_data import load_reference_data
+from parse_pool import ParsePool
+from resume_store import load_resumes, save_resumes
+from search_index import SearchIndex
+from sharded_index import ShardedSearchIndex
+from text_store import TextStore, TEXT_STORE_DIR
+from perf_metrics import get_metrics, normalizer_stats
+from candidate_index import CandidateIndex, DEFAULT_COUNTRY_CODE
+from resume_extraction import ADVANCED_EXTRACTORS
+from extractor_pipeline import expensive_extractors, unknown_extractors
+
+# Local HTTP service over one shared in-memory index:
+#   GET  /health                 service status
+#   GET  /metrics                ingest rate, queue depth, search latency, cache hit rates, RSS
+#   POST /parse?filename=a.pdf   upload a PDF (request body) and parse it; &skip=jobs,education
+#                                leaves extractors out, skip=expensive all the costly ones
+#   GET  /search?q=...&limit=N   ranked matches, streamed as NDJSON
+#   GET  /candidate?email=...    all resumes of one candidate (or ?phone=...), newest first
+#   POST /match?limit=N          job description text (request body) -> ranked candidates, NDJSON
+#   POST /bulk                   {"folder": "..."} or {"paths": [...]}, optional "skip" -> background parse job
+#   GET  /bulk, GET /bulk/<id>   bulk job status
+# Parsing runs in a ParsePool of worker processes, so the event loop only waits on futures.
+
+MAX_BODY_BYTES = 20 * 1024 * 1024
+SAVE_DELAY_SECONDS = 2.0
+STREAM_DRAIN_EVERY = 50
+
+STATUS_TEXT = {
+    200: 'OK',
+    202: 'Accepted',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    409: 'Conflict',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+# Full text and section offsets are large and internal, so responses leave them out
+_RESPONSE_SKIP_FIELDS = {'raw_text', 'sections'}
+
+
+def resume_summary(resume):
+    return {key: value for key, value in resume.items() if key not in _RESPONSE_SKIP_FIELDS}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    content_length = headers.get('content-length') or '0'
+    if not (content_length.isascii() and content_length.isdigit()):
+        raise HttpError(400, "Malformed Content-Length header")
+    length = int(content_length)
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, f"Request body larger than {MAX_BODY_BYTES} bytes")
+    try:
+        body = await reader.readexactly(length) if length else b''
+    except asyncio.IncompleteReadError:
+        raise HttpError(400, "Request body shorter than Content-Length")
+
+    url = urlsplit(target)
+    params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    return method.upper(), url.path.rstrip('/') or '/', params, body
+
+
+async def write_json(writer, status, payload):
+    body = json.dumps(payload).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+
+# Stream items as newline-delimited JSON with chunked encoding, so clients can
+# start rendering the top results before the whole list has been sent
+async def stream_json_lines(writer, items):
+    writer.write(b"HTTP/1.1 200 OK\r\n"
+                 b"Content-Type: application/x-ndjson\r\n"
+                 b"Transfer-Encoding: chunked\r\n"
+                 b"Connection: close\r\n\r\n")
+    for i, item in enumerate(items):
+        chunk = (json.dumps(item) + "\n").encode('utf-8')
+        writer.write(f"{len(chunk):x}\r\n".encode('latin-1') + chunk + b"\r\n")
+        if i % STREAM_DRAIN_EVERY == 0:
+            await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def _int_param(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except ValueError:
+        raise HttpError(400, f"'{name}' must be an integer")
+
+
+# Extractor names from a comma-separated string or a list; "expensive" stands for every costly one
+def skip_param(value):
+    names = value.split(',') if isinstance(value, str) else list(value or [])
+    skip = set()
+    for name in (name.strip() for name in names):
+        if name == 'expensive':
+            skip.update(expensive_extractors(ADVANCED_EXTRACTORS))
+        elif name:
+            skip.add(name)
+    unknown = unknown_extractors(skip)
+    if unknown:
+        raise HttpError(400, f"Unknown extractor(s): {', '.join(unknown)}")
+    return tuple(sorted(skip))
+
+
+class ResumeService:
+    def __init__(self, json_path, upload_dir, workers=None, shards=0, text_dir=TEXT_STORE_DIR, country_code=DEFAULT_COUNTRY_CODE):
+        self.json_path = json_path
+        self.upload_dir = upload_dir
+        self.text_store = TextStore(text_dir)
+        self.reference_data = load_reference_data()
+        if shards:
+            # Large corpora: one index shard per process, queried scatter-gather
+            self.index = ShardedSearchIndex(shards, self.reference_data, load_resumes(json_path))
+        else:
+            self.index = SearchIndex.load(load_resumes(json_path), json_path)
+        self.candidates = CandidateIndex(self.index.all_resumes(), country_code)
+        self.pool = ParsePool(self.reference_data, max_workers=workers)
+        # Keeps at most two files per worker in flight, however many requests arrive
+        self.parse_slots = asyncio.Semaphore(self.pool.max_workers * 2)
+        self.jobs = {}
+        self.job_ids = itertools.count(1)
+        self.tasks = set()
+        self.save_handle = None
+        self.pending_parses = 0
+        self.metrics = get_metrics()
+        self.metrics.register('index_size', lambda: len(self.index))
+        if isinstance(self.index, SearchIndex):
+            self.metrics.register('query_cache', self.index.cache.stats)
+        self.metrics.register('skill_memo', lambda: normalizer_stats(self.reference_data['skill_normalizer']))
+        self.metrics.register('title_memo', lambda: normalizer_stats(self.reference_data['title_normalizer']))
+        self.metrics.register('extractors', self.pool.timings.snapshot)
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    # Writes are batched: many parses within SAVE_DELAY_SECONDS cost one save
+    def schedule_save(self):
+        if self.save_handle is None:
+            loop = asyncio.get_running_loop()
+            self.save_handle = loop.call_later(SAVE_DELAY_SECONDS, lambda: self._spawn(self.save()))
+
+    async def save(self):
+        self.save_handle = None
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.save_store)
+        except Exception as e:
+            print(f"Error saving to JSON: {e}")
+
+    # Write the store, then bring the search index snapshot next to it up to date
+    def save_store(self):
+        resumes = self.index.all_resumes()
+        save_resumes(self.json_path, resumes)
+        if isinstance(self.index, SearchIndex):
+            self.index.save_snapshot(self.json_path, resumes)
+
+    async def parse_file(self, file_path, skip=()):
+        self.pending_parses += 1
+        self.metrics.set_queue_depth(self.pending_parses)
+        try:
+            async with self.parse_slots:
+                result = await asyncio.wrap_future(self.pool.submit(file_path, skip))
+        finally:
+            self.pending_parses -= 1
+            self.metrics.set_queue_depth(self.pending_parses)
+        self.metrics.record_ingest()
+        loop = asyncio.get_running_loop()
+        if result.get('raw_text'):
+            # Kept for reindex.py, so new reference CSVs don't mean re-uploading
+            await loop.run_in_executor(None, self.text_store.put, file_path, result.pop('raw_text'))
+        # Off the event loop: a sharded index waits on its lock while a search holds it
+        await loop.run_in_executor(None, self._add_to_indexes, result)
+        self.schedule_save()
+        return result
+
+    def _add_to_indexes(self, result):
+        self.index.add(result)
+        self.candidates.add(result)
+
+    async def handle(self, reader, writer):
+        try:
+            request = await read_request(reader)
+            if request is not None:
+                await self.route(writer, *request)
+        except HttpError as e:
+            await write_json(writer, e.status, {'error': e.message})
+        except Exception as e:
+            try:
+                await write_json(writer, 500, {'error': str(e)})
+            except Exception:
+                pass
+        finally:
+            writer.close()
+
+    async def route(self, writer, method, path, params, body):
+        if path == '/health':
+            health = {'status': 'ok', 'resumes': len(self.index), 'workers': self.pool.max_workers}
+            if isinstance(self.index, SearchIndex):
+                health['query_cache'] = self.index.cache.stats()
+            await write_json(writer, 200, health)
+        elif path == '/metrics':
+            await write_json(writer, 200, self.metrics.snapshot())
+        elif path == '/parse':
+            self._require(method, 'POST')
+            await self.handle_parse(writer, params, body)
+        elif path == '/search':
+            self._require(method, 'GET')
+            await self.handle_search(writer, params)
+        elif path == '/candidate':
+            self._require(method, 'GET')
+            await self.handle_candidate(writer, params)
+        elif path == '/match':
+            self._require(method, 'POST')
+            await self.handle_match(writer, params, body)
+        elif path == '/bulk' and method == 'POST':
+            await self.handle_bulk(writer, body)
+        elif path == '/bulk':
+            await write_json(writer, 200, list(self.jobs.values()))
+        elif path.startswith('/bulk/'):
+            job = self.jobs.get(path[len('/bulk/'):])
+            if not job:
+                raise HttpError(404, "Unknown bulk job")
+            await write_json(writer, 200, job)
+        else:
+            raise HttpError(404, f"No route for {path}")
+
+    @staticmethod
+    def _require(method, expected):
+        if method != expected:
+            raise HttpError(405, f"Use {expected}")
+
+    async def handle_parse(self, writer, params, body):
+        if not body.startswith(b'%PDF'):
+            raise HttpError(400, "Request body must be a PDF file")
+        skip = skip_param(params.get('skip', ''))
+
+        # Named by content hash, so uploading the same file twice parses it once
+        filename = os.path.basename(params.get('filename') or 'resume.pdf')
+        file_path = os.path.join(self.upload_dir, f"{hashlib.sha1(body).hexdigest()[:12]}_{filename}")
+        loop = asyncio.get_running_loop()
+        existing = await loop.run_in_executor(None, self.index.get, file_path)
+        if existing:
+            await write_json(writer, 200, resume_summary(existing))
+            return
+
+        await loop.run_in_executor(None, _write_file, file_path, body)
+        result = await self.parse_file(file_path, skip)
+        await write_json(writer, 200, resume_summary(result))
+
+    async def handle_search(self, writer, params):
+        query = params.get('q', '')
+        limit = _int_param(params, 'limit', 50)
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        results = await loop.run_in_executor(None, self.index.search, query, limit)
+        self.metrics.record_search(time.perf_counter() - start)
+        await stream_json_lines(writer, ({'score': score, 'resume': resume_summary(resume)} for score, resume in results))
+
+    async def handle_candidate(self, writer, params):
+        if params.get('email'):
+            candidate_id = self.candidates.find_by_email(params['email'])
+        elif params.get('phone'):
+            candidate_id = self.candidates.find_by_phone(params['phone'])
+        else:
+            raise HttpError(400, "Pass 'email' or 'phone'")
+        if candidate_id is None:
+            raise HttpError(404, "No candidate with that contact")
+        versions = self.candidates.versions_of(candidate_id)
+        await write_json(writer, 200, {'candidate': candidate_id, 'versions': [resume_summary(r) for r in versions]})
+
+    async def handle_match(self, writer, params, body):
+        jd_text = body.decode('utf-8', errors='replace')
+        if not jd_text.strip():
+            raise HttpError(400, "Request body must contain the job description text")
+        limit = _int_param(params, 'limit', 50)
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, self.index.match_job_description, jd_text, self.reference_data, limit)
+        await stream_json_lines(writer, ({'score': score, 'resume': resume_summary(resume)} for score, resume in results))
+
+    async def handle_bulk(self, writer, body):
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            raise HttpError(400, "Request body must be JSON")
+
+        if request.get('folder'):
+            folder = request['folder']
+            if not os.path.isdir(folder):
+                raise HttpError(400, f"Not a folder: {folder}")
+            paths = [os.path.join(folder, name) for name in sorted(os.listdir(folder)) if name.lower().endswith('.pdf')]
+        else:
+            paths = list(request.get('paths') or [])
+        if not paths:
+            raise HttpError(400, "No PDF files to parse")
+        skip = skip_param(request.get('skip'))
+
+        job_id = str(next(self.job_ids))
+        job = {'id': job_id, 'state': 'running', 'total': len(paths), 'done': 0, 'failed': 0, 'errors': []}
+        self.jobs[job_id] = job
+        if skip:
+            job['skipped'] = list(skip)
+        self._spawn(self.run_bulk(job, paths, skip))
+        await write_json(writer, 202, job)
+
+    async def run_bulk(self, job, paths, skip=()):
+        remaining = iter(paths)
+
+        # A fixed set of feeders pulls from the path list, so a huge folder
+        # doesn't turn into one waiting coroutine per file
+        async def feeder():
+            for path in remaining:
+                try:
+                    await self.parse_file(path, skip)
+                    job['done'] += 1
+                except Exception as e:
+                    job['failed'] += 1
+                    job['errors'].append(f"{os.path.basename(path)}: {e}")
+
+        await asyncio.gather(*(feeder() for _ in range(self.pool.max_workers * 2)))
+        job['state'] = 'finished'
+
+    def shutdown(self):
+        if self.save_handle is not None:
+            self.save_handle.cancel()
+        self.save_store()
+        self.pool.shutdown()
+        if isinstance(self.index, ShardedSearchIndex):
+            self.index.close()
+
+
+def _write_file(file_path, data):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as f:
+        f.write(data)
+
+
+async def serve(host, port, json_path, upload_dir, workers, shards, text_dir, country_code):
+    service = ResumeService(json_path, upload_dir, workers, shards, text_dir, country_code)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Resume service listening on http://{host}:{port} ({len(service.index)} resumes, {service.pool.max_workers} parse workers)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP service for parsing, searching and matching resumes")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help="parse worker processes (default: CPU count - 1)")
+    parser.add_argument('--shards', type=int, default=0, help="split the search index across N processes (default: single in-process index)")
+    parser.add_argument('--json-path', default=os.path.join(os.getcwd(), "parsed_resumes.json"))
+    parser.add_argument('--upload-dir', default=os.path.join(os.getcwd(), "uploads"))
+    parser.add_argument('--text-dir', default=TEXT_STORE_DIR, help="where extracted text is kept for reindex.py")
+    parser.add_argument('--country-code', default=DEFAULT_COUNTRY_CODE, help="country calling code assumed for phone numbers written without one")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.json_path, args.upload_dir, args.workers, args.shards, args.text_dir, args.country_code.lstrip('+')))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
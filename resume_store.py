@@ -0,0 +1,50 @@
+import os
+import json
+
+# Parsed resumes are stored as one JSON list; raw text is left out to keep it small
+def save_resumes(json_path, resumes):
+    simplified_resumes = []
+    for resume in resumes:
+        resume_copy = resume.copy()
+        if 'raw_text' in resume_copy:
+            del resume_copy['raw_text']
+        simplified_resumes.append(resume_copy)
+
+    with open(json_path, 'w') as f:
+        json.dump(simplified_resumes, f, indent=2)
+
+
+def load_resumes(json_path):
+    if not os.path.exists(json_path):
+        return []
+    with open(json_path, 'r') as f:
+        return json.load(f)
+
+
+# Yield resumes one at a time from the JSON list, reading the file in blocks,
+# so exports and reindexing never hold the whole corpus in memory
+def iter_resumes(json_path, read_size=1 << 16):
+    if not os.path.exists(json_path):
+        return
+    decoder = json.JSONDecoder()
+    with open(json_path, 'r') as f:
+        buffer = f.read(read_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{json_path} does not contain a JSON list")
+        pos = 1
+        while True:
+            # Skip separators between items
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                resume, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                more = f.read(read_size)
+                if not more:
+                    raise
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            yield resume
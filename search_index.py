@@ -0,0 +1,272 @@
+import threading
+from rapidfuzz import fuzz
+from query_cache import QueryCache, normalize_query
+from resume_document import ResumeDocument
+from trigram_index import TrigramIndex
+from query_language import FieldIndex, QuerySyntaxError, is_structured_query, parse_query, iter_bits
+from index_snapshot import IndexSnapshot, SnapshotTrigramIndex, SnapshotFieldIndex, snapshot_dir, store_stamp
+
+SCORE_THRESHOLD = 60
+
+# Job/education fields that are bookkeeping, not something users search for
+_SKIP_FIELDS = {'context', 'context_span', 'title_id', 'start_month', 'end_month', 'months'}
+
+
+# Searchable text for one resume: name, email, skills, jobs, education and projects
+def build_search_text(resume):
+    search_text = ""
+    if resume.get('name'):
+        search_text += resume['name'] + " "
+    if resume.get('email'):
+        search_text += resume['email'] + " "
+    if resume.get('skills'):
+        search_text += " ".join(resume['skills']) + " "
+
+    for section in ('jobs', 'education', 'projects'):
+        for entry in resume.get(section, []):
+            if isinstance(entry, dict):
+                for key, value in entry.items():
+                    if key not in _SKIP_FIELDS and value:
+                        if isinstance(value, list):
+                            search_text += " ".join(value) + " "
+                        else:
+                            search_text += str(value) + " "
+
+    return search_text.lower()
+
+
+# In-memory search index over parsed resumes. Search text is built once when a
+# resume is added rather than on every query, and the index can be shared by
+# the desktop app and the HTTP service. Saved next to the resume store, the
+# index is reopened from that snapshot (index_snapshot.py) instead of rebuilt.
+class SearchIndex:
+    def __init__(self, resumes=None):
+        self.resumes = []
+        self.search_texts = []
+        self.doc_ids = {}
+        self.lock = threading.Lock()
+        # Bumped on every change, which invalidates cached query results
+        self.generation = 0
+        self.cache = QueryCache()
+        # Candidate filter for fuzzy scoring
+        self.trigrams = TrigramIndex()
+        # Field postings for boolean/fielded queries (query_language.py)
+        self.fields = FieldIndex()
+        # Snapshot the postings above are layered on, and doc IDs changed since it was saved
+        self.snapshot = None
+        self.unsaved = set()
+        for resume in resumes or []:
+            self.add(resume)
+
+    def __len__(self):
+        return len(self.resumes)
+
+    # Add a resume, or replace the one with the same file path; returns its doc ID
+    def add(self, resume):
+        with self.lock:
+            self.generation += 1
+            doc_id = self.doc_ids.get(resume['file_path'])
+            if doc_id is None:
+                doc_id = len(self.resumes)
+                self.doc_ids[resume['file_path']] = doc_id
+                self.resumes.append(resume)
+                self.search_texts.append(build_search_text(resume))
+            else:
+                self.trigrams.remove(doc_id, self.search_texts[doc_id])
+                self.fields.remove(doc_id, self.resumes[doc_id], self.search_texts[doc_id])
+                self.resumes[doc_id] = resume
+                self.search_texts[doc_id] = build_search_text(resume)
+            if self.snapshot is not None:
+                self.unsaved.add(doc_id)
+            self.trigrams.add(doc_id, self.search_texts[doc_id])
+            self.fields.add(doc_id, resume, self.search_texts[doc_id])
+            return doc_id
+
+    def get(self, file_path):
+        doc_id = self.doc_ids.get(file_path)
+        return self.resumes[doc_id] if doc_id is not None else None
+
+    def all_resumes(self):
+        with self.lock:
+            return list(self.resumes)
+
+    # Remove and return the last n resumes (used to move documents between shards)
+    def take(self, n):
+        with self.lock:
+            self.generation += 1
+            n = max(0, min(n, len(self.resumes)))
+            taken = self.resumes[len(self.resumes) - n:] if n else []
+            for resume in taken:
+                doc_id = self.doc_ids.pop(resume['file_path'])
+                self.unsaved.discard(doc_id)
+                self.trigrams.remove(doc_id, self.search_texts[doc_id])
+                self.fields.remove(doc_id, resume, self.search_texts[doc_id])
+            del self.resumes[len(self.resumes) - len(taken):]
+            del self.search_texts[len(self.search_texts) - len(taken):]
+            return taken
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.resumes = []
+            self.search_texts = []
+            self.doc_ids = {}
+            self.unsaved = set()
+            self.trigrams.clear()
+            self.fields.clear()
+
+    # Index over the resumes of a store, opened from the snapshot saved with it
+    # if it is still current, else built and snapshotted
+    @classmethod
+    def load(cls, resumes, store_path):
+        snapshot = IndexSnapshot.open(snapshot_dir(store_path), store_stamp(store_path), resumes)
+        if snapshot is None:
+            index = cls(resumes)
+            if store_stamp(store_path) is not None:
+                index.save_snapshot(store_path, resumes)
+            return index
+        index = cls()
+        index.resumes = list(resumes)
+        index.search_texts = snapshot.search_texts()
+        index.doc_ids = {resume['file_path']: doc_id for doc_id, resume in enumerate(index.resumes)}
+        index._layer_on(snapshot)
+        return index
+
+    # Bring the snapshot up to date; call right after saving the store with
+    # saved. Skipped (False) if the index changed since, the next save catches up.
+    def save_snapshot(self, store_path, saved):
+        stamp = store_stamp(store_path)
+        with self.lock:
+            if len(saved) != len(self.resumes) or any(a is not b for a, b in zip(saved, self.resumes)):
+                return False
+            snapshot = self.snapshot or IndexSnapshot(snapshot_dir(store_path))
+            unsaved = self.unsaved if self.snapshot is not None else range(len(self.resumes))
+            snapshot.save(unsaved, [resume['file_path'] for resume in self.resumes], self.search_texts,
+                          self.trigrams.postings, self.fields.postings, stamp)
+            self._layer_on(snapshot)
+            return True
+
+    # Serve postings from the snapshot, with in-memory postings only for later changes
+    def _layer_on(self, snapshot):
+        self.snapshot = snapshot
+        self.unsaved = set()
+        self.trigrams = SnapshotTrigramIndex(snapshot, min_share=self.trigrams.min_share)
+        self.fields = SnapshotFieldIndex(snapshot)
+
+    # Replace the whole corpus (e.g. after a reindex), keeping the cache statistics
+    def rebuild(self, resumes):
+        self.clear()
+        for resume in resumes:
+            self.add(resume)
+
+    # Results are cached as (score, doc ID) so cache entries stay small
+    def _cached(self, key, generation, resumes):
+        ranked = self.cache.get(key, generation)
+        return None if ranked is None else [(score, resumes[doc_id]) for score, doc_id in ranked]
+
+    # Ranked (score, resume) pairs: exact substring hits score 100; other resumes
+    # are fuzzy-scored only if they share enough trigrams with the query.
+    # Queries using the boolean/fielded syntax are answered from field postings.
+    def search(self, query, limit=None):
+        if is_structured_query(query):
+            try:
+                return self.query(query, limit)
+            except QuerySyntaxError:
+                pass  # not valid syntax after all; treat it as free text
+
+        query = normalize_query(query)
+        if not query:
+            return []
+
+        with self.lock:
+            generation = self.generation
+            resumes = list(self.resumes)
+            search_texts = list(self.search_texts)
+
+        key = ('search', query, limit)
+        cached = self._cached(key, generation, resumes)
+        if cached is not None:
+            return cached
+
+        candidates = self.trigrams.candidates(query)
+        results = []
+        for doc_id, search_text in enumerate(search_texts):
+            if query in search_text:
+                score = 100
+            elif doc_id in candidates:
+                score = fuzz.partial_ratio(query, search_text)
+            else:
+                continue
+            if score > SCORE_THRESHOLD:
+                results.append((score, doc_id))
+
+        results.sort(reverse=True, key=lambda x: x[0])
+        results = results[:limit] if limit else results
+        self.cache.put(key, generation, results)
+        return [(score, resumes[doc_id]) for score, doc_id in results]
+
+    # Resumes matching a boolean/fielded query, all scored 100, in doc order;
+    # raises QuerySyntaxError for malformed queries
+    def query(self, query, limit=None):
+        plan = parse_query(query)
+        with self.lock:
+            generation = self.generation
+            resumes = list(self.resumes)
+            search_texts = list(self.search_texts)
+
+        key = ('query', " ".join(query.split()), limit)
+        cached = self._cached(key, generation, resumes)
+        if cached is not None:
+            return cached
+
+        results = []
+        for doc_id in iter_bits(plan.evaluate(self.fields, resumes, search_texts)):
+            if doc_id < len(resumes):
+                results.append((100, doc_id))
+                if limit and len(results) >= limit:
+                    break
+        self.cache.put(key, generation, results)
+        return [(score, resumes[doc_id]) for score, doc_id in results]
+
+    # Rank resumes against a job description by the share of its skills they
+    # cover, with a bonus when they have held one of the titles it mentions
+    def match_job_description(self, jd_text, reference_data, limit=None):
+        jd = ResumeDocument(jd_text)
+        jd_lower = jd.text_lower
+        skill_normalizer = reference_data['skill_normalizer']
+        jd_skill_ids = {skill_normalizer.term_id(s) for s in skill_normalizer.find_in_tokens(jd.tokens)}
+        jd_titles = {
+            title for title, variants in reference_data['title_variants'].items()
+            if any(variant in jd_lower for variant in variants)
+        }
+        if not jd_skill_ids and not jd_titles:
+            return []
+
+        with self.lock:
+            generation = self.generation
+            resumes = list(self.resumes)
+
+        key = ('match', normalize_query(jd_text), reference_data.get('version'), limit)
+        cached = self._cached(key, generation, resumes)
+        if cached is not None:
+            return cached
+
+        results = []
+        for doc_id, resume in enumerate(resumes):
+            resume_skill_ids = set(resume.get('skill_ids') or
+                                   (skill_normalizer.term_id(s) for s in resume.get('skills', [])))
+            matched = jd_skill_ids & resume_skill_ids
+            skill_score = len(matched) / len(jd_skill_ids) if jd_skill_ids else 0
+            title_score = 1 if any(job.get('title') in jd_titles for job in resume.get('jobs', [])) else 0
+
+            if jd_skill_ids and jd_titles:
+                score = 0.8 * skill_score + 0.2 * title_score
+            else:
+                score = skill_score or title_score
+            if score > 0:
+                results.append((round(score * 100), doc_id))
+
+        results.sort(reverse=True, key=lambda x: x[0])
+        results = results[:limit] if limit else results
+        self.cache.put(key, generation, results)
+        return [(score, resumes[doc_id]) for score, doc_id in results]
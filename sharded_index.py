@@ -0,0 +1,165 @@
+import os
+import heapq
+import itertools
+import threading
+import multiprocessing
+from search_index import SearchIndex
+from reference_data import load_reference_data
+
+DEFAULT_LIMIT = 200
+
+
+# Shard worker: owns one SearchIndex and answers coordinator commands over a pipe.
+# Without reference data from the coordinator, it loads the default CSVs on the first match.
+def _shard_main(conn, reference_data):
+    index = SearchIndex()
+    while True:
+        command, *args = conn.recv()
+        try:
+            if command == 'add':
+                for resume in args[0]:
+                    index.add(resume)
+                reply = len(index)
+            elif command == 'search':
+                reply = index.search(args[0], args[1])
+            elif command == 'match':
+                if reference_data is None:
+                    reference_data = load_reference_data()
+                reply = index.match_job_description(args[0], reference_data, args[1])
+            elif command == 'get':
+                reply = index.get(args[0])
+            elif command == 'take':
+                reply = index.take(args[0])
+            elif command == 'all':
+                reply = index.all_resumes()
+            elif command == 'clear':
+                index.clear()
+                reply = 0
+            elif command == 'stop':
+                conn.send(('ok', None))
+                break
+            else:
+                raise ValueError(f"Unknown shard command: {command}")
+            conn.send(('ok', reply))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+# Search index partitioned across worker processes. Queries are scattered to
+# every shard at once and the per-shard top-k lists merged, so each query uses
+# all cores and per-shard work stays flat as the corpus grows. Exposes the same
+# methods as SearchIndex.
+class ShardedSearchIndex:
+    def __init__(self, num_shards=None, reference_data=None, resumes=None):
+        self.reference_data = reference_data
+        self.shards = []
+        self.sizes = []
+        # file_path -> shard number, so updates land on the shard holding the resume
+        self.placement = {}
+        self.lock = threading.Lock()
+        for _ in range(num_shards or os.cpu_count() or 2):
+            self._start_shard()
+        if resumes:
+            self.add_many(resumes)
+
+    def __len__(self):
+        return sum(self.sizes)
+
+    def _start_shard(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_shard_main, args=(child_conn, self.reference_data), daemon=True)
+        process.start()
+        child_conn.close()
+        self.shards.append((process, parent_conn))
+        self.sizes.append(0)
+        return len(self.shards) - 1
+
+    def _call(self, shard, *message):
+        return self._scatter({shard: message})[shard]
+
+    # Send one message to several shards, then collect the replies; shards work in parallel.
+    # Every reply is read before a shard's error is raised, so none is left in a
+    # pipe to be taken for the answer to a later command.
+    def _scatter(self, messages):
+        for shard, message in messages.items():
+            self.shards[shard][1].send(message)
+        replies = {shard: self.shards[shard][1].recv() for shard in messages}
+        for status, reply in replies.values():
+            if status == 'error':
+                raise RuntimeError(reply)
+        return {shard: reply for shard, (_, reply) in replies.items()}
+
+    def add(self, resume):
+        self.add_many([resume])
+
+    def add_many(self, resumes):
+        with self.lock:
+            batches = {}
+            for resume in resumes:
+                shard = self.placement.get(resume['file_path'])
+                if shard is None:
+                    # New resumes go to the smallest shard
+                    shard = min(range(len(self.sizes)), key=self.sizes.__getitem__)
+                    self.placement[resume['file_path']] = shard
+                    self.sizes[shard] += 1
+                batches.setdefault(shard, []).append(resume)
+            self._scatter({shard: ('add', batch) for shard, batch in batches.items()})
+
+    def get(self, file_path):
+        with self.lock:
+            shard = self.placement.get(file_path)
+            return self._call(shard, 'get', file_path) if shard is not None else None
+
+    def all_resumes(self):
+        with self.lock:
+            replies = self._scatter({shard: ('all',) for shard in range(len(self.shards))})
+        return [resume for shard in sorted(replies) for resume in replies[shard]]
+
+    def _gather_top(self, message, limit):
+        with self.lock:
+            replies = self._scatter({shard: message for shard in range(len(self.shards))})
+        # Each shard's list is already sorted by score, so a k-way merge is enough
+        merged = heapq.merge(*replies.values(), key=lambda x: -x[0])
+        return list(itertools.islice(merged, limit)) if limit else list(merged)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        return self._gather_top(('search', query, limit), limit)
+
+    def match_job_description(self, jd_text, reference_data=None, limit=DEFAULT_LIMIT):
+        return self._gather_top(('match', jd_text, limit), limit)
+
+    # Add a shard and move resumes onto it from the larger shards until sizes are even
+    def add_shard(self):
+        with self.lock:
+            new_shard = self._start_shard()
+            target = sum(self.sizes) // len(self.sizes)
+            excess = {shard: size - target for shard, size in enumerate(self.sizes) if size > target}
+            replies = self._scatter({shard: ('take', count) for shard, count in excess.items()})
+
+            moved = []
+            for shard, taken in replies.items():
+                self.sizes[shard] -= len(taken)
+                moved.extend(taken)
+            for resume in moved:
+                self.placement[resume['file_path']] = new_shard
+            self.sizes[new_shard] = len(moved)
+            self._call(new_shard, 'add', moved)
+            return new_shard
+
+    def clear(self):
+        with self.lock:
+            self._scatter({shard: ('clear',) for shard in range(len(self.shards))})
+            self.sizes = [0] * len(self.shards)
+            self.placement = {}
+
+    def close(self):
+        with self.lock:
+            for process, conn in self.shards:
+                try:
+                    conn.send(('stop',))
+                    conn.recv()
+                except (EOFError, OSError):
+                    pass
+                process.join(timeout=5)
+            self.shards = []
+            self.sizes = []
@@ -0,0 +1,100 @@
+import os
+import csv
+import shutil
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Copies a shortlist of resume files in one go. Copies run in a thread pool;
+# shutil.copyfile already uses the kernel-side fast path (sendfile /
+# copy_file_range on Linux, fcopyfile on macOS), so threads spend their time
+# waiting on the OS rather than holding the GIL.
+
+COPY_WORKERS = 8
+MANIFEST_NAME = "manifest.csv"
+MANIFEST_COLUMNS = ['file', 'source_path', 'name', 'email', 'phone', 'skills', 'status']
+
+
+# Destination names for each source file; same-named files from different
+# folders get a numeric suffix instead of overwriting each other
+def plan_names(file_paths):
+    used = set()
+    names = []
+    for file_path in file_paths:
+        base, ext = os.path.splitext(os.path.basename(file_path))
+        name, n = base + ext, 1
+        while name.lower() in used:
+            n += 1
+            name = f"{base} ({n}){ext}"
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+def _manifest_row(resume, name, status):
+    contact = resume.get('personal_info') or resume
+    return {
+        'file': name,
+        'source_path': resume['file_path'],
+        'name': resume.get('name') or '',
+        'email': contact.get('email') or '',
+        'phone': contact.get('phone') or '',
+        'skills': ", ".join(resume.get('skills') or []),
+        'status': status
+    }
+
+
+# Copy the resumes' files into dest_folder, write manifest.csv, and optionally
+# pack both into dest_folder/<zip_name>. progress(done, total, message) is
+# called from worker threads; cancel (a threading.Event) stops further copies.
+def export_shortlist(resumes, dest_folder, zip_name=None, progress=None, cancel=None, max_workers=COPY_WORKERS):
+    os.makedirs(dest_folder, exist_ok=True)
+    names = plan_names([r['file_path'] for r in resumes])
+    rows = [None] * len(resumes)
+    total = len(resumes) + (1 if zip_name else 0)
+    done = 0
+    done_lock = threading.Lock()
+
+    def copy_one(i):
+        nonlocal done
+        resume = resumes[i]
+        if cancel is not None and cancel.is_set():
+            status = "cancelled"
+        elif not os.path.isfile(resume['file_path']):
+            status = "missing"
+        else:
+            try:
+                shutil.copyfile(resume['file_path'], os.path.join(dest_folder, names[i]))
+                status = "copied"
+            except OSError as e:
+                status = f"failed: {e}"
+        rows[i] = _manifest_row(resume, names[i], status)
+        with done_lock:
+            done += 1
+            if progress:
+                progress(done, total, f"{status}: {names[i]}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in as_completed([executor.submit(copy_one, i) for i in range(len(resumes))]):
+            future.result()
+
+    manifest_path = os.path.join(dest_folder, MANIFEST_NAME)
+    with open(manifest_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    zip_path = None
+    if zip_name and not (cancel is not None and cancel.is_set()):
+        zip_path = os.path.join(dest_folder, zip_name)
+        # PDFs are already compressed, so they are stored as-is
+        with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+            archive.write(manifest_path, MANIFEST_NAME, compress_type=zipfile.ZIP_DEFLATED)
+            for row in rows:
+                if row['status'] == "copied":
+                    archive.write(os.path.join(dest_folder, row['file']), row['file'])
+        if progress:
+            progress(total, total, f"wrote {zip_name}")
+
+    copied = sum(1 for row in rows if row['status'] == "copied")
+    return {'copied': copied, 'failed': len(rows) - copied, 'manifest': manifest_path, 'zip': zip_path}
@@ -0,0 +1,155 @@
+import os
+import re
+import csv
+import json
+import hashlib
+from collections import OrderedDict
+from rapidfuzz import fuzz, process
+from resume_document import TOKEN_PATTERN
+
+# Fuzzy fallback only kicks in for reasonably long tokens with a close match;
+# short ones ("c", "r", "go") resolve exactly or not at all
+FUZZY_MIN_LENGTH = 4
+FUZZY_SCORE_CUTOFF = 90
+MEMO_MAX_SIZE = 50000
+
+
+# Lookup key for a term: case, spacing and punctuation differences collapse,
+# so "React.js", "ReactJS" and "reactjs" all share one key
+def term_key(term):
+    return re.sub(r'[^a-z0-9+#]+', '', term.lower())
+
+
+# Load alias rows of one kind ('skill' or 'title') as {alias: canonical}
+def load_aliases(kind, path='aliases.csv'):
+    aliases = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            for row in reader:
+                if row['Kind'].strip().lower() == kind:
+                    aliases[row['Alias'].strip()] = row['Canonical'].strip()
+    return aliases
+
+
+# Resolves surface forms of skills or titles to one canonical name and ID.
+# Exact keys are a dict lookup; anything else goes through rapidfuzz once and
+# the answer (hit or miss) is memoized, optionally on disk between runs.
+class TermNormalizer:
+    def __init__(self, kind, terms, aliases=None, memo_path=None):
+        self.kind = kind
+        self.memo_path = memo_path
+        self.memo = OrderedDict()
+        self.memo_hits = 0
+        self.fuzzy_calls = 0
+        # Entries added since take_new_memo() was last called; None until it first is
+        self.new_memo = None
+
+        # key -> canonical name, for canonical terms and every alias
+        self.canonical = {}
+        # canonical name -> surface forms, canonical first
+        self.variants = {}
+        for term in terms:
+            term = term.strip()
+            if term and term_key(term) not in self.canonical:
+                self.canonical[term_key(term)] = term
+                self.variants[term] = [term]
+        for alias, target in (aliases or {}).items():
+            target = self.canonical.get(term_key(target))
+            if target and term_key(alias) not in self.canonical:
+                self.canonical[term_key(alias)] = target
+                self.variants[target].append(alias)
+
+        self.fuzzy_keys = [key for key in self.canonical if len(key) >= FUZZY_MIN_LENGTH]
+        self.max_words = max((len(v.split()) for forms in self.variants.values() for v in forms), default=1)
+
+        # The memo is only valid for the reference data it was built from
+        digest = hashlib.sha1()
+        for key in sorted(self.canonical):
+            digest.update(f"{key}={self.canonical[key]}\n".encode('utf-8'))
+        self.version = digest.hexdigest()
+
+        self.load_memo()
+
+    def term_id(self, canonical):
+        return f"{self.kind}:{term_key(canonical)}"
+
+    # Exact lookup of a single surface form; no fuzzy matching
+    def lookup(self, term):
+        return self.canonical.get(term_key(term))
+
+    # Exact lookup, then memo, then fuzzy match against the reference keys
+    def resolve(self, term):
+        key = term_key(term)
+        if key in self.canonical:
+            return self.canonical[key]
+
+        if key in self.memo:
+            self.memo_hits += 1
+            self.memo.move_to_end(key)
+            return self.memo[key]
+
+        canonical = None
+        if len(key) >= FUZZY_MIN_LENGTH:
+            self.fuzzy_calls += 1
+            match = process.extractOne(key, self.fuzzy_keys, scorer=fuzz.ratio, score_cutoff=FUZZY_SCORE_CUTOFF)
+            if match:
+                canonical = self.canonical[match[0]]
+
+        self.memo[key] = canonical
+        if len(self.memo) > MEMO_MAX_SIZE:
+            self.memo.popitem(last=False)
+        if self.new_memo is not None:
+            self.new_memo[key] = canonical
+        return canonical
+
+    # Every canonical term mentioned in already-lowercased text
+    def find_in_text(self, text_lower):
+        return self.find_in_tokens(TOKEN_PATTERN.findall(text_lower))
+
+    # Every canonical term in a token stream (e.g. ResumeDocument.tokens), found
+    # by looking up each run of up to max_words tokens as a key
+    def find_in_tokens(self, tokens):
+        found = set()
+        for i in range(len(tokens)):
+            key = ''
+            for token in tokens[i:i + self.max_words]:
+                key += token.replace('.', '')
+                canonical = self.canonical.get(key)
+                if canonical:
+                    found.add(canonical)
+        return found
+
+    # Memo entries added since the last call. A parse worker's copy calls this
+    # after each file so its fuzzy matches reach the parent's memo (merge_memo).
+    def take_new_memo(self):
+        entries = self.new_memo or {}
+        self.new_memo = {}
+        return entries
+
+    def merge_memo(self, entries):
+        for key, canonical in entries.items():
+            if key not in self.memo:
+                self.memo[key] = canonical
+        while len(self.memo) > MEMO_MAX_SIZE:
+            self.memo.popitem(last=False)
+
+    def load_memo(self):
+        if not self.memo_path or not os.path.exists(self.memo_path):
+            return
+        try:
+            with open(self.memo_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.version:
+                self.memo.update(data.get('memo', {}))
+        except Exception as e:
+            print(f"Error loading normalization cache: {e}")
+
+    def save_memo(self):
+        if not self.memo_path:
+            return
+        try:
+            with open(self.memo_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'memo': self.memo}, f)
+        except Exception as e:
+            print(f"Error saving normalization cache: {e}")
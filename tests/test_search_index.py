@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_store import save_resumes, load_resumes
+from search_index import SearchIndex
+
+
+def _paths(results):
+    return sorted(resume['file_path'] for _, resume in results)
+
+
+# A resume replaced after a query must drop out of that query's cached term bitmaps
+def test_replace_snapshot_resume_after_query(tmp_path):
+    store = str(tmp_path / "resumes.json")
+    resumes = [{'file_path': f'/x/{i}.pdf', 'name': f'P{i}', 'skills': ['java'] if i % 2 else ['go']} for i in range(6)]
+    save_resumes(store, resumes)
+    SearchIndex.load(load_resumes(store), store)
+    index = SearchIndex.load(load_resumes(store), store)
+    assert index.snapshot is not None
+
+    assert _paths(index.search('skill:java')) == ['/x/1.pdf', '/x/3.pdf', '/x/5.pdf']
+    index.add({'file_path': '/x/1.pdf', 'name': 'P1', 'skills': ['python']})
+    assert _paths(index.search('skill:java')) == ['/x/3.pdf', '/x/5.pdf']
+    assert _paths(index.search('skill:python')) == ['/x/1.pdf']
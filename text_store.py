@@ -0,0 +1,161 @@
+import os
+import sys
+import zlib
+import hashlib
+import argparse
+import tempfile
+import threading
+
+try:
+    import zstandard # optional; with a trained dictionary it compresses short resumes much better
+except ImportError:
+    zstandard = None
+
+# Extracted resume text, kept once per resume, compressed and apart from the
+# parsed fields, so fields can be recomputed (reindex.py) without opening the
+# PDFs again. Parsed job and education entries carry no context text of their own.
+#
+# Entries are zlib by default. Once a zstd dictionary has been trained from the
+# stored text (python text_store.py --train), new entries are written as zstd
+# frames; both kinds are told apart by their header, so old entries stay readable.
+
+TEXT_STORE_DIR = os.path.join(os.getcwd(), "resume_text")
+COMPRESSION_LEVEL = 6
+ZSTD_LEVEL = 9
+ZSTD_DICT_NAME = "dictionary.zstd"
+ZSTD_DICT_SIZE = 64 * 1024
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+class TextStore:
+    def __init__(self, directory=TEXT_STORE_DIR):
+        self.directory = directory
+        self.dictionary = None
+        self.dictionary_loaded = False
+        self.lock = threading.Lock()
+
+    # One file per resume (and kind), spread over 256 sub-folders by hash of the file path
+    def _path(self, key, kind=None):
+        if kind:
+            key = f"{key}#{kind}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.z")
+
+    def _zstd_dictionary(self):
+        with self.lock:
+            if not self.dictionary_loaded:
+                self.dictionary_loaded = True
+                path = os.path.join(self.directory, ZSTD_DICT_NAME)
+                if zstandard is not None and os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        self.dictionary = zstandard.ZstdCompressionDict(f.read())
+            return self.dictionary
+
+    def compress(self, text):
+        data = text.encode('utf-8')
+        dictionary = self._zstd_dictionary()
+        if dictionary is not None:
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary).compress(data)
+        return zlib.compress(data, COMPRESSION_LEVEL)
+
+    def decompress(self, data):
+        if data.startswith(ZSTD_MAGIC):
+            if zstandard is None:
+                raise RuntimeError("Stored text is zstd-compressed; install the 'zstandard' package to read it")
+            dictionary = self._zstd_dictionary()
+            if dictionary is not None:
+                decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+            else:
+                decompressor = zstandard.ZstdDecompressor()
+            return decompressor.decompress(data).decode('utf-8')
+        return zlib.decompress(data).decode('utf-8')
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, key, text, kind=None):
+        path = self._path(key, kind)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename, so readers never see half a file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.compress(text))
+        os.replace(tmp_path, path)
+
+    def get(self, key, kind=None):
+        try:
+            with open(self._path(key, kind), 'rb') as f:
+                return self.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key, kind=None):
+        try:
+            os.remove(self._path(key, kind))
+        except FileNotFoundError:
+            pass
+
+    # Every stored entry's path, for training and maintenance
+    def entry_paths(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.z'):
+                    yield os.path.join(root, name)
+
+    # Train a zstd dictionary from the stored text; later puts use it
+    def train_dictionary(self, size=ZSTD_DICT_SIZE):
+        if zstandard is None:
+            raise RuntimeError("Training a dictionary needs the 'zstandard' package")
+        samples = []
+        for path in self.entry_paths():
+            with open(path, 'rb') as f:
+                samples.append(self.decompress(f.read()).encode('utf-8'))
+        dictionary = zstandard.train_dictionary(size, samples)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ZSTD_DICT_NAME), 'wb') as f:
+            f.write(dictionary.as_bytes())
+        with self.lock:
+            self.dictionary = dictionary
+            self.dictionary_loaded = True
+        return len(samples)
+
+    # Rewrite every entry with the current codec (e.g. after training a dictionary)
+    def recompress(self):
+        count = 0
+        for path in self.entry_paths():
+            with open(path, 'rb') as f:
+                text = self.decompress(f.read())
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.compress(text))
+            os.replace(tmp_path, path)
+            count += 1
+        return count
+
+    def size_on_disk(self):
+        return sum(os.path.getsize(path) for path in self.entry_paths())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the compressed resume text store")
+    parser.add_argument('--text-dir', default=TEXT_STORE_DIR)
+    parser.add_argument('--train', action='store_true', help="train a zstd dictionary from the stored text and recompress it")
+    args = parser.parse_args()
+
+    store = TextStore(args.text_dir)
+    before = store.size_on_disk()
+    if args.train:
+        try:
+            samples = store.train_dictionary()
+        except Exception as e:
+            print(f"Error training dictionary: {e}")
+            sys.exit(1)
+        store.recompress()
+        print(f"Trained a dictionary from {samples} entries; store is {store.size_on_disk() / 1024:.0f} KB (was {before / 1024:.0f} KB)")
+    else:
+        codec = "zstd + dictionary" if store._zstd_dictionary() is not None else "zlib"
+        print(f"{sum(1 for _ in store.entry_paths())} entries, {before / 1024:.0f} KB, writing {codec}")
+
+
+if __name__ == "__main__":
+    main()
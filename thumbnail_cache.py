@@ -0,0 +1,206 @@
+import os
+import io
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+try:
+    from PIL import Image # pdfplumber renders pages to PIL images
+except ImportError:
+    Image = None
+
+# First-page previews for result cards. Pages are rendered in a small process
+# pool and kept as JPEGs in an on-disk cache keyed by a hash of the PDF's
+# content, so renamed or re-imported copies share one entry. The cache is an
+# LRU bounded in bytes; a file's modification time records its last use, so the
+# order survives restarts. Requests return at once and call back from a loader
+# thread with the decoded image (or None), so the UI never waits on a PDF.
+
+THUMBNAIL_CACHE_DIR = os.path.join(os.getcwd(), "thumbnails")
+THUMBNAIL_CACHE_BYTES = 64 * 1024 * 1024
+# Thumbnails fit in this box (A4 proportions)
+THUMBNAIL_WIDTH = 120
+THUMBNAIL_HEIGHT = 170
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_WORKERS = 2
+LOADER_THREADS = 2
+
+
+# Runs in a worker process: the first page as JPEG bytes, fitted into width x height
+def _render_first_page(file_path, width, height, quality):
+    with pdfplumber.open(file_path) as pdf:
+        if not pdf.pages:
+            return None
+        # Render at twice the size and scale down, which reads better than a small render
+        image = pdf.pages[0].to_image(width=width * 2).original.convert('RGB')
+    image.thumbnail((width, height))
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def _file_digest(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ThumbnailCache:
+    def __init__(self, directory=THUMBNAIL_CACHE_DIR, max_bytes=THUMBNAIL_CACHE_BYTES,
+                 width=THUMBNAIL_WIDTH, height=THUMBNAIL_HEIGHT, max_workers=THUMBNAIL_WORKERS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.width = width
+        self.height = height
+        self.max_workers = max_workers
+        self.entries = None  # content hash -> bytes on disk, least recently used first
+        self.total_bytes = 0
+        self.digests = {}  # (path, size, mtime) -> content hash, so a file is hashed once
+        self.waiting = {}  # file path -> callbacks of requests already in progress
+        self.loader = ThreadPoolExecutor(max_workers=LOADER_THREADS)
+        self.renderer = None
+        self.lock = threading.Lock()
+        self.rendered = 0
+        self.hits = 0
+
+    @property
+    def available(self):
+        return pdfplumber is not None and Image is not None
+
+    def _get_renderer(self):
+        # Started on the first cache miss, so sessions served from the cache never spawn it
+        with self.lock:
+            if self.renderer is None:
+                self.renderer = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self.renderer
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.jpg")
+
+    def _load_entries(self):
+        with self.lock:
+            if self.entries is not None:
+                return
+            files = []
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.endswith('.jpg'):
+                        stat = os.stat(os.path.join(self.directory, name))
+                        files.append((stat.st_mtime, name[:-len('.jpg')], stat.st_size))
+            self.entries = OrderedDict((key, size) for _, key, size in sorted(files))
+            self.total_bytes = sum(self.entries.values())
+        # The limit may have been lowered since the entries were written
+        self._evict()
+
+    # Drop least recently used entries until the cache fits in max_bytes
+    def _evict(self):
+        evicted = []
+        with self.lock:
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                key, size = self.entries.popitem(last=False)
+                self.total_bytes -= size
+                evicted.append(key)
+        for key in evicted:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _key(self, file_path):
+        stat = os.stat(file_path)
+        memo_key = (file_path, stat.st_size, stat.st_mtime_ns)
+        key = self.digests.get(memo_key)
+        if key is None:
+            key = self.digests[memo_key] = _file_digest(file_path)
+        return key
+
+    def _cached(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                self.total_bytes -= self.entries.pop(key, 0)
+            return None
+        self.hits += 1
+        return data
+
+    def _store(self, key, data):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Error writing thumbnail cache: {e}")
+            return
+        with self.lock:
+            self.total_bytes += len(data) - self.entries.get(key, 0)
+            self.entries[key] = len(data)
+            self.entries.move_to_end(key)
+        self._evict()
+
+    # JPEG bytes of the file's first page, from the cache or rendered now
+    def thumbnail_bytes(self, file_path):
+        self._load_entries()
+        key = self._key(file_path)
+        data = self._cached(key)
+        if data is None:
+            data = self._get_renderer().submit(
+                _render_first_page, file_path, self.width, self.height, THUMBNAIL_QUALITY
+            ).result()
+            if data:
+                self.rendered += 1
+                self._store(key, data)
+        return data
+
+    def _load(self, file_path):
+        image = None
+        try:
+            data = self.thumbnail_bytes(file_path)
+            if data:
+                image = Image.open(io.BytesIO(data))
+                image.load()
+        except Exception as e:
+            print(f"Error rendering thumbnail for {file_path}: {e}")
+        with self.lock:
+            callbacks = self.waiting.pop(file_path, [])
+        for callback in callbacks:
+            callback(image)
+
+    # Call callback(PIL image or None) from a loader thread once the thumbnail is ready
+    def request(self, file_path, callback):
+        with self.lock:
+            if file_path in self.waiting:
+                self.waiting[file_path].append(callback)
+                return
+            self.waiting[file_path] = [callback]
+        self.loader.submit(self._load, file_path)
+
+    def stats(self):
+        with self.lock:
+            entries = len(self.entries or ())
+        return {'entries': entries, 'bytes': self.total_bytes, 'rendered': self.rendered, 'hits': self.hits}
+
+    def shutdown(self):
+        self.loader.shutdown(wait=False, cancel_futures=True)
+        with self.lock:
+            if self.renderer is not None:
+                self.renderer.shutdown(wait=False, cancel_futures=True)
+                self.renderer = None
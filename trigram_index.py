@@ -0,0 +1,88 @@
+import math
+import threading
+from array import array
+from collections import Counter
+
+# Character-trigram postings over short, structured resume fields (names,
+# skills, job titles, degrees, institutions), never the full extracted text. A
+# fuzzy query is first narrowed to resumes sharing enough of its trigrams, and
+# only those are scored with rapidfuzz; typos still match because part of a
+# misspelled word's trigrams survive ("pyhton" and "python" share " py" and "on ").
+
+# Share of the query's trigrams a resume must contain to be scored
+TRIGRAM_MIN_SHARE = 0.3
+
+
+# Trigrams of each word padded with spaces, so word starts and ends count too
+def trigrams(text):
+    grams = set()
+    for word in text.lower().split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+# Names, skills, titles, degrees and institutions; handles both the advanced
+# parser's records and the simple app's (education as plain lines)
+def resume_terms(resume):
+    terms = [resume.get('name') or '']
+    terms.extend(resume.get('skills') or [])
+    for job in resume.get('jobs') or []:
+        terms.append(job.get('title') or '')
+    for edu in resume.get('education') or []:
+        if isinstance(edu, dict):
+            terms.append(edu.get('degree') or '')
+            terms.append(edu.get('institution') or '')
+        else:
+            terms.append(edu)
+    return " ".join(terms)
+
+
+# Postings are compact integer arrays; documents aren't stored, so replacing or
+# removing one takes the text it was indexed with
+class TrigramIndex:
+    def __init__(self, min_share=TRIGRAM_MIN_SHARE):
+        self.min_share = min_share
+        self.postings = {}  # trigram -> array of doc IDs
+        self.lock = threading.Lock()
+
+    def add(self, doc_id, text):
+        with self.lock:
+            for gram in trigrams(text):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array('l')
+                posting.append(doc_id)
+
+    def remove(self, doc_id, text):
+        with self.lock:
+            for gram in trigrams(text):
+                posting = self.postings.get(gram)
+                if posting is not None and doc_id in posting:
+                    posting.remove(doc_id)
+                    if not posting:
+                        del self.postings[gram]
+
+    def clear(self):
+        with self.lock:
+            self.postings = {}
+
+    # Doc IDs sharing at least min_share of the query's trigrams
+    def candidates(self, query):
+        query_grams = trigrams(query)
+        if not query_grams:
+            return set()
+        needed = max(1, math.ceil(self.min_share * len(query_grams)))
+        counts = self.gram_counts(query_grams)
+        return {doc_id for doc_id, count in counts.items() if count >= needed}
+
+    # How many of the given trigrams each doc ID has
+    def gram_counts(self, grams):
+        counts = Counter()
+        with self.lock:
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting:
+                    counts.update(posting)
+        return counts
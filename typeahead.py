@@ -0,0 +1,153 @@
+import heapq
+import bisect
+import threading
+
+# Search-box suggestions from a sorted key array and bisect. Every word start of
+# a term is a key ("learning" finds "Machine Learning"), and terms are ranked by
+# how many resumes contain them, so common skills come first.
+
+SUGGESTION_LIMIT = 6
+# Very short prefixes match too many keys to scan per keystroke; their top
+# suggestions are precomputed when the arrays are built
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+_MISSING_VALUES = {"Company name not found", "Institution name not found"}
+
+
+# (term, kind) of each value in a resume, once each (document frequency)
+def _resume_values(resume):
+    values = {}
+    for skill in resume.get('skills') or []:
+        values.setdefault(skill.lower(), (skill, 'skill'))
+    for job in resume.get('jobs') or []:
+        if job.get('title'):
+            values.setdefault(job['title'].lower(), (job['title'], 'title'))
+    for edu in resume.get('education') or []:
+        if isinstance(edu, dict):
+            if edu.get('degree'):
+                values.setdefault(edu['degree'].lower(), (edu['degree'], 'degree'))
+            if edu.get('institution'):
+                values.setdefault(edu['institution'].lower(), (edu['institution'], 'institution'))
+    if resume.get('name'):
+        values.setdefault(resume['name'].lower(), (resume['name'], 'name'))
+    return values.values()
+
+
+class Typeahead:
+    def __init__(self):
+        self.terms = {}  # lowercase term -> [display text, kind, document frequency]
+        self.lock = threading.Lock()
+        self.keys = []
+        self.key_terms = []
+        self.ranks = {}
+        self.top_by_prefix = {}
+        self.dirty = False
+        self.generation = 0  # bumped on every change to terms
+
+    def add_term(self, term, kind, count=0):
+        with self.lock:
+            self._add_term(term, kind, count)
+
+    def _add_term(self, term, kind, count):
+        term = (term or '').strip()
+        if not term or term in _MISSING_VALUES:
+            return
+        entry = self.terms.get(term.lower())
+        if entry is None:
+            self.terms[term.lower()] = [term, kind, count]
+        else:
+            entry[2] += count
+        self.dirty = True
+        self.generation += 1
+
+    def add_resume(self, resume):
+        for term, kind in _resume_values(resume):
+            self.add_term(term, kind, 1)
+
+    # Add resumes on the calling thread (e.g. an import thread): the arrays are
+    # rebuilt on a copy and swapped in, so suggest() neither rebuilds them nor
+    # waits for the rebuild
+    def add_resumes(self, resumes):
+        staged = Typeahead()
+        with self.lock:
+            staged.terms = {term_key: list(entry) for term_key, entry in self.terms.items()}
+            generation = self.generation
+        for resume in resumes:
+            for term, kind in _resume_values(resume):
+                staged._add_term(term, kind, 1)
+        staged._build()
+
+        with self.lock:
+            if self.generation == generation:
+                self.terms = staged.terms
+                self.keys = staged.keys
+                self.key_terms = staged.key_terms
+                self.ranks = staged.ranks
+                self.top_by_prefix = staged.top_by_prefix
+                self.dirty = False
+                self.generation += 1
+                return
+        # Terms were added meanwhile; add these too and build on the next suggest()
+        for resume in resumes:
+            self.add_resume(resume)
+
+    def _range(self, prefix):
+        start = bisect.bisect_left(self.keys, prefix)
+        return start, bisect.bisect_left(self.keys, prefix + '\uffff', start)
+
+    def _build(self):
+        pairs = []
+        for term_key in self.terms:
+            words = term_key.split()
+            for i in range(len(words)):
+                pairs.append((" ".join(words[i:]), term_key))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.key_terms = [term_key for _, term_key in pairs]
+        self.ranks = {term_key: (-entry[2], term_key) for term_key, entry in self.terms.items()}
+
+        # Keys are sorted, so each short prefix covers one contiguous range
+        self.top_by_prefix = {}
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            for prefix in {key[:length] for key in self.keys if len(key) >= length}:
+                start, end = self._range(prefix)
+                self.top_by_prefix[prefix] = heapq.nsmallest(
+                    SUGGESTION_LIMIT, set(self.key_terms[start:end]), key=self.ranks.__getitem__
+                )
+        self.dirty = False
+
+    # Build the arrays now (e.g. on an import thread) instead of on the next keystroke
+    def prepare(self):
+        with self.lock:
+            if self.dirty:
+                self._build()
+
+    # Top suggestions for what has been typed so far: [(display text, kind, count)]
+    def suggest(self, prefix, limit=SUGGESTION_LIMIT):
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        with self.lock:
+            if self.dirty:
+                self._build()
+
+            if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+                term_keys = self.top_by_prefix.get(prefix, [])
+            else:
+                start, end = self._range(prefix)
+                term_keys = heapq.nsmallest(limit, set(self.key_terms[start:end]), key=self.ranks.__getitem__)
+            return [tuple(self.terms[term_key]) for term_key in term_keys[:limit]]
+
+    # Reference CSV terms (so suggestions work before anything is imported) plus corpus values
+    @classmethod
+    def from_sources(cls, reference_data, resumes=()):
+        typeahead = cls()
+        for term in reference_data['skill_normalizer'].canonical.values():
+            typeahead.add_term(term, 'skill')
+        for term in reference_data['title_normalizer'].canonical.values():
+            typeahead.add_term(term, 'title')
+        for term in reference_data['education_degrees']:
+            typeahead.add_term(term, 'degree')
+        for resume in resumes:
+            typeahead.add_resume(resume)
+        return typeahead
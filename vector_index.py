@@ -0,0 +1,285 @@
+import time
+import math
+import argparse
+import numpy as np
+from search_index import build_search_text
+from resume_document import ResumeDocument
+
+# Offline LSA embeddings (TF-IDF -> truncated SVD) for "find similar candidates",
+# with an IVF index on top for approximate nearest-neighbour lookups. NumPy only.
+
+EMBEDDING_DIM = 128
+MIN_DF = 2
+MAX_FEATURES = 50000
+POWER_ITERATIONS = 2
+OVERSAMPLING = 10
+# Sparse products are done in blocks of roughly this many non-zeros to bound memory
+NNZ_CHUNK = 200000
+ASSIGN_CHUNK = 10000
+
+# Below this many resumes an exact scan is already instant, so IVF is skipped
+IVF_MIN_DOCS = 2000
+IVF_ITERATIONS = 10
+IVF_NPROBE = 8
+
+_STOPWORDS = frozenset(
+    "and the for with from that this have has was were are will into our your their its "
+    "his her not but all any can per via use used using of to in on at by as or an be is it".split()
+)
+
+
+# Terms from the shared document token stream; numbers and single letters carry no topic
+def tokenize(text):
+    return [t for t in ResumeDocument(text).tokens if len(t) > 1 and t[0].isalpha() and t not in _STOPWORDS]
+
+
+# Text a resume is embedded from: its persisted token stream or full text when
+# available, otherwise the extracted fields (the advanced app doesn't keep raw_text on disk)
+def resume_vector_text(resume):
+    return resume.get('search_tokens') or resume.get('raw_text') or build_search_text(resume)
+
+
+# Minimal CSR matrix: just enough for X @ D and X.T @ D against dense blocks
+class SparseMatrix:
+    def __init__(self, data, indices, indptr, shape):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = shape
+        self._transposed = None
+
+    @staticmethod
+    def _product(data, indices, indptr, n_rows, dense):
+        out = np.zeros((n_rows, dense.shape[1]), dtype=np.float32)
+        a = 0
+        while a < n_rows:
+            # Take rows until the block holds NNZ_CHUNK entries (always at least one row)
+            b = int(np.searchsorted(indptr, indptr[a] + NNZ_CHUNK, side='right')) - 1
+            b = min(max(b, a + 1), n_rows)
+            s, e = indptr[a], indptr[b]
+            if s < e:
+                products = data[s:e, None] * dense[indices[s:e]]
+                # reduceat can't express empty rows, so only sum the non-empty ones
+                nonempty = indptr[a:b] < indptr[a + 1:b + 1]
+                out[a:b][nonempty] = np.add.reduceat(products, (indptr[a:b] - s)[nonempty], axis=0)
+            a = b
+        return out
+
+    def dot(self, dense):
+        return self._product(self.data, self.indices, self.indptr, self.shape[0], dense)
+
+    def tdot(self, dense):
+        if self._transposed is None:
+            # Column-major copy, built once and reused for every X.T product
+            rows = np.repeat(np.arange(self.shape[0], dtype=np.int32), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind='stable')
+            col_ptr = np.zeros(self.shape[1] + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.shape[1]), out=col_ptr[1:])
+            self._transposed = (self.data[order], rows[order], col_ptr)
+        data, indices, indptr = self._transposed
+        return self._product(data, indices, indptr, self.shape[1], dense)
+
+
+def _build_vocabulary(docs_tokens):
+    df = {}
+    for tokens in docs_tokens:
+        for term in set(tokens):
+            df[term] = df.get(term, 0) + 1
+    min_df = MIN_DF if len(docs_tokens) > MIN_DF else 1
+    terms = [t for t, count in df.items() if count >= min_df]
+    terms.sort(key=lambda t: (-df[t], t))
+    terms = terms[:MAX_FEATURES]
+    vocabulary = {term: i for i, term in enumerate(terms)}
+    n_docs = len(docs_tokens)
+    idf = np.array([math.log((1 + n_docs) / (1 + df[t])) + 1 for t in terms], dtype=np.float32)
+    return vocabulary, idf
+
+
+# Sublinear TF-IDF row for one document as (term ids, l2-normalized weights)
+def _tfidf_row(tokens, vocabulary, idf):
+    counts = {}
+    for token in tokens:
+        term_id = vocabulary.get(token)
+        if term_id is not None:
+            counts[term_id] = counts.get(term_id, 0) + 1
+    ids = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+    weights = np.array([(1 + math.log(counts[i])) * idf[i] for i in ids], dtype=np.float32)
+    norm = np.linalg.norm(weights)
+    if norm > 0:
+        weights /= norm
+    return ids, weights
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+# Halko-style randomized SVD of a sparse matrix; returns (components, embeddings)
+def _truncated_svd(X, k, seed=0):
+    n_docs, n_terms = X.shape
+    width = min(k + OVERSAMPLING, n_docs, n_terms)
+    rng = np.random.default_rng(seed)
+    Y = X.dot(rng.standard_normal((n_terms, width)).astype(np.float32))
+    for _ in range(POWER_ITERATIONS):
+        Q, _ = np.linalg.qr(Y)
+        Z, _ = np.linalg.qr(X.tdot(Q))
+        Y = X.dot(Z)
+    Q, _ = np.linalg.qr(Y)
+    B = X.tdot(Q).T
+    Ub, S, Vt = np.linalg.svd(B, full_matrices=False)
+    k = min(k, len(S))
+    embeddings = (Q @ Ub[:, :k]) * S[:k]
+    return Vt[:k].astype(np.float32), embeddings.astype(np.float32)
+
+
+# Spherical k-means over the embeddings; returns (centroids, list_order, list_offsets)
+def _build_ivf(embeddings, seed=0):
+    n_docs = len(embeddings)
+    n_lists = max(1, int(math.sqrt(n_docs)))
+    rng = np.random.default_rng(seed)
+    centroids = embeddings[rng.choice(n_docs, n_lists, replace=False)].copy()
+
+    for _ in range(IVF_ITERATIONS):
+        assignment = _nearest_centroid(embeddings, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, embeddings)
+        counts = np.bincount(assignment, minlength=n_lists)
+        empty = counts == 0
+        # Reseed empty lists with random documents
+        sums[empty] = embeddings[rng.choice(n_docs, int(empty.sum()))]
+        centroids = _normalize_rows(sums).astype(np.float32)
+
+    assignment = _nearest_centroid(embeddings, centroids)
+    list_order = np.argsort(assignment, kind='stable').astype(np.int32)
+    list_offsets = np.searchsorted(assignment[list_order], np.arange(n_lists + 1)).astype(np.int64)
+    return centroids, list_order, list_offsets
+
+
+def _nearest_centroid(embeddings, centroids):
+    assignment = np.empty(len(embeddings), dtype=np.int32)
+    for a in range(0, len(embeddings), ASSIGN_CHUNK):
+        b = a + ASSIGN_CHUNK
+        assignment[a:b] = np.argmax(embeddings[a:b] @ centroids.T, axis=1)
+    return assignment
+
+
+class VectorIndex:
+    def __init__(self, keys, embeddings, vocabulary, idf, components,
+                 centroids=None, list_order=None, list_offsets=None):
+        self.keys = list(keys)
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        # One contiguous float32 matrix, rows l2-normalized so dot product = cosine
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.components = components
+        self.centroids = centroids
+        self.list_order = list_order
+        self.list_offsets = list_offsets
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    # Build from (key, text) pairs, e.g. (file_path, resume_vector_text(resume))
+    @classmethod
+    def build(cls, keyed_texts, dim=EMBEDDING_DIM):
+        keys = [key for key, _ in keyed_texts]
+        docs_tokens = [tokenize(text) for _, text in keyed_texts]
+        vocabulary, idf = _build_vocabulary(docs_tokens)
+
+        rows = [_tfidf_row(tokens, vocabulary, idf) for tokens in docs_tokens]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids, _ in rows], out=indptr[1:])
+        indices = np.concatenate([ids for ids, _ in rows]) if rows else np.zeros(0, dtype=np.int32)
+        data = np.concatenate([w for _, w in rows]) if rows else np.zeros(0, dtype=np.float32)
+        X = SparseMatrix(data, indices, indptr, (len(rows), len(vocabulary)))
+
+        components, embeddings = _truncated_svd(X, min(dim, max(1, len(keys) - 1)))
+        embeddings = _normalize_rows(embeddings).astype(np.float32)
+
+        ivf = _build_ivf(embeddings) if len(keys) >= IVF_MIN_DOCS else (None, None, None)
+        return cls(keys, embeddings, vocabulary, idf, components, *ivf)
+
+    # Fold new text into the existing space without rebuilding
+    def embed_text(self, text):
+        ids, weights = _tfidf_row(tokenize(text), self.vocabulary, self.idf)
+        vector = self.components[:, ids] @ weights
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _candidates(self, vector, nprobe):
+        if self.centroids is None:
+            return None
+        nprobe = min(nprobe, len(self.centroids))
+        probe = np.argpartition(-(self.centroids @ vector), nprobe - 1)[:nprobe]
+        return np.concatenate([self.list_order[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probe])
+
+    # Nearest neighbours of a vector as (similarity, key), best first
+    def query(self, vector, k=10, nprobe=IVF_NPROBE, exclude=None):
+        candidates = self._candidates(vector, nprobe)
+        scores = (self.embeddings if candidates is None else self.embeddings[candidates]) @ vector
+        ids = np.arange(len(self.keys)) if candidates is None else candidates
+
+        if exclude is not None:
+            keep = ids != exclude
+            scores, ids = scores[keep], ids[keep]
+        if len(scores) == 0:
+            return []
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.keys[ids[i]]) for i in top]
+
+    def similar(self, key, k=10, nprobe=IVF_NPROBE):
+        position = self.positions.get(key)
+        if position is None:
+            return []
+        return self.query(self.embeddings[position], k, nprobe, exclude=position)
+
+    def save(self, path):
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        extra = {}
+        if self.centroids is not None:
+            extra = {'centroids': self.centroids, 'list_order': self.list_order, 'list_offsets': self.list_offsets}
+        np.savez(path, keys=np.array(self.keys), embeddings=self.embeddings, terms=np.array(terms),
+                 idf=self.idf, components=self.components, **extra)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            vocabulary = {str(term): i for i, term in enumerate(data['terms'])}
+            ivf = (data['centroids'], data['list_order'], data['list_offsets']) if 'centroids' in data else (None, None, None)
+            return cls([str(k) for k in data['keys']], data['embeddings'], vocabulary,
+                       data['idf'], data['components'], *ivf)
+
+
+def main():
+    from resume_store import load_resumes
+
+    parser = argparse.ArgumentParser(description="Build the LSA vector index for 'similar resumes' offline")
+    parser.add_argument('--json-path', default="parsed_resumes.json")
+    parser.add_argument('--out', default="resume_vectors.npz")
+    parser.add_argument('--similar', help="file path of a resume to list neighbours for")
+    args = parser.parse_args()
+
+    resumes = load_resumes(args.json_path)
+    start = time.perf_counter()
+    index = VectorIndex.build([(r['file_path'], resume_vector_text(r)) for r in resumes])
+    index.save(args.out)
+    print(f"Embedded {len(index)} resumes in {time.perf_counter() - start:.2f}s -> {args.out}")
+
+    if args.similar:
+        start = time.perf_counter()
+        neighbours = index.similar(args.similar)
+        print(f"Query took {(time.perf_counter() - start) * 1000:.2f} ms")
+        for score, key in neighbours:
+            print(f"{score:.3f}  {key}")
+
+
+if __name__ == "__main__":
+    main()